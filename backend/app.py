@@ -1,628 +1,678 @@
-from flask import Flask, render_template, jsonify, request 
+"""
+Servidor Flask de BuildSensei.
+
+`create_app()` construye la aplicación (rutas, catálogo, pool de conexiones)
+con rutas de archivo configurables, de modo que los workers pueden arrancarse
+desde cualquier directorio:
+
+    python backend/serve.py              # producción (ASGI o WSGI, ver serve.py)
+    gunicorn 'app:create_app()'          # desde backend/
+    python backend/app.py                # servidor de desarrollo
+
+El camino de arranque solo importa lo necesario para servir: NumPy (matrices
+de compatibilidad, recomendador) se importa la primera vez que se usa y
+pandas no forma parte de él (solo lo usaba el loader de CSV).
+"""
+
+import json
+import logging
+import math
+import os
 import sqlite3
-from gpu_benchmarks import get_gpu_benchmark_url  # ← Nueva importación
-
-app = Flask(
-    __name__,
-    template_folder='../frontend',
-    static_folder='../frontend',
-    static_url_path='/frontend'
+import time
+
+from flask import Blueprint, Flask, Response, current_app, g, render_template, jsonify, request, url_for
+from werkzeug.local import LocalProxy
+
+import metrics
+from catalog import ComponentCatalog
+from catalog_export import CATALOG_MIMETYPE, changed_rows, effective_since, encode_catalog, recent_revisions
+from db_pool import DEFAULT_POOL_SIZE, get_pool
+from metrics import REQUEST_SECONDS, STAGE_SECONDS
+from payloads import PayloadCache
+from result_cache import ResultCache
+from saved_builds import BUILD_COLUMNS, BuildStore, WriterBusy, evaluate_saved, saved_build_json
+from search import CatalogSearch, highlight_spans
+from compatibility import (
+    COMPONENT_TABLES, BuildError, ComponentLookup, build_key, check_builds, compare_builds, evaluate_build,
+    resolve_build,
 )
 
-DB_PATH = 'backend/database/buildsensei.db'
+logger = logging.getLogger(__name__)
+
+BASE_DIR = os.path.dirname(os.path.abspath(__file__))
+
+# Configuración por defecto; create_app(config) y las variables de entorno
+# BUILDSENSEI_DB_PATH / BUILDSENSEI_SNAPSHOT_PATH / BUILDSENSEI_BUILDS_DB_PATH la sustituyen.
+DEFAULT_CONFIG = {
+    "DB_PATH": os.environ.get("BUILDSENSEI_DB_PATH", os.path.join(BASE_DIR, "database", "buildsensei.db")),
+    # Snapshot binario del catálogo (python backend/catalog_snapshot.py); opcional
+    "SNAPSHOT_PATH": os.environ.get("BUILDSENSEI_SNAPSHOT_PATH",
+                                    os.path.join(BASE_DIR, "database", "catalog.snap")),
+    "DB_POOL_SIZE": DEFAULT_POOL_SIZE,
+    "CATALOG_CHECK_INTERVAL": 2.0,
+    # /api/catalog?since=: solo se cachean las deltas desde las N últimas revisiones
+    "CATALOG_DELTA_CACHE_REVISIONS": 8,
+    # Caché de /api/check-compatibility: tamaño máximo en bytes y TTL en segundos
+    "RESULT_CACHE_BYTES": 8 * 1024 * 1024,
+    "RESULT_CACHE_TTL": 300.0,
+    # Modo ASGI (asgi.py): hilos para Flask y búsquedas bloqueantes, y de dónde
+    # salen los componentes de /api/check-compatibility ("catalog" o "sqlite")
+    "ASGI_THREADS": int(os.environ.get("BUILDSENSEI_ASGI_THREADS", "32")),
+    "ASGI_LOOKUPS": os.environ.get("BUILDSENSEI_ASGI_LOOKUPS", "catalog"),
+    # Builds guardadas (/api/builds): BD aparte del catálogo, cola acotada del
+    # escritor, operaciones por commit, espera para completar un lote y
+    # tiempo máximo que una petición espera a su commit
+    "BUILDS_DB_PATH": os.environ.get("BUILDSENSEI_BUILDS_DB_PATH",
+                                     os.path.join(BASE_DIR, "database", "builds.db")),
+    "BUILDS_QUEUE_SIZE": 1024,
+    "BUILDS_BATCH_SIZE": 256,
+    "BUILDS_COMMIT_LINGER": 0.002,
+    "BUILDS_WRITE_TIMEOUT": 5.0,
+}
 
+# Paginación de las búsquedas en los endpoints de listas
+DEFAULT_PAGE_SIZE = 50
+MAX_PAGE_SIZE = 500
 
-# ------------------------------------------------
-# DICCIONARIO DE CONSUMO DE GPU (TDP en Watts)
-# ------------------------------------------------
-GPU_POWER_CONSUMPTION = {
-    # NVIDIA RTX 50 Series
-    'RTX 5090': 575,
-    'RTX 5080': 320,
-    'RTX 5070 Ti': 320,
-    'RTX 5070': 250,
-    'RTX 5060 Ti': 190,
-    'RTX 5060': 170,
-    
-    # NVIDIA RTX 40 Series
-    'RTX 4090': 450,
-    'RTX 4080 SUPER': 320,
-    'RTX 4080': 320,
-    'RTX 4070 Ti SUPER': 285,
-    'RTX 4070 Ti': 285,
-    'RTX 4070 SUPER': 220,
-    'RTX 4070': 200,
-    'RTX 4060 Ti': 130,
-    'RTX 4060': 115,
-    
-    # NVIDIA RTX 30 Series
-    'RTX 3090': 420,
-    'RTX 3080 Ti': 420,
-    'RTX 3080 10GB': 320,
-    'RTX 3070': 220,
-    'RTX 3060 Ti': 210,
-    'RTX 3060 12GB': 170,
-    'RTX 3050': 70,
-    'RTX 3050 6GB': 70,
-    'RTX 3050 8GB': 70,
-    
-    # AMD RX 9000 Series
-    'RX 9070 XT': 420,
-    'RX 9070': 340,
-    'RX 9060 XT': 210,
-    
-    # AMD RX 7000 Series
-    'RX 7900 XTX': 420,
-    'RX 7900 XT': 380,
-    'RX 7900': 380,
-    'RX 7800 XT': 310,
-    'RX 7700 XT': 250,
-    'RX 7600 XT': 190,
-    'RX 7600': 100,
-    
-    # AMD RX 6000 Series
-    'RX 6800 XT': 305,
-    'RX 6800': 250,
-    'RX 6750 XT': 250,
-    'RX 6700 XT': 230,
-    'RX 6600': 110,
-    'RX 6500 XT': 107,
-    
-    # Intel Arc
-    'Arc B580': 190,
-    
-    # NVIDIA Legacy
-    'GTX 1660 SUPER': 125,
-    'GT 710': 19,
-    
-    # NVIDIA Professional
-    'RTX 6000 Ada Generation': 320,
-    'RTX A5000': 250,
-}
+# Resultados de /api/search
+DEFAULT_SEARCH_RESULTS = 10
+MAX_SEARCH_RESULTS = 50
 
+# Tamaño máximo de /api/check-compatibility/batch
+MAX_BATCH_SIZE = 50000
 
-# ------------------------------------------------
-# FUNCIONES DE LIMPIEZA
-# ------------------------------------------------
-def safe_number(value):
-    if value is None:
-        return None
+# Builds por llamada a /api/compare
+MAX_COMPARE_BUILDS = 20
 
-    if isinstance(value, str):
-        value = value.replace(",", ".").strip()
+bp = Blueprint("buildsensei", __name__)
 
-    try:
-        num = float(value)
-        if num.is_integer():
-            return int(num)
-        return num
-    except ValueError:
-        return None
 
+class Services:
+    """Estado compartido de una aplicación: catálogo, pool y caché de listas."""
 
-def extract_module_count(modules_str):
-    """
-    Extrae la cantidad de módulos desde cadenas como:
-    "2 x 8GB", "2x8GB", "2 ,16 x 8GB", "1 X 16 GB", etc.
-    """
-    if not modules_str:
-        return None
+    def __init__(self, config):
+        # Catálogo en memoria: las rutas leen de aquí en lugar de abrir SQLite
+        self.catalog = ComponentCatalog(
+            config["DB_PATH"],
+            check_interval=config["CATALOG_CHECK_INTERVAL"],
+            snapshot_path=config["SNAPSHOT_PATH"],
+        )
+        # Conexiones SQLite de solo lectura, compartidas con database/db.py
+        self.db_pool = get_pool(config["DB_PATH"], size=config["DB_POOL_SIZE"])
+        # Listas para los selects, serializadas y comprimidas una vez por versión
+        self.payload_cache = PayloadCache(self.catalog)
+        # Resultados de compatibilidad ya serializados, por build normalizada
+        self.result_cache = ResultCache(config["RESULT_CACHE_BYTES"], config["RESULT_CACHE_TTL"])
+        # Índices de búsqueda por tabla, reutilizados entre recargas si los textos no cambian
+        self.search = CatalogSearch()
+        # Builds guardadas: lecturas con pool, escrituras por lotes en un hilo
+        self.builds = BuildStore(
+            config["BUILDS_DB_PATH"],
+            queue_size=config["BUILDS_QUEUE_SIZE"],
+            batch_size=config["BUILDS_BATCH_SIZE"],
+            linger=config["BUILDS_COMMIT_LINGER"],
+            timeout=config["BUILDS_WRITE_TIMEOUT"],
+            pool_size=config["DB_POOL_SIZE"],
+        )
 
-    part = modules_str.lower().split("x")[0]
-    part = part.replace(",", ".").strip()
-    return safe_number(part)
 
+def create_app(config=None):
+    """Crea la aplicación Flask. `config` sobrescribe claves de DEFAULT_CONFIG."""
+    app = Flask(
+        __name__,
+        template_folder='../frontend',
+        static_folder='../frontend',
+        static_url_path='/frontend'
+    )
+    app.config.update(DEFAULT_CONFIG)
+    app.config.update(config or {})
 
-def get_gpu_power(gpu_name):
-    """
-    Obtiene el consumo de potencia aproximado (TDP) de una GPU.
-    Busca coincidencias en el diccionario de manera flexible.
-    """
-    if not gpu_name:
-        return 0
-    
-    gpu_name_upper = gpu_name.upper()
-    
-    # Búsqueda exacta primero
-    for model, power in GPU_POWER_CONSUMPTION.items():
-        if model.upper() == gpu_name_upper:
-            return power
-    
-    # Búsqueda parcial (mejor coincidencia)
-    best_match = None
-    best_match_len = 0
-    
-    for model, power in GPU_POWER_CONSUMPTION.items():
-        if model.upper() in gpu_name_upper:
-            if len(model) > best_match_len:
-                best_match = power
-                best_match_len = len(model)
-    
-    if best_match is not None:
-        return best_match
-    
-    # Valores por defecto según heurística
-    if any(x in gpu_name_upper for x in ['RTX 4090', 'RTX 3090', 'RTX 5090']):
-        return 450
-    elif any(x in gpu_name_upper for x in ['RTX 408', 'RTX 308', 'RTX 508', 'RX 7900', 'RX 9070 XT']):
-        return 320
-    elif any(x in gpu_name_upper for x in ['RTX 407', 'RTX 307', 'RTX 507', 'RX 7800', 'RX 9060']):
-        return 250
-    else:
-        return 150  # Valor por defecto conservador
+    app.extensions["buildsensei"] = Services(app.config)
+    app.register_blueprint(bp)
+    app.teardown_appcontext(release_db_connection)
+    app.before_request(start_request_timer)
+    app.after_request(observe_request_time)
+    return app
 
 
-# ---------------------------
-# NUEVA FUNCIÓN: BOTTLENECK
-# ---------------------------
-def detect_bottleneck(cpu_cores, cpu_boost_ghz, cpu_tdp, gpu_tdp, gpu_chipset=None):
-    """
-    Heurística ajustada para detectar cuellos de botella.
-    Devuelve: { result, summary, details }
-    Ajustes principales:
-     - Umbrales menos sensibles para marcar "CPU significativamente superior".
-     - Regla explícita de "balanced" para CPUs y GPUs de muy alta gama.
-     - Summary legible y detalles numéricos separados.
-    """
-    cpu_cores = int(cpu_cores) if cpu_cores else 0
-    cpu_boost = float(cpu_boost_ghz) if cpu_boost_ghz else 0.0
-    cpu_tdp = safe_number(cpu_tdp) or 0
-    gpu_tdp = safe_number(gpu_tdp) or 0
-
-    cpu_score = cpu_cores * cpu_boost  # proxy simple: core-GHz
-    gpu_score = gpu_tdp
-
-    # Regla explícita: combos de muy alta gama se consideran balanceados
-    if cpu_score >= 80 and gpu_score >= 400:
-        return {
-            "result": "no_significant_bottleneck",
-            "summary": "Combo de alta gama: no se detecta un cuello de botella significativo.",
-            "details": {"cpu_score": round(cpu_score,1), "gpu_tdp": gpu_tdp, "cpu_cores": cpu_cores, "cpu_boost_ghz": cpu_boost}
-        }
-
-    # Casos claros (CPU limita GPU)
-    if cpu_cores <= 4 and gpu_tdp >= 300:
-        return {
-            "result": "possible_cpu_bottleneck",
-            "summary": "La CPU podría limitar el rendimiento frente a esta GPU (CPU con pocos núcleos).",
-            "details": {"cpu_cores": cpu_cores, "cpu_boost_ghz": cpu_boost, "cpu_tdp": cpu_tdp, "gpu_tdp": gpu_tdp, "note": "GPU de alta demanda vs CPU con pocos núcleos."}
-        }
-
-    if cpu_boost < 3.5 and gpu_tdp >= 350:
-        return {
-            "result": "possible_cpu_bottleneck",
-            "summary": "La frecuencia de la CPU puede ser limitada para esta GPU.",
-            "details": {"cpu_cores": cpu_cores, "cpu_boost_ghz": cpu_boost, "cpu_tdp": cpu_tdp, "gpu_tdp": gpu_tdp, "note": "Frecuencia boost baja vs GPU potente."}
-        }
-
-    # GPU limita CPU — regla para detectar GPU débiles frente a CPUs muy potentes
-    if cpu_cores >= 10 and gpu_tdp <= 200:
-        return {
-            "result": "possible_gpu_bottleneck",
-            "summary": "La GPU podría limitar el rendimiento frente a esta CPU.",
-            "details": {"cpu_cores": cpu_cores, "cpu_boost_ghz": cpu_boost, "cpu_tdp": cpu_tdp, "gpu_tdp": gpu_tdp, "note": "CPU relativamente potente vs GPU de baja demanda."}
-        }
-
-    # Heurística general: relación CPU/GPU (menos sensible)
-    rel = cpu_score / max(1.0, gpu_score/50.0)  # normaliza gpu_tdp a escala similar
-
-    # Si la relación es muy alta, posible GPU bottleneck (umbral elevado)
-    if rel > 12.0:
-        return {
-            "result": "possible_gpu_bottleneck",
-            "summary": "La CPU es mucho más potente que la GPU; la GPU podría ser el cuello de botella.",
-            "details": {"cpu_score": round(cpu_score,1), "gpu_tdp": gpu_tdp, "cpu_cores": cpu_cores, "cpu_boost_ghz": cpu_boost, "note": "Relación CPU/GPU elevada."}
-        }
-
-    # Si la relación es muy baja, posible CPU bottleneck (umbral más estricto)
-    if gpu_score > 0 and rel < 1.8:
-        return {
-            "result": "possible_cpu_bottleneck",
-            "summary": "La relación CPU/GPU sugiere que la CPU podría limitar el rendimiento en algunos escenarios.",
-            "details": {"cpu_score": round(cpu_score,1), "gpu_tdp": gpu_tdp, "cpu_cores": cpu_cores, "cpu_boost_ghz": cpu_boost, "note": "Relación aproximada entre capacidad CPU y demanda GPU."}
-        }
-
-    return {
-        "result": "no_significant_bottleneck",
-        "summary": "No se detecta un cuello de botella evidente entre CPU y GPU.",
-        "details": {"cpu_cores": cpu_cores, "cpu_boost_ghz": cpu_boost, "cpu_tdp": cpu_tdp, "gpu_tdp": gpu_tdp}
-    }
+def _services():
+    return current_app.extensions["buildsensei"]
+
+
+# Accesos al estado de la aplicación actual (válidos dentro de una petición)
+catalog = LocalProxy(lambda: _services().catalog)
+db_pool = LocalProxy(lambda: _services().db_pool)
+payload_cache = LocalProxy(lambda: _services().payload_cache)
+result_cache = LocalProxy(lambda: _services().result_cache)
+catalog_search = LocalProxy(lambda: _services().search)
+build_store = LocalProxy(lambda: _services().builds)
+
 
 # ------------------------------------------------
 # CONEXIÓN A BD
 # ------------------------------------------------
 def get_db_connection():
-    conn = sqlite3.connect(DB_PATH)
-    conn.row_factory = sqlite3.Row
-    return conn
+    """
+    Conexión del pool para la petición actual. Se toma la primera vez que se
+    pide y se devuelve al pool al cerrar el contexto de la app.
+    """
+    if "db_conn" not in g:
+        conn = db_pool.acquire()
+        conn.row_factory = sqlite3.Row
+        g.db_conn = conn
+    return g.db_conn
 
 
-def get_components(component_type):
-    conn = sqlite3.connect(DB_PATH)
-    cursor = conn.cursor()
-    cursor.execute(f"SELECT name FROM {component_type}")
-    items = [row[0] for row in cursor.fetchall()]
-    conn.close()
-    return items
+def release_db_connection(exc):
+    conn = g.pop("db_conn", None)
+    if conn is not None:
+        db_pool.release(conn)
 
 
-# ------------------------------------------------
-# FUNCIONES DE COMPATIBILIDAD
-# ------------------------------------------------
-def deduce_socket(microarch):
-    """
-    Deduce el socket del CPU basándose en la microarquitectura.
-    Cubre todas las arquitecturas presentes en la BD.
-    """
-    if not microarch:
-        return None
-    
-    microarch = microarch.lower().strip()
-    
-    # ===== AMD SOCKETS =====
-    # Zen 5 y más nuevos -> AM5
-    if "zen 5" in microarch:
-        return "AM5"
-    
-    # Zen 4 -> AM5
-    if "zen 4" in microarch:
-        return "AM5"
-    
-    # Zen 3 -> AM4
-    if "zen 3" in microarch:
-        return "AM4"
-    
-    # Zen 2 -> AM4
-    if "zen 2" in microarch:
-        return "AM4"
-    
-    # Zen+ y Zen (primera gen) -> AM4
-    if "zen+" in microarch or (microarch == "zen" and "zen 2" not in microarch and "zen 3" not in microarch and "zen 4" not in microarch and "zen 5" not in microarch):
-        return "AM4"
-    
-    # Piledriver, Steamroller, Excavator (FX, A-series) -> AM3+ o variantes
-    if any(x in microarch for x in ["piledriver", "steamroller", "excavator"]):
-        return "AM3+"
-    
-    # Bulldozer -> AM3+
-    if "bulldozer" in microarch:
-        return "AM3+"
-    
-    # K10, Lynx (antiguos) -> AM2+/AM3
-    if any(x in microarch for x in ["k10", "lynx"]):
-        return "AM2+"
-    
-    # Jaguar (Athlon X4) -> FP2
-    if "jaguar" in microarch:
-        return "FP2"
-    
-    # Puma+ -> FP2
-    if "puma+" in microarch:
-        return "FP2"
-    
-    # ===== INTEL SOCKETS =====
-    # Raptor Lake Refresh, Raptor Lake -> LGA1700
-    if any(x in microarch for x in ["raptor lake", "raptor"]):
-        return "LGA1700"
-    
-    # Arrow Lake -> LGA1851
-    if "arrow lake" in microarch:
-        return "LGA1851"
-    
-    # Alder Lake -> LGA1700
-    if "alder lake" in microarch:
-        return "LGA1700"
-    
-    # Rocket Lake -> LGA1200
-    if "rocket lake" in microarch:
-        return "LGA1200"
-    
-    # Comet Lake -> LGA1200
-    if "comet lake" in microarch:
-        return "LGA1200"
-    
-    # Coffee Lake, Coffee Lake Refresh -> LGA1151 (rev 2)
-    if "coffee lake" in microarch:
-        return "LGA1151"
-    
-    # Kaby Lake -> LGA1151
-    if "kaby lake" in microarch:
-        return "LGA1151"
-    
-    # Skylake -> LGA1151
-    if "skylake" in microarch:
-        return "LGA1151"
-    
-    # Broadwell -> LGA1150
-    if "broadwell" in microarch:
-        return "LGA1150"
-    
-    # Haswell -> LGA1150
-    if "haswell" in microarch:
-        return "LGA1150"
-    
-    # Ivy Bridge -> LGA1155
-    if "ivy bridge" in microarch:
-        return "LGA1155"
-    
-    # Sandy Bridge -> LGA1155
-    if "sandy bridge" in microarch:
-        return "LGA1155"
-    
-    # Nehalem, Westmere -> LGA1156/LGA1366
-    if any(x in microarch for x in ["nehalem", "westmere"]):
-        return "LGA1156"
-    
-    # Core (antiga), Wolfdale, Yorkfield -> LGA775
-    if any(x in microarch for x in ["core", "wolfdale", "yorkfield"]):
-        return "LGA775"
-    
-    # Pentium 4 y Celeron antiguos
-    if any(x in microarch for x in ["pentium e", "pentium g", "celeron e", "celeron g"]):
-        if "e2" in microarch or "e5" in microarch or "e6" in microarch:
-            return "LGA775"
-        if "e3" in microarch or "g3" in microarch or "g4" in microarch or "g5" in microarch or "g6" in microarch:
-            return "LGA1155"
-    
-    # Xeon antiguos
-    if "xeon" in microarch:
-        if any(x in microarch for x in ["e5", "e3"]):
-            return "LGA1155" if "e3" in microarch else "LGA2011"
-        if "e2" in microarch:
-            return "LGA1151"
-    
-    # Por defecto si no se puede determinar
-    print(f"[SOCKET] No se pudo determinar socket para: {microarch}")
-    return None
+@bp.route('/api/health')
+def health():
+    """Estado del servicio: BD accesible, versión del catálogo y métricas de pool y caché."""
+    try:
+        ok, detail = db_pool.health_check(get_db_connection())
+    except sqlite3.Error as exc:  # p. ej. PoolTimeout: ninguna conexión libre
+        ok, detail = False, str(exc)
+
+    body = {
+        "status": "ok" if ok else "error",
+        "catalog_version": catalog.version,
+        "db_pool": db_pool.stats(),
+        "result_cache": result_cache.stats(),
+    }
+    if detail:
+        body["detail"] = detail
+    return jsonify(body), 200 if ok else 503
+
+
+def start_request_timer():
+    g.request_started = time.perf_counter()
+
+
+def observe_request_time(response):
+    started = g.pop("request_started", None)
+    if started is not None:
+        # En respuestas en streaming (lote NDJSON) cubre hasta el primer byte
+        REQUEST_SECONDS.observe(time.perf_counter() - started, request.endpoint or "not_found")
+    return response
+
+
+@bp.route('/metrics')
+def get_metrics():
+    """Métricas en formato de texto de Prometheus (latencias por etapa, pool, caché)."""
+    services = _services()
+    snapshot = services.catalog.snapshot()
+    extra = [
+        "# HELP buildsensei_catalog_version Versión del catálogo cargado",
+        "# TYPE buildsensei_catalog_version gauge",
+        f"buildsensei_catalog_version {snapshot.version}",
+    ]
+    extra += metrics.render_stats("buildsensei_db_pool", services.db_pool.stats(), "Pool de conexiones SQLite")
+    extra += metrics.render_stats("buildsensei_result_cache", services.result_cache.stats(),
+                                  "Caché de resultados de compatibilidad")
+    extra += metrics.render_stats("buildsensei_build_writer", services.builds.stats(),
+                                  "Escritor por lotes de builds guardadas")
+    return Response(metrics.render(extra), mimetype="text/plain; version=0.0.4")
 
 
 # ------------------------------------------------
 # RUTAS DE CARGA DE SELECTS
 # ------------------------------------------------
-@app.route('/')
+@bp.route('/')
 def index():
     return render_template('index.html')
 
 
-@app.route('/api/cpus')
+def name_label(table, pos):
+    return table.column("name")[pos]
+
+
+def gpu_label(table, pos):
+    return f"{table.column('chipset')[pos]} - {table.column('name')[pos]}"
+
+
+def psu_label(table, pos):
+    return f"{table.column('name')[pos]} - {table.value(pos, 'wattage')}W"
+
+
+# Etiqueta de cada tipo en los selects y en /api/search
+LABELS = {
+    "cpu": name_label,
+    "motherboard": name_label,
+    "memory": name_label,
+    "gpu": gpu_label,
+    "psu": psu_label,
+}
+
+
+def list_item(kind):
+    """
+    Elemento de lista {id, label}. El id es lo que espera
+    /api/check-compatibility: identifica la fila exacta (una tarjeta concreta,
+    no solo su chipset) y se resuelve por clave primaria.
+    """
+    label = LABELS[kind]
+
+    def item(table, pos):
+        return {"id": table.column("id")[pos], "label": label(table, pos)}
+    return item
+
+
+def parse_page_args():
+    """Lee `limit` y `cursor` de la query string; lanza ValueError si no son válidos."""
+    limit = int(request.args.get("limit", DEFAULT_PAGE_SIZE))
+    offset = int(request.args.get("cursor") or 0)
+    if not 1 <= limit <= MAX_PAGE_SIZE or offset < 0:
+        raise ValueError
+    return limit, offset
+
+
+def respond_component_list(payload_name, kind):
+    """
+    Sin parámetros devuelve la lista completa (cacheada). Con `q`, `limit`
+    o `cursor` devuelve una página de resultados ordenados por relevancia.
+    """
+    table_name = COMPONENT_TABLES[kind]
+    item = list_item(kind)
+    if not any(arg in request.args for arg in ("q", "limit", "cursor")):
+        return payload_cache.respond(payload_name, lambda snapshot: [
+            item(snapshot[table_name], pos) for pos in range(len(snapshot[table_name]))
+        ])
+
+    try:
+        limit, offset = parse_page_args()
+    except ValueError:
+        return jsonify({"error": f"Parámetros de paginación inválidos (limit entre 1 y {MAX_PAGE_SIZE})."}), 400
+
+    snapshot = catalog.snapshot()
+    table = snapshot[table_name]
+    query = request.args.get("q", "").strip()
+    if query:
+        positions, total = catalog_search.index(snapshot, table_name).search(query, limit, offset)
+    else:
+        total = len(table)
+        positions = range(offset, min(offset + limit, total))
+
+    next_offset = offset + len(positions)
+    return jsonify({
+        "items": [item(table, pos) for pos in positions],
+        "total": total,
+        "next_cursor": str(next_offset) if next_offset < total else None
+    })
+
+
+@bp.route('/api/cpus')
 def get_cpus():
-    return jsonify(get_components('cpu'))
+    return respond_component_list("cpus", "cpu")
 
 
-@app.route('/api/gpus')
+@bp.route('/api/gpus')
 def get_gpus():
-    conn = sqlite3.connect(DB_PATH)
-    cursor = conn.cursor()
-    cursor.execute("SELECT name, chipset FROM video_card")
-
-    gpus = []
-    for name, chipset in cursor.fetchall():
-        gpus.append({
-            "label": f"{chipset} - {name}",
-            "value": chipset  # ← Cambiar de 'name' a 'chipset'
-        })
-
-    conn.close()
-    return jsonify(gpus)
+    return respond_component_list("gpus", "gpu")
 
 
-@app.route('/api/motherboards')
+@bp.route('/api/motherboards')
 def get_motherboards():
-    return jsonify(get_components('motherboard'))
+    return respond_component_list("motherboards", "motherboard")
 
 
-@app.route('/api/memory')
+@bp.route('/api/memory')
 def get_memory():
-    return jsonify(get_components('memory'))
+    return respond_component_list("memory", "memory")
 
 
-@app.route('/api/psus')
+@bp.route('/api/psus')
 def get_psus():
-    conn = sqlite3.connect(DB_PATH)
-    cursor = conn.cursor()
-    # Usar id para evitar ambigüedades cuando hay múltiples entradas con el mismo nombre
-    cursor.execute("SELECT id, name, wattage FROM power_supply")
-
-    psus = []
-    for pid, name, wattage in cursor.fetchall():
-        psus.append({
-            "label": f"{name} - {wattage}W",
-            "value": pid
+    return respond_component_list("psus", "psu")
+
+
+@bp.route('/api/catalog')
+def export_catalog():
+    """
+    Catálogo completo en formato columnar binario (ver catalog_export.py),
+    cacheado y comprimido por versión. Con since=<revisión> (la "revision" de
+    una exportación anterior) solo trae las filas cambiadas desde entonces y
+    los ids de las borradas; si esa revisión no es de este catálogo, responde
+    el catálogo completo.
+    """
+    since = request.args.get("since")
+    if since is not None:
+        try:
+            since = int(since)
+        except ValueError:
+            return jsonify({"error": "since debe ser una revisión (entero) de una exportación anterior."}), 400
+        if not 0 <= since <= catalog.snapshot().revision:
+            since = None
+    if since is None:
+        return payload_cache.respond("catalog", encode_catalog, CATALOG_MIMETYPE)
+
+    with db_pool.connection() as conn:
+        since = effective_since(conn, since)
+        # Una entrada por revisión base: solo las recientes, o la caché crecería sin límite
+        cache = since in recent_revisions(conn, current_app.config["CATALOG_DELTA_CACHE_REVISIONS"])
+
+    def build_delta(snapshot):
+        with db_pool.connection() as conn:
+            positions, removed = changed_rows(conn, snapshot, since)
+        return encode_catalog(snapshot, positions, since, removed)
+
+    return payload_cache.respond(f"catalog-since-{since}", build_delta, CATALOG_MIMETYPE, cache)
+
+
+@bp.route('/api/search')
+def search_components():
+    """
+    Búsqueda en los cinco tipos de componente a la vez, tolerante a erratas.
+    Parámetros: q, types (p. ej. "cpu,gpu"; por defecto todos) y limit (1-50).
+    Cada resultado trae `id` (lo que espera /api/check-compatibility) y los
+    tramos [inicio, fin) de `label` a resaltar.
+    """
+    query = request.args.get("q", "").strip()
+    types = request.args.get("types")
+    kinds = [kind.strip() for kind in types.split(",")] if types else list(COMPONENT_TABLES)
+    try:
+        limit = int(request.args.get("limit", DEFAULT_SEARCH_RESULTS))
+    except ValueError:
+        limit = 0
+    if not query or not 1 <= limit <= MAX_SEARCH_RESULTS:
+        return jsonify({"error": f"Se requiere q y un limit entre 1 y {MAX_SEARCH_RESULTS}."}), 400
+    unknown = [kind for kind in kinds if kind not in COMPONENT_TABLES]
+    if unknown:
+        return jsonify({"error": f"Tipo desconocido. Usa uno de: {', '.join(COMPONENT_TABLES)}."}), 400
+
+    snapshot = catalog.snapshot()
+    tables = {kind: COMPONENT_TABLES[kind] for kind in kinds}
+    hits, total, terms, corrections = catalog_search.search(snapshot, query, tables, limit)
+
+    highlight_terms = terms + [token for replacements in corrections.values() for token in replacements]
+    results = []
+    for score, kind, pos in hits:
+        table = snapshot[COMPONENT_TABLES[kind]]
+        # Misma etiqueta que las listas de los selects
+        label = LABELS[kind](table, pos)
+        results.append({
+            "type": kind,
+            "id": table.column("id")[pos],
+            "label": label,
+            "score": score,
+            "highlights": highlight_spans(label, highlight_terms),
         })
- 
-    conn.close()
-    return jsonify(psus)
+    return jsonify({"query": query, "total": total, "corrections": corrections, "results": results})
 
 
 # ------------------------------------------------
 # COMPATIBILIDAD
 # ------------------------------------------------
-@app.route("/api/check-compatibility", methods=["GET"])
+@bp.route("/api/check-compatibility", methods=["GET"])
 def check_compatibility():
-    cpu = request.args.get("cpu")
-    gpu = request.args.get("gpu")  # Ahora es el CHIPSET, no el NAME
-    motherboard = request.args.get("motherboard")
-    memory = request.args.get("memory")
-    psu = request.args.get("psu")  # ahora esperamos el id de la PSU
-    
-    print(f"\n=== DEBUG CHECK-COMPATIBILITY ===")
-    print(f"GPU recibida: {gpu}")
-    
-    conn = get_db_connection()
-    cursor = conn.cursor()
-
-    # GPU - Buscar por CHIPSET en lugar de NAME
-    cursor.execute("SELECT name FROM video_card WHERE chipset = ?", (gpu,))
-    gpu_row = cursor.fetchone()
-    if not gpu_row:
-        return jsonify({"error": "GPU no encontrada"}), 400
-    gpu_name = gpu_row[0]
-    gpu_chipset = gpu  # Ya tenemos el chipset
-    
-    gpu_power_tdp = get_gpu_power(gpu_chipset)
-
-    # CPU - obtener microarch + cores + boost + tdp
-    cursor.execute("SELECT microarchitecture, core_count, boost_clock, tdp FROM cpu WHERE name = ?", (cpu,))
-    cpu_row = cursor.fetchone()
-    if not cpu_row:
-        return jsonify({"error": "CPU no encontrada"}), 400
-    cpu_microarch, cpu_core_count, cpu_boost_clock, cpu_tdp = cpu_row
-    print(f"CPU Microarch: {cpu_microarch}, cores: {cpu_core_count}, boost: {cpu_boost_clock}, tdp: {cpu_tdp}")
-
-    # Motherboard
-    cursor.execute("SELECT socket, max_memory, memory_slots FROM motherboard WHERE name = ?", (motherboard,))
-    mb = cursor.fetchone()
-    if not mb:
-        return jsonify({"error": "Motherboard no encontrada"}), 400
-    mb_socket, mb_max_memory, mb_slots = mb
-    print(f"MB Socket: {mb_socket}, Max Memory: {mb_max_memory}, Slots: {mb_slots}")
-
-    # PSU
-    # Validar y buscar PSU por id (más fiable)
-    psu_id = safe_number(psu)
-    if psu_id is None:
-        return jsonify({"error": "PSU inválida o no especificada (se espera id numérico)."}), 400
-    cursor.execute("SELECT wattage, name FROM power_supply WHERE id = ?", (int(psu_id),))
-    psu_data = cursor.fetchone()
-    if not psu_data:
-        return jsonify({"error": "PSU no encontrada"}), 400
-    psu_wattage = safe_number(psu_data[0])
-    psu_name = psu_data[1]
-    print(f"PSU Wattage: {psu_wattage}")
-
-    # RAM
-    cursor.execute("SELECT modules FROM memory WHERE name = ?", (memory,))
-    ram_data = cursor.fetchone()
-    if not ram_data:
-        return jsonify({"error": "Memoria no encontrada"}), 400
-    modules = ram_data[0]
-    module_count = extract_module_count(modules)
-    if module_count is None:
-        return jsonify({"error": f"No se pudo interpretar la cantidad de módulos RAM: '{modules}'"}), 400
-    print(f"RAM Modules: {module_count}")
-
-    # ------------------------------------------------
-    # VALIDACIONES
-    # ------------------------------------------------
-    issues = []
-    warnings = []
-
-    # CPU ↔ Motherboard usando deduce_socket
-    cpu_socket = deduce_socket(cpu_microarch)
-    print(f"\nCPU Socket deducido: {cpu_socket}")
-    if cpu_socket is None:
-        issues.append(f"No se pudo determinar el socket del CPU ({cpu_microarch}).")
-    elif cpu_socket.lower() != mb_socket.lower():
-        issues.append(f"El CPU ({cpu}) requiere socket {cpu_socket}, pero la motherboard usa {mb_socket}.")
-
-    # RAM ↔ Motherboard
-    # Asegurar que mb_slots es un número entero
-    mb_slots_int = safe_number(mb_slots) if mb_slots else 0
-    if not isinstance(mb_slots_int, int) or mb_slots_int <= 0:
-        mb_slots_int = int(mb_slots_int) if mb_slots_int else 0
-    
-    module_count_int = int(module_count) if module_count else 0
-    
-    print(f"RAM Module Count: {module_count_int}, MB Slots: {mb_slots_int}")
-    
-    if module_count_int > mb_slots_int:
-        issues.append(
-            f"Incompatibilidad de RAM: Se requieren {module_count_int} módulos, "
-            f"pero la motherboard solo tiene {mb_slots_int} slots."
-        )
-    elif module_count_int == mb_slots_int and mb_slots_int > 0:
-        #  CAMBIO: Esto es compatible, solo agregar warning
-        warnings.append(
-            f"Uso máximo de slots: La RAM usa todos los {mb_slots_int} slots disponibles. "
-            f"No hay espacio para ampliación futura."
-        )
-    elif module_count_int < mb_slots_int:
-        #  Compatibles con espacio libre
-        free_slots = mb_slots_int - module_count_int
-        if free_slots == 1:
-            warnings.append(
-                f"Slot disponible: La RAM usa {module_count_int} de {mb_slots_int} slots. "
-                f"Queda 1 slot libre para ampliación."
-            )
-        else:
-            # Sin warning si hay 2+ slots libres
-            pass
-
-    # PSU ↔ GPU (análisis mejorado con TDP)
-    cpu_power_tdp = 125  # TDP estimado por defecto para CPUs
-    
-    total_power_needed = gpu_power_tdp + cpu_power_tdp
-    required_psu = total_power_needed * 1.25  # Margen de seguridad del 25%
-    
-    print(f"\n=== ANÁLISIS DE POTENCIA ===")
-    print(f"GPU: {gpu}")
-    print(f"GPU Power TDP: {gpu_power_tdp}W")
-    print(f"CPU Power TDP: {cpu_power_tdp}W")
-    print(f"Total Power Needed: {total_power_needed}W")
-    print(f"Required PSU (con 25% margen): {int(required_psu)}W")
-    print(f"PSU Available: {psu_wattage}W")
-    print(f"Compatible: {psu_wattage >= required_psu}")
-    
-    if psu_wattage < required_psu:
-        issues.append(
-            f"PSU insuficiente. GPU ({gpu_power_tdp}W TDP) + CPU ({cpu_power_tdp}W TDP) = {total_power_needed}W. "
-            f"Se recomienda PSU de {int(required_psu)}W (con 25% margen), pero tienes {psu_wattage}W."
-        )
-    elif psu_wattage < total_power_needed * 1.5:
-        warnings.append(
-            f"PSU ajustada. Consumo estimado: {total_power_needed}W, "
-            f"PSU actual: {psu_wattage}W (margen: {int(psu_wattage - total_power_needed)}W)."
-        )
-
-    # -----------------------------
-    # Calcular análisis de bottleneck
-    # -----------------------------
-    bottleneck = detect_bottleneck(cpu_core_count, cpu_boost_clock, cpu_tdp, gpu_power_tdp, gpu_chipset)
-
-    # Obtener URL de benchmark
-    gpu_benchmark_url = get_gpu_benchmark_url(gpu_chipset)
-    
-    conn.close()
-    
-    # ------------------------------------------------
-    # RESULTADO
-    # ------------------------------------------------
-    result = {
-        "compatible": len(issues) == 0,
-        "power_analysis": {
-            "gpu_power_tdp": gpu_power_tdp,
-            "cpu_power_tdp": cpu_power_tdp,
-            "total_estimated": total_power_needed,
-            "psu_available": int(psu_wattage),
-            "margin": int(psu_wattage - total_power_needed)
-        },
-        "psu_selected": {"id": int(psu_id), "name": psu_name},
-        "memory_analysis": {
-            "modules_required": int(module_count),
-            "slots_available": int(mb_slots_int)
-        },
-        "bottleneck_analysis": bottleneck,
-        "gpu_benchmark": {
-            "chipset": gpu_chipset,
-            "url": gpu_benchmark_url
-        }
+    # Ids de las listas; por compatibilidad también nombres (y chipset de GPU)
+    build = {
+        "cpu": request.args.get("cpu"),
+        "gpu": request.args.get("gpu"),
+        "motherboard": request.args.get("motherboard"),
+        "memory": request.args.get("memory"),
+        "psu": request.args.get("psu"),
     }
-    
-    if len(issues) == 0:
-        result["message"] = "Todos los componentes son compatibles."
-    else:
-        result["issues"] = issues
-    
-    if warnings:
-        result["warnings"] = warnings
-    
-    print(f"\nResultado: {result}\n")
-    
-    return jsonify(result)
+
+    logger.debug("check-compatibility: %s", build)
+
+    # Un único snapshot para toda la petición (coherente aunque haya recarga)
+    snapshot = catalog.snapshot()
+    key = build_key(build)
+    cached = result_cache.get(snapshot.version, key)
+    if cached is not None:
+        status, body = cached
+        return Response(body, status=status, mimetype="application/json", headers={"X-Cache": "HIT"})
+
+    try:
+        parts = resolve_build(ComponentLookup(snapshot), build)
+        result = evaluate_build(parts)
+        with STAGE_SECONDS.time("serialization"):
+            response = jsonify(result)
+        logger.debug("Resultado: %s", result)
+    except BuildError as exc:
+        response = jsonify({"error": str(exc)})
+        response.status_code = 400
+
+    result_cache.put(snapshot.version, key, response.status_code, response.get_data())
+    response.headers["X-Cache"] = "MISS"
+    return response
+
+
+@bp.route("/api/check-compatibility/batch", methods=["POST"])
+def check_compatibility_batch():
+    """
+    Evalúa muchas builds en una llamada. Acepta una lista de builds o
+    {"builds": [...]} con las mismas claves que /api/check-compatibility.
+    Responde NDJSON en el mismo orden: una línea por build con su índice y
+    `result` o `error`.
+    """
+    payload = request.get_json(silent=True)
+    builds = payload.get("builds") if isinstance(payload, dict) else payload
+    if not isinstance(builds, list):
+        return jsonify({"error": "Se espera una lista de builds (o {\"builds\": [...]})."}), 400
+    if len(builds) > MAX_BATCH_SIZE:
+        return jsonify({"error": f"Máximo {MAX_BATCH_SIZE} builds por lote."}), 400
+
+    snapshot = catalog.snapshot()
+    encode = json.JSONEncoder(ensure_ascii=False, separators=(",", ":")).encode
+
+    def generate():
+        for index, outcome in check_builds(snapshot, builds):
+            if isinstance(outcome, BuildError):
+                line = {"index": index, "error": str(outcome)}
+            else:
+                line = {"index": index, "result": outcome}
+            yield encode(line) + "\n"
+
+    return Response(generate(), mimetype="application/x-ndjson")
+
+
+@bp.route("/api/compare", methods=["POST"])
+def compare():
+    """
+    Compara builds alternativas en una llamada. Acepta una lista de builds o
+    {"builds": [...]} con las mismas claves que /api/check-compatibility.
+    Cada componente distinto se resuelve una vez; responde el resultado de
+    cada build y un diff (margen de potencia, cuello de botella, issues).
+    """
+    payload = request.get_json(silent=True)
+    builds = payload.get("builds") if isinstance(payload, dict) else payload
+    if not isinstance(builds, list) or not 2 <= len(builds) <= MAX_COMPARE_BUILDS:
+        return jsonify({"error": f"Se espera una lista de entre 2 y {MAX_COMPARE_BUILDS} builds."}), 400
+
+    return jsonify(compare_builds(catalog.snapshot(), builds))
+
+
+@bp.route("/api/compatible/<component_type>/<int:component_id>")
+def get_compatible(component_type, component_id):
+    """
+    Ids de los componentes compatibles con uno dado, según las máscaras
+    precalculadas (cpu/motherboard por socket, memory/motherboard por slots,
+    gpu/psu por potencia).
+    """
+    if component_type not in COMPONENT_TABLES:
+        return jsonify({"error": f"Tipo desconocido. Usa uno de: {', '.join(COMPONENT_TABLES)}."}), 404
+
+    from compat_matrix import get_matrix  # NumPy: solo al usarlo
+
+    compatible = get_matrix(catalog.snapshot()).compatible(component_type, component_id)
+    if compatible is None:
+        return jsonify({"error": "Componente no encontrado"}), 404
+    return jsonify({"type": component_type, "id": component_id, "compatible": compatible})
+
+
+@bp.route("/api/bottleneck/<int:cpu_id>")
+def get_bottleneck_ranking(cpu_id):
+    """
+    Todos los chipsets de GPU ordenados por equilibrio con una CPU: primero
+    los que no generan cuello de botella. `limit` (opcional) recorta la lista.
+    """
+    limit = request.args.get("limit")
+    if limit is not None:
+        try:
+            limit = int(limit)
+        except ValueError:
+            limit = 0
+        if limit < 1:
+            return jsonify({"error": "limit debe ser un entero positivo."}), 400
+
+    from bottleneck import get_model  # NumPy: solo al usarlo
+
+    snapshot = catalog.snapshot()  # uno solo: una recarga entre medias no puede quitar la CPU
+    ranking = get_model(snapshot).rank_gpus(cpu_id, limit)
+    if ranking is None:
+        return jsonify({"error": "CPU no encontrada"}), 404
+    ranking["cpu"]["name"] = snapshot["cpu"].get(cpu_id).name
+    return jsonify(ranking)
+
+
+# ------------------------------------------------
+# BUILDS GUARDADAS
+# ------------------------------------------------
+def parse_build_ids(payload):
+    """Ids de componente de un JSON {cpu, gpu, motherboard, memory, psu}; lanza ValueError."""
+    if not isinstance(payload, dict):
+        raise ValueError
+    ids = {}
+    for kind in BUILD_COLUMNS:
+        value = payload.get(kind)
+        if isinstance(value, bool) or not isinstance(value, (int, str)):
+            raise ValueError
+        ids[kind] = int(value)
+    return ids
+
+
+def evaluate_request_build():
+    """
+    (ids, compatible, resultado serializado) de la build del cuerpo JSON, o
+    (None, respuesta 400) si los ids no son válidos o no existen.
+    """
+    try:
+        ids = parse_build_ids(request.get_json(silent=True))
+    except ValueError:
+        return None, (jsonify({"error": f"Se esperan ids numéricos de {', '.join(BUILD_COLUMNS)}."}), 400)
+    compatible, result = evaluate_saved(catalog.snapshot(), ids)
+    if compatible is None:  # algún id no existe: el resultado es {"error": ...}
+        return None, Response(result, status=400, mimetype="application/json")
+    return ids, (compatible, result)
+
+
+def saved_build_response(build, status=200):
+    url = url_for(".get_saved_build", share_id=build.share_id)
+    return Response(saved_build_json(build, url), status=status, mimetype="application/json")
+
+
+def write_unavailable(exc):
+    """503 cuando la cola del escritor está llena o el commit no llega a tiempo."""
+    logger.warning("Escritura de build no disponible: %r", exc)
+    response = jsonify({"error": "Demasiadas escrituras en curso, inténtalo de nuevo."})
+    response.status_code = 503
+    response.headers["Retry-After"] = "1"
+    return response
+
+
+@bp.route("/api/builds", methods=["POST"])
+def create_saved_build():
+    """
+    Guarda una build por ids de componente ({cpu, gpu, motherboard, memory,
+    psu}) con su resultado de compatibilidad. Responde 201 con el id corto
+    para compartirla (`id`) y su `url`.
+    """
+    ids, outcome = evaluate_request_build()
+    if ids is None:
+        return outcome
+    try:
+        build = build_store.create(ids, *outcome)
+    except (WriterBusy, TimeoutError, sqlite3.Error) as exc:
+        return write_unavailable(exc)
+    return saved_build_response(build, 201)
+
+
+@bp.route("/api/builds/<share_id>", methods=["GET"])
+def get_saved_build(share_id):
+    """Build guardada con el resultado almacenado (no se vuelve a evaluar)."""
+    build = build_store.get(share_id)
+    if build is None:
+        return jsonify({"error": "Build no encontrada"}), 404
+    return saved_build_response(build)
+
+
+@bp.route("/api/builds/<share_id>", methods=["PUT"])
+def update_saved_build(share_id):
+    """Sustituye los componentes de una build guardada y guarda su nuevo resultado."""
+    ids, outcome = evaluate_request_build()
+    if ids is None:
+        return outcome
+    try:
+        updated = build_store.update(share_id, ids, *outcome)
+    except (WriterBusy, TimeoutError, sqlite3.Error) as exc:
+        return write_unavailable(exc)
+    if not updated:
+        return jsonify({"error": "Build no encontrada"}), 404
+    return saved_build_response(build_store.get(share_id))
+
+
+@bp.route("/api/builds/<share_id>", methods=["DELETE"])
+def delete_saved_build(share_id):
+    try:
+        deleted = build_store.delete(share_id)
+    except (WriterBusy, TimeoutError, sqlite3.Error) as exc:
+        return write_unavailable(exc)
+    if not deleted:
+        return jsonify({"error": "Build no encontrada"}), 404
+    return "", 204
+
+
+# ------------------------------------------------
+# RECOMENDADOR
+# ------------------------------------------------
+@bp.route("/api/recommend", methods=["GET", "POST"])
+def get_recommendations():
+    """
+    Mejores builds compatibles para un presupuesto.
+    Parámetros (query string o JSON): budget, use (gaming/workstation),
+    limit y, opcionalmente, ids fijados: cpu, gpu, motherboard, memory, psu.
+    """
+    from recommender import PINNABLE, USE_WEIGHTS, RecommendationError, recommend  # NumPy: solo al usarlo
+
+    params = request.get_json(silent=True) if request.method == "POST" else request.args
+    if not isinstance(params, dict) and not hasattr(params, "get"):
+        return jsonify({"error": "Se espera un objeto JSON."}), 400
+
+    try:
+        budget = float(params.get("budget"))
+        limit = int(params.get("limit", 5))
+        pinned = {kind: int(params[kind]) for kind in PINNABLE if params.get(kind) not in (None, "")}
+    except (TypeError, ValueError, OverflowError):
+        return jsonify({"error": "budget (número), limit y los ids fijados deben ser numéricos."}), 400
+    # nan/inf pasan float() pero no caben en la respuesta JSON
+    if not math.isfinite(budget) or budget <= 0 or not 1 <= limit <= 20:
+        return jsonify({"error": "budget debe ser positivo y limit estar entre 1 y 20."}), 400
+
+    use = params.get("use", "gaming")
+    if not isinstance(use, str) or use not in USE_WEIGHTS:
+        return jsonify({"error": f"Uso desconocido. Usa uno de: {', '.join(USE_WEIGHTS)}."}), 400
+    try:
+        builds = recommend(catalog.snapshot(), budget, use, pinned, limit)
+    except RecommendationError as exc:
+        return jsonify({"error": str(exc)}), 400
+
+    return jsonify({"budget": budget, "use": use, "pinned": pinned, "builds": builds})
 
 
 # ------------------------------------------------
 # MAIN
 # ------------------------------------------------
 if __name__ == '__main__':
+    logging.basicConfig(
+        level=os.environ.get("BUILDSENSEI_LOG_LEVEL", "INFO").upper(),
+        format="%(asctime)s %(levelname)s %(name)s: %(message)s",
+    )
+    app = create_app()
+    app.extensions["buildsensei"].catalog.load()
     app.run(debug=True)
@@ -0,0 +1,223 @@
+"""
+Modo de servicio ASGI.
+
+`create_asgi_app()` envuelve la aplicación Flask en una aplicación ASGI:
+
+- GET /api/check-compatibility se atiende de forma nativa en el event loop:
+  caché de resultados, las cinco búsquedas de componentes lanzadas a la vez
+  (resolve_build_async) y evaluación de las reglas. Con ASGI_LOOKUPS =
+  "catalog" las búsquedas son accesos a los índices del catálogo en memoria y
+  se hacen en línea; con "sqlite" cada una es una consulta al pool de
+  conexiones y se ejecutan en paralelo en el pool de hilos.
+- el resto de rutas pasan a Flask (WSGI) en ese mismo pool de hilos; el
+  cuerpo se envía trozo a trozo según lo genera Flask (el lote NDJSON de
+  /api/check-compatibility/batch llega build a build).
+
+Un worker mantiene así miles de conexiones abiertas sin un hilo por conexión.
+Se lanza con serve.py (o con cualquier servidor ASGI):
+
+    python backend/serve.py --mode asgi --workers 4
+    uvicorn --app-dir backend --factory asgi:create_asgi_app
+"""
+
+import asyncio
+import io
+import logging
+import sys
+import time
+from concurrent.futures import ThreadPoolExecutor
+from urllib.parse import parse_qsl
+
+from app import create_app
+from compatibility import BuildError, ComponentLookup, PoolLookup, build_key, evaluate_build, resolve_build_async
+from metrics import REQUEST_SECONDS, STAGE_SECONDS
+
+logger = logging.getLogger(__name__)
+
+# Misma etiqueta que la ruta de Flask, para que /metrics no distinga el modo
+CHECK_ENDPOINT = "buildsensei.check_compatibility"
+BUILD_PARAMS = ("cpu", "gpu", "motherboard", "memory", "psu")
+LOOKUP_SOURCES = ("catalog", "sqlite")
+
+# Fin del cuerpo de una respuesta WSGI (centinela de next())
+_END = object()
+
+
+def wsgi_environ(scope, body):
+    """Entorno WSGI (PEP 3333) para una petición HTTP de ASGI con el cuerpo ya leído."""
+    server = scope.get("server") or ("localhost", 80)
+    environ = {
+        "REQUEST_METHOD": scope["method"],
+        "SCRIPT_NAME": scope.get("root_path", "").encode("utf-8").decode("latin-1"),
+        "PATH_INFO": scope["path"].encode("utf-8").decode("latin-1"),
+        "QUERY_STRING": scope["query_string"].decode("latin-1"),
+        "SERVER_NAME": server[0],
+        "SERVER_PORT": str(server[1] or 80),
+        "SERVER_PROTOCOL": f"HTTP/{scope.get('http_version', '1.1')}",
+        "CONTENT_LENGTH": str(len(body)),
+        "wsgi.version": (1, 0),
+        "wsgi.url_scheme": scope.get("scheme", "http"),
+        "wsgi.input": io.BytesIO(body),
+        "wsgi.errors": sys.stderr,
+        "wsgi.multithread": True,
+        "wsgi.multiprocess": True,
+        "wsgi.run_once": False,
+    }
+    client = scope.get("client")
+    if client:
+        environ["REMOTE_ADDR"], environ["REMOTE_PORT"] = client[0], str(client[1])
+
+    for name, value in scope["headers"]:
+        name = name.decode("latin-1").upper().replace("-", "_")
+        value = value.decode("latin-1")
+        if name == "CONTENT_LENGTH":
+            continue  # ya fijado por el cuerpo leído
+        if name == "CONTENT_TYPE":
+            environ["CONTENT_TYPE"] = value
+            continue
+        key = f"HTTP_{name}"
+        environ[key] = f"{environ[key]},{value}" if key in environ else value
+    return environ
+
+
+class BuildSenseiASGI:
+    """Aplicación ASGI sobre una aplicación Flask ya creada (ver create_asgi_app)."""
+
+    def __init__(self, flask_app):
+        self.flask_app = flask_app
+        self.services = flask_app.extensions["buildsensei"]
+        self.lookups = flask_app.config["ASGI_LOOKUPS"]
+        if self.lookups not in LOOKUP_SOURCES:
+            raise ValueError(f"ASGI_LOOKUPS debe ser uno de {', '.join(LOOKUP_SOURCES)}: {self.lookups!r}")
+        self.executor = ThreadPoolExecutor(flask_app.config["ASGI_THREADS"], thread_name_prefix="buildsensei")
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] == "lifespan":
+            await self.lifespan(receive, send)
+        elif scope["type"] != "http":
+            raise ValueError(f"Tipo de conexión no soportado: {scope['type']}")
+        elif scope["method"] == "GET" and scope["path"] == "/api/check-compatibility":
+            await self.check_compatibility(scope, send)
+        else:
+            await self.call_flask(scope, receive, send)
+
+    def run(self, func, *args):
+        """Ejecuta una llamada bloqueante en el pool de hilos (awaitable)."""
+        return asyncio.get_running_loop().run_in_executor(self.executor, func, *args)
+
+    async def lifespan(self, receive, send):
+        while True:
+            message = await receive()
+            if message["type"] == "lifespan.startup":
+                try:
+                    await self.run(self.services.catalog.load)
+                except Exception as exc:  # el servidor debe ver el fallo y no arrancar
+                    await send({"type": "lifespan.startup.failed", "message": str(exc)})
+                    return
+                await send({"type": "lifespan.startup.complete"})
+            elif message["type"] == "lifespan.shutdown":
+                self.executor.shutdown(wait=True)
+                await asyncio.get_running_loop().run_in_executor(None, self.services.builds.close)
+                await send({"type": "lifespan.shutdown.complete"})
+                return
+
+    # ------------------------------------------------
+    # COMPATIBILIDAD (NATIVA)
+    # ------------------------------------------------
+    async def check_compatibility(self, scope, send):
+        started = time.perf_counter()
+        args = {}
+        for name, value in parse_qsl(scope["query_string"].decode("latin-1"), keep_blank_values=True):
+            args.setdefault(name, value)  # como request.args.get: el primer valor
+        build = {param: args.get(param) for param in BUILD_PARAMS}
+        logger.debug("check-compatibility: %s", build)
+
+        # Cargar o comprobar el mtime de la BD toca disco: fuera del event loop
+        catalog = self.services.catalog
+        snapshot = await self.run(catalog.snapshot) if catalog.check_due() else catalog.snapshot()
+        key = build_key(build)
+        cached = self.services.result_cache.get(snapshot.version, key)
+        if cached is not None:
+            status, body = cached
+            cache_status = b"HIT"
+        else:
+            if self.lookups == "catalog":
+                lookup, run = ComponentLookup(snapshot), None
+            else:
+                lookup, run = PoolLookup(self.services.db_pool), self.run
+            try:
+                parts = await resolve_build_async(lookup, build, run)
+                result = evaluate_build(parts)
+                with STAGE_SECONDS.time("serialization"):
+                    status, body = 200, self.flask_app.json.response(result).get_data()
+            except BuildError as exc:
+                status, body = 400, self.flask_app.json.response({"error": str(exc)}).get_data()
+            self.services.result_cache.put(snapshot.version, key, status, body)
+            cache_status = b"MISS"
+
+        await send({
+            "type": "http.response.start",
+            "status": status,
+            "headers": [
+                (b"content-type", b"application/json"),
+                (b"content-length", str(len(body)).encode("ascii")),
+                (b"x-cache", cache_status),
+            ],
+        })
+        await send({"type": "http.response.body", "body": body})
+        REQUEST_SECONDS.observe(time.perf_counter() - started, CHECK_ENDPOINT)
+
+    # ------------------------------------------------
+    # RESTO DE RUTAS (FLASK)
+    # ------------------------------------------------
+    async def call_flask(self, scope, receive, send):
+        body = bytearray()
+        while True:
+            message = await receive()
+            if message["type"] == "http.disconnect":
+                return
+            body += message.get("body", b"")
+            if not message.get("more_body"):
+                break
+
+        status, headers, result, chunks, chunk = await self.run(self._start_wsgi, wsgi_environ(scope, bytes(body)))
+        try:
+            await send({"type": "http.response.start", "status": status, "headers": headers})
+            # Cada trozo se envía según llega: el lote NDJSON sale build a build
+            while chunk is not _END:
+                if chunk:
+                    await send({"type": "http.response.body", "body": chunk, "more_body": True})
+                chunk = await self.run(next, chunks, _END)
+            await send({"type": "http.response.body", "body": b""})
+        finally:
+            if hasattr(result, "close"):
+                await self.run(result.close)
+
+    def _start_wsgi(self, environ):
+        """
+        Ejecuta Flask en un hilo del pool hasta el primer trozo del cuerpo
+        (start_response puede llegar con él). Devuelve (status, headers,
+        respuesta WSGI, iterador del cuerpo, primer trozo o _END); el resto
+        de trozos se piden con next() también en el pool.
+        """
+        response = {}
+
+        def start_response(status, headers, exc_info=None):
+            response["status"] = int(status.split(" ", 1)[0])
+            response["headers"] = [(name.lower().encode("latin-1"), value.encode("latin-1"))
+                                   for name, value in headers]
+
+        result = self.flask_app(environ, start_response)
+        try:
+            chunks = iter(result)
+            first = next(chunks, _END)
+        except BaseException:
+            if hasattr(result, "close"):
+                result.close()
+            raise
+        return response["status"], response["headers"], result, chunks, first
+
+
+def create_asgi_app(config=None):
+    """Crea la aplicación Flask (ver app.create_app) y la envuelve para ASGI."""
+    return BuildSenseiASGI(create_app(config))
@@ -0,0 +1,133 @@
+"""
+Modelo de cuello de botella sobre todo el catálogo (NumPy).
+
+Las reglas de detect_bottleneck solo dependen de los núcleos y el boost de
+la CPU y del TDP de la GPU (que sale del chipset). Aquí esos rasgos se
+precalculan una vez por snapshot como arrays:
+
+ - por CPU: núcleos, boost, score (núcleos x boost) y TDP;
+ - por chipset de GPU distinto: TDP resuelto, y para cada tarjeta su chipset.
+
+Con eso la clasificación se evalúa por broadcasting (p. ej. una CPU contra
+todos los chipsets en una llamada) con los mismos umbrales y el mismo orden
+de reglas que compatibility.bottleneck_rule.
+"""
+
+import math
+
+import numpy as np
+
+from compatibility import (
+    BOTTLENECK_RULES, CPU_BOUND_RATIO, DEMANDING_GPU_TDP, FAST_GPU_TDP, FEW_CORES, GPU_BOUND_RATIO,
+    GPU_TDP_SCALE, HIGH_END_CPU_SCORE, HIGH_END_GPU_TDP, LIGHT_GPU_TDP, LOW_BOOST_GHZ, MANY_CORES,
+    bottleneck_verdict, cpu_features, get_gpu_power, safe_number,
+)
+
+# Punto medio (geométrico) de la franja sin cuello de botella por relación
+# CPU/GPU: cuanto más cerca de él, más equilibrada es la combinación.
+BALANCED_RATIO = math.sqrt(CPU_BOUND_RATIO * GPU_BOUND_RATIO)
+
+BALANCED_RESULTS = np.array([result == "no_significant_bottleneck" for result, *_ in BOTTLENECK_RULES])
+
+
+def classify(cores, boost, cpu_score, gpu_tdp):
+    """
+    Índice de regla (como bottleneck_rule) para arrays que se difunden entre
+    sí; devuelve (reglas, relación CPU/GPU).
+    """
+    rel = cpu_score / np.maximum(1.0, gpu_tdp / GPU_TDP_SCALE)
+    conditions = [
+        (cpu_score >= HIGH_END_CPU_SCORE) & (gpu_tdp >= HIGH_END_GPU_TDP),
+        (cores <= FEW_CORES) & (gpu_tdp >= DEMANDING_GPU_TDP),
+        (boost < LOW_BOOST_GHZ) & (gpu_tdp >= FAST_GPU_TDP),
+        (cores >= MANY_CORES) & (gpu_tdp <= LIGHT_GPU_TDP),
+        rel > GPU_BOUND_RATIO,
+        (gpu_tdp > 0) & (rel < CPU_BOUND_RATIO),
+    ]
+    shape = np.broadcast_shapes(*(np.shape(c) for c in conditions))
+    conditions = [np.broadcast_to(c, shape) for c in conditions]
+    rules = np.select(conditions, np.arange(len(conditions)), default=len(conditions))
+    return rules, np.broadcast_to(rel, shape)
+
+
+class BottleneckModel:
+    """Rasgos de CPU y GPU precalculados para un snapshot del catálogo."""
+
+    def __init__(self, snapshot):
+        cpus = snapshot["cpu"]
+        gpus = snapshot["video_card"]
+
+        self.cpu_ids = np.frombuffer(cpus.column("id"), dtype=np.int64)
+        self.cpu_position = cpus.position
+        features = [cpu_features(cpus.value(pos, "core_count"), cpus.value(pos, "boost_clock"))
+                    for pos in range(len(cpus))]
+        self.cpu_cores = np.fromiter((f[0] for f in features), dtype=np.int64, count=len(cpus))
+        self.cpu_boost = np.fromiter((f[1] for f in features), dtype=np.float64, count=len(cpus))
+        self.cpu_score = self.cpu_cores * self.cpu_boost
+        self.cpu_tdp = [safe_number(cpus.value(pos, "tdp")) or 0 for pos in range(len(cpus))]
+
+        # Un rasgo por chipset distinto; cada tarjeta apunta a su chipset
+        self.chipsets = sorted({c for c in gpus.column("chipset") if c})
+        chipset_index = {chipset: i for i, chipset in enumerate(self.chipsets)}
+        self.gpu_chipset = np.fromiter((chipset_index.get(c, -1) for c in gpus.column("chipset")),
+                                       dtype=np.int64, count=len(gpus))
+        self.chipset_tdp = np.fromiter((get_gpu_power(c) for c in self.chipsets),
+                                       dtype=np.float64, count=len(self.chipsets))
+        self.chipset_cards = np.bincount(self.gpu_chipset[self.gpu_chipset >= 0], minlength=len(self.chipsets))
+
+        # Rasgos normalizados (0..1) respecto al máximo del catálogo
+        self.cpu_score_norm = self.cpu_score / (self.cpu_score.max(initial=0) or 1.0)
+        self.chipset_tdp_norm = self.chipset_tdp / (self.chipset_tdp.max(initial=0) or 1.0)
+
+    def classify_cpu(self, pos):
+        """(reglas, relación CPU/GPU) de la CPU en `pos` contra todos los chipsets."""
+        return classify(self.cpu_cores[pos], self.cpu_boost[pos], self.cpu_score[pos], self.chipset_tdp)
+
+    def classify_all(self):
+        """Matriz de reglas (CPUs x chipsets)."""
+        rules, _ = classify(self.cpu_cores[:, None], self.cpu_boost[:, None], self.cpu_score[:, None],
+                            self.chipset_tdp[None, :])
+        return rules
+
+    def rank_gpus(self, cpu_id, limit=None):
+        """
+        Chipsets ordenados por equilibrio con la CPU `cpu_id`: primero los que
+        no generan cuello de botella y, dentro de cada grupo, por cercanía de la
+        relación CPU/GPU a BALANCED_RATIO. None si la CPU no existe.
+        """
+        pos = self.cpu_position(cpu_id)
+        if pos is None:
+            return None
+        rules, rel = self.classify_cpu(pos)
+        balance = np.abs(np.log(np.maximum(rel, 1e-9) / BALANCED_RATIO))
+        order = np.lexsort((-self.chipset_tdp, balance, ~BALANCED_RESULTS[rules]))
+        if limit is not None:
+            order = order[:limit]
+
+        cores = int(self.cpu_cores[pos])
+        boost = float(self.cpu_boost[pos])
+        score = float(self.cpu_score[pos])
+        cpu_tdp = self.cpu_tdp[pos]
+        ranking = []
+        for i in order.tolist():
+            gpu_tdp = safe_number(float(self.chipset_tdp[i]))
+            verdict = bottleneck_verdict(int(rules[i]), cores, boost, score, cpu_tdp, gpu_tdp)
+            ranking.append({
+                "chipset": self.chipsets[i],
+                "gpu_tdp": gpu_tdp,
+                "cards": int(self.chipset_cards[i]),
+                "ratio": round(float(rel[i]), 3),
+                "balance": round(float(balance[i]), 3),
+                "result": verdict["result"],
+                "summary": verdict["summary"],
+            })
+        return {
+            "cpu": {"id": int(self.cpu_ids[pos]), "cpu_cores": cores, "cpu_boost_ghz": boost,
+                    "cpu_score": round(score, 1), "cpu_score_norm": round(float(self.cpu_score_norm[pos]), 3)},
+            "gpus": ranking,
+        }
+
+
+def get_model(snapshot):
+    """Modelo del snapshot, construido la primera vez que se pide."""
+    return snapshot.derived("bottleneck", BottleneckModel)
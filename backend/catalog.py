@@ -0,0 +1,486 @@
+"""
+Catálogo de componentes en memoria.
+
+Carga las cinco tablas de la BD (cpu, motherboard, memory, video_card,
+power_supply) en estructuras columnares tipadas e indexadas, de modo que las
+rutas de la API se sirvan desde RAM sin abrir una conexión SQLite por petición.
+El catálogo se recarga de forma atómica cuando cambia el contenido de la BD:
+el mtime del archivo (y de su -wal) solo avisa de que puede haber cambiado, y
+lo que decide es la revisión del registro de cambios (catalog_changes), que
+el loader y la migración avanzan con cada escritura del catálogo. Si hay un
+snapshot binario de esa misma revisión (ver catalog_snapshot.py) se abre con
+mmap en lugar de leer SQLite.
+"""
+
+import logging
+import math
+import os
+import sqlite3
+import sys
+import threading
+import time
+from array import array
+from collections import namedtuple
+from functools import lru_cache
+
+from catalog_snapshot import SnapshotError, read_snapshot
+from socket_rules import deduce_socket
+
+logger = logging.getLogger(__name__)
+
+
+# ------------------------------------------------
+# ESQUEMA DEL CATÁLOGO
+# ------------------------------------------------
+# Tipos: "int" y "float" se guardan en arrays compactos (NaN = NULL),
+# "text" en listas de cadenas internadas.
+CATALOG_SCHEMA = {
+    "cpu": (
+        ("id", "int"),
+        ("name", "text"),
+        ("price", "float"),
+        ("core_count", "int"),
+        ("core_clock", "float"),
+        ("boost_clock", "float"),
+        ("microarchitecture", "text"),
+        ("tdp", "int"),
+        ("graphics", "text"),
+    ),
+    "motherboard": (
+        ("id", "int"),
+        ("name", "text"),
+        ("price", "float"),
+        ("socket", "text"),
+        ("form_factor", "text"),
+        ("max_memory", "int"),
+        ("memory_slots", "int"),
+    ),
+    "memory": (
+        ("id", "int"),
+        ("name", "text"),
+        ("price", "float"),
+        ("speed", "text"),
+        ("modules", "text"),
+        ("cas_latency", "float"),
+        # Normalizadas por el loader a partir de speed ("5,6000") y modules ("2,16")
+        ("ddr_generation", "int"),
+        ("speed_mhz", "int"),
+        ("module_count", "int"),
+        ("module_size_gb", "int"),
+        ("capacity_gb", "int"),
+    ),
+    "video_card": (
+        ("id", "int"),
+        ("name", "text"),
+        ("price", "float"),
+        ("chipset", "text"),
+        ("memory", "float"),
+        ("core_clock", "float"),
+        ("boost_clock", "float"),
+        ("length", "float"),
+    ),
+    "power_supply": (
+        ("id", "int"),
+        ("name", "text"),
+        ("price", "float"),
+        ("efficiency", "text"),
+        ("wattage", "int"),
+        ("modular", "text"),
+    ),
+}
+
+# Columnas calculadas al cargar: nombre -> (tipo, columna origen, función).
+# La función se evalúa una sola vez por valor distinto de la columna origen.
+DERIVED_COLUMNS = {
+    "cpu": {
+        "socket": ("text", "microarchitecture", deduce_socket),
+    },
+}
+
+# Columnas por las que la API busca filas (además del id)
+CATALOG_INDEXES = {
+    "cpu": ("name", "socket"),
+    "motherboard": ("name", "socket"),
+    "memory": ("name",),
+    "video_card": ("name", "chipset"),
+    "power_supply": (),
+}
+
+
+# ------------------------------------------------
+# TABLA COLUMNAR
+# ------------------------------------------------
+def _to_float(value):
+    if value is None:
+        return math.nan
+    if isinstance(value, str):
+        value = value.replace(",", ".").strip()
+    try:
+        return float(value)
+    except ValueError:
+        return math.nan
+
+
+@lru_cache(maxsize=None)
+def _row_type(name, columns):
+    """Una sola clase de fila por tabla y esquema (crear un namedtuple es caro)."""
+    return namedtuple(f"{name}_row", columns)
+
+
+def _from_float(value, kind):
+    if value != value:  # NaN
+        return None
+    if kind == "int":
+        return int(value)
+    return value
+
+
+class CatalogTable:
+    """
+    Tabla de solo lectura guardada por columnas.
+
+    Las filas se materializan bajo demanda como namedtuples; los índices
+    mapean valor -> posiciones (en el orden original de la BD, de modo que
+    `find` devuelve la misma fila que un `SELECT ... WHERE col = ?` sin ORDER BY).
+    Los índices se construyen la primera vez que se consultan, para que abrir
+    un snapshot no pague por columnas que nadie busca.
+    """
+
+    __slots__ = ("name", "columns", "types", "Row", "indexed", "_data", "_id_index", "_first", "_indexes")
+
+    def __init__(self, name, schema, data, indexed=()):
+        self.name = name
+        self.columns = tuple(col for col, _ in schema)
+        self.types = dict(schema)
+        self.Row = _row_type(name, self.columns)
+        self.indexed = frozenset(indexed)
+        self._data = data
+        self._id_index = None
+        self._first = {}
+        self._indexes = {}
+
+    @classmethod
+    def from_rows(cls, name, schema, rows, indexed=(), derived=None):
+        """
+        Construye la tabla a partir de tuplas en el orden de `schema`.
+        `derived` añade columnas calculadas (ver DERIVED_COLUMNS).
+        """
+        data = {}
+        for col, kind in schema:
+            data[col] = array("q") if col == "id" else (array("d") if kind != "text" else [])
+
+        intern = sys.intern
+        for row in rows:
+            for (col, kind), value in zip(schema, row):
+                if col == "id":
+                    data[col].append(int(value))
+                elif kind == "text":
+                    data[col].append(intern(str(value)) if value is not None else None)
+                else:
+                    data[col].append(_to_float(value))
+
+        schema = tuple(schema)
+        for col, (kind, source, func) in (derived or {}).items():
+            resolved = {value: func(value) for value in set(data[source])}
+            if kind == "text":
+                data[col] = [resolved[value] for value in data[source]]
+            else:
+                data[col] = array("d", (_to_float(resolved[value]) for value in data[source]))
+            schema += ((col, kind),)
+        return cls(name, schema, data, indexed)
+
+    def __len__(self):
+        return len(self._data["id"])
+
+    def column(self, name):
+        """Devuelve la columna cruda (array o lista) sin copiarla."""
+        return self._data[name]
+
+    def value(self, pos, column):
+        raw = self._data[column][pos]
+        kind = self.types[column]
+        if kind == "text" or column == "id":
+            return raw
+        return _from_float(raw, kind)
+
+    def row(self, pos):
+        return self.Row(*(self.value(pos, col) for col in self.columns))
+
+    def rows(self):
+        for pos in range(len(self)):
+            yield self.row(pos)
+
+    def _ids(self):
+        if self._id_index is None:
+            ids = self._data["id"]
+            self._id_index = dict(zip(ids, range(len(ids))))
+        return self._id_index
+
+    def _first_positions(self, column):
+        """valor -> primera posición con ese valor (solo columnas de `indexed`)."""
+        index = self._first.get(column)
+        if index is None:
+            if column not in self.indexed:
+                raise KeyError(column)
+            values = self._data[column]
+            # Recorrido inverso: la última escritura (la primera posición) gana
+            index = dict(zip(reversed(values), range(len(values) - 1, -1, -1)))
+            index.pop(None, None)
+            self._first[column] = index
+        return index
+
+    def position(self, row_id):
+        """
+        Posición de la fila con ese id, o None. Las tablas se cargan ordenadas
+        por id y casi siempre sin huecos, así que se prueba primero el id como
+        índice del array; las filas que el loader borra dejan huecos y, a partir
+        de ahí, se recurre al índice id -> posición. Cada carga crea tablas
+        nuevas, por lo que ese índice nunca sobrevive a una recarga.
+        """
+        ids = self._data["id"]
+        if type(row_id) is int and ids:
+            pos = row_id - ids[0]
+            if 0 <= pos < len(ids) and ids[pos] == row_id:
+                return pos
+        return self._ids().get(row_id)
+
+    def get(self, row_id):
+        """Fila por clave primaria, o None."""
+        pos = self.position(row_id)
+        return self.row(pos) if pos is not None else None
+
+    def find(self, column, value):
+        """Primera fila cuyo `column` es igual a `value`, o None."""
+        pos = self._first_positions(column).get(value)
+        return self.row(pos) if pos is not None else None
+
+    def find_all(self, column, value):
+        index = self._indexes.get(column)
+        if index is None:
+            if column not in self.indexed:
+                raise KeyError(column)
+            index = {}
+            for pos, item in enumerate(self._data[column]):
+                if item is not None:
+                    index.setdefault(item, []).append(pos)
+            self._indexes[column] = index
+        return [self.row(pos) for pos in index.get(value, ())]
+
+
+# ------------------------------------------------
+# CATÁLOGO
+# ------------------------------------------------
+class CatalogSnapshot:
+    """
+    Conjunto inmutable de tablas cargadas en un mismo instante.
+
+    `version` cuenta las cargas de este proceso; `revision` es la última
+    revisión del registro de cambios de la BD (catalog_changes) incluida en
+    las tablas, la misma en todos los procesos (0 si no hay registro).
+    """
+
+    __slots__ = ("tables", "version", "mtime", "revision", "loaded_at", "_derived", "_lock")
+
+    def __init__(self, tables, version, mtime, revision=0):
+        self.tables = tables
+        self.version = version
+        self.mtime = mtime
+        self.revision = revision
+        self.loaded_at = time.time()
+        self._derived = {}
+        self._lock = threading.Lock()
+
+    def __getitem__(self, table):
+        return self.tables[table]
+
+    def derived(self, key, factory):
+        """
+        Estructura derivada de este snapshot (índices, matrices...), construida
+        con `factory(snapshot)` la primera vez y reutilizada hasta la recarga.
+        """
+        try:
+            return self._derived[key]
+        except KeyError:
+            pass
+        with self._lock:
+            if key not in self._derived:
+                self._derived[key] = factory(self)
+            return self._derived[key]
+
+
+def _db_mtime(db_path):
+    """mtime efectivo de la BD (incluye el -wal si existe)."""
+    mtime = os.stat(db_path).st_mtime_ns
+    wal = db_path + "-wal"
+    if os.path.exists(wal):
+        mtime = max(mtime, os.stat(wal).st_mtime_ns)
+    return mtime
+
+
+class ComponentCatalog:
+    """
+    Catálogo en memoria con recarga atómica.
+
+    `snapshot()` devuelve siempre un CatalogSnapshot completo: una recarga
+    construye el nuevo snapshot aparte y solo entonces sustituye la referencia,
+    por lo que una petición nunca ve tablas de dos versiones distintas.
+    """
+
+    def __init__(self, db_path, check_interval=2.0, snapshot_path=None):
+        self.db_path = db_path
+        self.snapshot_path = snapshot_path
+        self.check_interval = check_interval
+        self.source = None  # "snapshot" o "sqlite": de dónde salió la última carga
+        self._snapshot = None
+        self._version = 0
+        self._next_check = 0.0
+        self._lock = threading.Lock()
+
+    @property
+    def version(self):
+        return self.snapshot().version
+
+    def _source_mtime(self):
+        """(mtime de la BD, mtime del snapshot binario); None si el archivo no existe."""
+        db_mtime = _db_mtime(self.db_path) if os.path.exists(self.db_path) else None
+        snap_mtime = None
+        if self.snapshot_path and os.path.exists(self.snapshot_path):
+            snap_mtime = os.stat(self.snapshot_path).st_mtime_ns
+        if db_mtime is None and snap_mtime is None:
+            raise FileNotFoundError(self.db_path)
+        return db_mtime, snap_mtime
+
+    def load(self):
+        """Carga (o recarga) todas las tablas y publica un snapshot nuevo."""
+        with self._lock:
+            mtime = self._source_mtime()
+            db_revision = self._read_revision() if mtime[0] is not None else None
+            opened = self._open_snapshot(db_revision) if mtime[1] is not None else None
+            self.source = "snapshot" if opened is not None else "sqlite"
+            if opened is None:
+                tables, revision = self._read_tables()
+            else:
+                tables, revision = opened
+            self._version += 1
+            self._snapshot = CatalogSnapshot(tables, self._version, mtime, revision)
+            self._next_check = time.monotonic() + self.check_interval
+
+        sizes = ", ".join(f"{name}={len(table)}" for name, table in tables.items())
+        logger.info("Catálogo v%d cargado desde %s (%s)", self._version, self.source, sizes)
+        return self._snapshot
+
+    def _open_snapshot(self, db_revision):
+        """
+        (tablas, revisión) del snapshot binario, o None si no sirve: ilegible,
+        con otras columnas o exportado de otra revisión de la BD (`db_revision`;
+        None si no hay BD y solo queda el snapshot).
+        """
+        try:
+            meta, raw = read_snapshot(self.snapshot_path)
+        except (OSError, SnapshotError, ValueError, KeyError) as exc:
+            logger.warning("Snapshot %s ilegible, se lee SQLite: %s", self.snapshot_path, exc)
+            return None
+
+        revision = meta.get("source_revision")
+        if revision is None or (db_revision is not None and revision != db_revision):
+            logger.info("Snapshot %s desactualizado respecto a la BD, se lee SQLite", self.snapshot_path)
+            return None
+
+        tables = {}
+        for name, schema in CATALOG_SCHEMA.items():
+            expected = tuple(col for col, _ in schema) + tuple(DERIVED_COLUMNS.get(name, ()))
+            if name not in raw or tuple(col for col, _ in raw[name][0]) != expected:
+                logger.warning("Snapshot %s con un esquema distinto, se lee SQLite", self.snapshot_path)
+                return None
+            snap_schema, data = raw[name]
+            tables[name] = CatalogTable(name, snap_schema, data, CATALOG_INDEXES.get(name, ()))
+        return tables, revision
+
+    @staticmethod
+    def _revision(conn):
+        """Última revisión del registro de cambios; 0 en BDs sin registro."""
+        try:
+            return conn.execute("SELECT MAX(revision) FROM catalog_changes").fetchone()[0] or 0
+        except sqlite3.OperationalError:  # no such table
+            return 0
+
+    def _read_revision(self):
+        conn = sqlite3.connect(self.db_path)
+        try:
+            return self._revision(conn)
+        finally:
+            conn.close()
+
+    def _read_tables(self):
+        """(tablas, revisión) leídas en una misma transacción."""
+        conn = sqlite3.connect(self.db_path)
+        try:
+            # Una sola transacción de lectura: las cinco tablas (y la revisión)
+            # son coherentes aunque el loader esté escribiendo en paralelo.
+            conn.execute("BEGIN")
+            tables = {}
+            for name, schema in CATALOG_SCHEMA.items():
+                cols = ", ".join(col for col, _ in schema)
+                cursor = conn.execute(f"SELECT {cols} FROM {name} ORDER BY id")
+                tables[name] = CatalogTable.from_rows(
+                    name, schema, cursor, CATALOG_INDEXES.get(name, ()), DERIVED_COLUMNS.get(name)
+                )
+            revision = self._revision(conn)
+            conn.execute("COMMIT")
+        finally:
+            conn.close()
+
+        unresolved = sorted({
+            microarch
+            for microarch, socket in zip(tables["cpu"].column("microarchitecture"), tables["cpu"].column("socket"))
+            if socket is None
+        }, key=str)
+        if unresolved:
+            logger.warning("No se pudo determinar el socket para %d microarquitecturas: %s",
+                           len(unresolved), ", ".join(map(str, unresolved)))
+        return tables, revision
+
+    def maybe_reload(self):
+        """
+        Recarga si la BD (o el snapshot binario) cambió desde la última carga.
+        Un mtime distinto solo obliga a mirar la revisión: abrir la BD crea o
+        toca el -wal sin cambiar nada, y eso no debe costar una recarga.
+        """
+        now = time.monotonic()
+        if now < self._next_check:
+            return False
+        self._next_check = now + self.check_interval
+
+        snapshot = self._snapshot
+        try:
+            mtime = self._source_mtime()
+        except OSError:
+            return False
+        if mtime == snapshot.mtime:
+            return False
+
+        try:
+            unchanged = (mtime[0] is not None and mtime[1] == snapshot.mtime[1]
+                         and self._read_revision() == snapshot.revision)
+            if unchanged:
+                snapshot.mtime = mtime  # mismo contenido: no se vuelve a mirar hasta otro cambio
+                return False
+            self.load()
+        except (sqlite3.Error, OSError) as exc:
+            logger.warning("No se pudo recargar el catálogo, se mantiene v%d: %s",
+                           self._snapshot.version, exc)
+            return False
+        return True
+
+    def check_due(self):
+        """True si la próxima llamada a snapshot() puede tocar disco (carga o comprobación de mtime)."""
+        return self._snapshot is None or time.monotonic() >= self._next_check
+
+    def snapshot(self):
+        if self._snapshot is None:
+            return self.load()
+        self.maybe_reload()
+        return self._snapshot
+
+    def table(self, name):
+        return self.snapshot().tables[name]
@@ -0,0 +1,254 @@
+"""
+Exportación columnar del catálogo (/api/catalog).
+
+Para clientes que quieren el catálogo entero (seguimiento de precios,
+frontends sin conexión): en lugar de cinco listas JSON fila a fila, un solo
+cuerpo binario con cada columna empaquetada:
+
+    b"BSC1" | longitud de la cabecera (uint32) | cabecera JSON | relleno | datos
+
+La cabecera trae {"format", "revision", "since", "tables"}; cada tabla es
+{"rows": n, "columns": [...]} y cada columna indica su codificación:
+
+- "range": ids consecutivos, {"start": primer id};
+- "number": array {"type", "offset"} de int8/int16/int32 o float64. Los
+  enteros pueden llevar "scale" (valor = crudo / scale: los precios van en
+  céntimos) y "null" (el crudo que significa NULL); en float64, NaN = NULL;
+- "dict": cadenas repetidas (chipset, socket, form_factor, efficiency...),
+  {"dictionary": [...], "type": uint8/uint16/uint32, "offset"} con el índice
+  en el diccionario de cada fila (el diccionario puede contener null);
+- "text": cadenas casi todas distintas (nombres), {"values": [...]}.
+
+Los arrays son little-endian y sus offsets, relativos al inicio de los datos,
+múltiplos de 8 como ese inicio: un cliente JS los lee sin copiar con
+`new Int16Array(buffer, dataStart + offset, rows)`.
+
+Con `since` (la "revision" de una exportación anterior) solo se incluyen las
+filas insertadas o actualizadas después, según el registro catalog_changes
+que escribe el loader, y la cabecera añade "removed": {tabla: ids} con las
+filas borradas del catálogo desde entonces. "since" es null (y no hay
+"removed") cuando la respuesta es completa.
+"""
+
+import json
+import sqlite3
+import struct
+import sys
+from array import array
+
+MAGIC = b"BSC1"
+FORMAT_VERSION = 1
+ALIGN = 8
+CATALOG_MIMETYPE = "application/vnd.buildsensei.catalog"
+
+# Escalas con las que se prueba a guardar decimales como enteros
+SCALES = (1, 10, 100, 1000)
+
+# (nombre, código de array, mínimo, máximo)
+INT_TYPES = (
+    ("int8", "b", -2**7, 2**7 - 1),
+    ("int16", "h", -2**15, 2**15 - 1),
+    ("int32", "i", -2**31, 2**31 - 1),
+)
+UINT_TYPES = (
+    ("uint8", "B", 0, 2**8 - 1),
+    ("uint16", "H", 0, 2**16 - 1),
+    ("uint32", "I", 0, 2**32 - 1),
+)
+TYPE_CODES = {name: code for name, code, _, _ in INT_TYPES + UINT_TYPES}
+TYPE_CODES["float64"] = "d"
+
+_BIG_ENDIAN = sys.byteorder == "big"
+
+
+def _align(size):
+    return -(-size // ALIGN) * ALIGN
+
+
+def _smallest(types, low, high):
+    """(nombre, código, mínimo, máximo) del tipo más pequeño que cubre [low, high], o None."""
+    for int_type in types:
+        if int_type[2] <= low and high <= int_type[3]:
+            return int_type
+    return None
+
+
+# ------------------------------------------------
+# CODIFICACIÓN DE COLUMNAS
+# ------------------------------------------------
+def pack_numbers(values):
+    """
+    (metadatos, array) de una columna numérica (NaN = NULL): el entero más
+    pequeño con la menor escala que la representa exactamente o, si ninguna
+    sirve, float64.
+    """
+    present = [value for value in values if value == value]
+    has_null = len(present) < len(values)
+    for scale in SCALES:
+        scaled = [round(value * scale) for value in present]
+        if not all(raw / scale == value for raw, value in zip(scaled, present)):
+            continue
+        low, high = min(scaled, default=0), max(scaled, default=0)
+        # Con NULLs, el mínimo del tipo queda reservado como marca
+        found = _smallest(INT_TYPES, low - 1 if has_null else low, high)
+        if found is None:
+            break  # exacto pero fuera de rango: escalas mayores tampoco caben
+        name, code, null, _ = found
+        meta = {"encoding": "number", "type": name}
+        if scale != 1:
+            meta["scale"] = scale
+        if has_null:
+            meta["null"] = null
+        return meta, array(code, (round(value * scale) if value == value else null for value in values))
+    return {"encoding": "number", "type": "float64"}, array("d", values)
+
+
+def pack_text(values):
+    """
+    (metadatos, array o None) de una columna de texto: con diccionario si los
+    valores se repiten (como mucho la mitad distintos); si no, tal cual.
+    """
+    distinct = set(values)
+    if len(distinct) * 2 > len(values):
+        return {"encoding": "text", "values": list(values)}, None
+    dictionary = sorted(distinct, key=lambda value: (value is not None, value or ""))
+    codes = {value: i for i, value in enumerate(dictionary)}
+    name, code, _, _ = _smallest(UINT_TYPES, 0, len(dictionary) - 1)
+    return ({"encoding": "dict", "dictionary": dictionary, "type": name},
+            array(code, (codes[value] for value in values)))
+
+
+def pack_ids(ids):
+    """Ids ordenados: un rango si son consecutivos, si no un array de enteros."""
+    if ids and ids[-1] - ids[0] == len(ids) - 1:
+        return {"encoding": "range", "start": ids[0]}, None
+    return pack_numbers(ids)
+
+
+# ------------------------------------------------
+# CUERPO COMPLETO Y DELTA
+# ------------------------------------------------
+def encode_catalog(snapshot, positions=None, since=None, removed=None):
+    """
+    Cuerpo binario con las tablas del snapshot. `positions` ({tabla:
+    posiciones ordenadas}) limita cada tabla a esas filas y `removed` ({tabla:
+    ids}) lista las borradas (delta desde `since`).
+    """
+    header = {"format": FORMAT_VERSION, "revision": snapshot.revision, "since": since, "tables": {}}
+    if positions is not None:
+        header["removed"] = removed or {}
+    buffers = []
+    offset = 0
+    for name, table in snapshot.tables.items():
+        rows = None if positions is None else positions.get(name, [])
+        columns = []
+        for column in table.columns:
+            values = table.column(column)
+            if rows is not None:
+                values = [values[pos] for pos in rows]
+            if column == "id":
+                meta, data = pack_ids(values)
+            elif table.types[column] == "text":
+                meta, data = pack_text(values)
+            else:
+                meta, data = pack_numbers(values)
+            if data is not None:
+                if _BIG_ENDIAN and data.itemsize > 1:
+                    data.byteswap()
+                meta["offset"] = offset
+                raw = data.tobytes()
+                buffers.append(raw + bytes(_align(len(raw)) - len(raw)))
+                offset += _align(len(raw))
+            columns.append({"name": column, **meta})
+        header["tables"][name] = {"rows": len(table) if rows is None else len(rows), "columns": columns}
+
+    head = json.dumps(header, ensure_ascii=False, separators=(",", ":")).encode("utf-8")
+    prefix = MAGIC + struct.pack("<I", len(head)) + head
+    return b"".join([prefix, bytes(_align(len(prefix)) - len(prefix)), *buffers])
+
+
+def effective_since(conn, since):
+    """
+    Última revisión registrada <= `since` (0 si no hay): las deltas desde
+    revisiones sin cambios intermedios son iguales y comparten caché.
+    """
+    try:
+        row = conn.execute("SELECT MAX(revision) FROM catalog_changes WHERE revision <= ?", (since,)).fetchone()
+    except sqlite3.OperationalError:  # BD sin registro de cambios
+        return 0
+    return row[0] or 0
+
+
+def recent_revisions(conn, count):
+    """Las `count` últimas revisiones registradas: las únicas deltas que se cachean."""
+    try:
+        cursor = conn.execute("SELECT DISTINCT revision FROM catalog_changes ORDER BY revision DESC LIMIT ?",
+                              (count,))
+    except sqlite3.OperationalError:  # BD sin registro de cambios
+        return set()
+    return {row[0] for row in cursor}
+
+
+def changed_rows(conn, snapshot, since):
+    """
+    ({tabla: posiciones}, {tabla: ids}) de las filas cambiadas en (since,
+    snapshot.revision]: las que siguen en el snapshot y las borradas.
+    """
+    if since >= snapshot.revision:
+        return {}, {}
+    cursor = conn.execute(
+        "SELECT DISTINCT table_name, row_id FROM catalog_changes WHERE revision > ? AND revision <= ?",
+        (since, snapshot.revision),
+    )
+    positions, removed = {}, {}
+    for table_name, row_id in cursor:
+        table = snapshot.tables.get(table_name)
+        if table is None:
+            continue
+        pos = table.position(row_id)
+        if pos is not None:
+            positions.setdefault(table_name, []).append(pos)
+        else:
+            removed.setdefault(table_name, []).append(row_id)
+    return ({table_name: sorted(found) for table_name, found in positions.items()},
+            {table_name: sorted(ids) for table_name, ids in removed.items()})
+
+
+# ------------------------------------------------
+# LECTURA (CLIENTES EN PYTHON)
+# ------------------------------------------------
+def decode_catalog(body):
+    """(cabecera, {tabla: {columna: valores}}) de un cuerpo de encode_catalog; NULL -> None."""
+    if body[:4] != MAGIC:
+        raise ValueError("No es una exportación de catálogo de BuildSensei")
+    (length,) = struct.unpack_from("<I", body, 4)
+    header = json.loads(body[8:8 + length])
+    start = _align(8 + length)
+
+    tables = {}
+    for name, info in header["tables"].items():
+        rows = info["rows"]
+        columns = {}
+        for meta in info["columns"]:
+            encoding = meta["encoding"]
+            if encoding == "range":
+                values = list(range(meta["start"], meta["start"] + rows))
+            elif encoding == "text":
+                values = meta["values"]
+            else:
+                data = array(TYPE_CODES[meta["type"]])
+                begin = start + meta["offset"]
+                data.frombytes(body[begin:begin + rows * data.itemsize])
+                if _BIG_ENDIAN and data.itemsize > 1:
+                    data.byteswap()
+                if encoding == "dict":
+                    dictionary = meta["dictionary"]
+                    values = [dictionary[code] for code in data]
+                elif meta["type"] == "float64":
+                    values = [None if value != value else value for value in data]
+                else:
+                    scale, null = meta.get("scale", 1), meta.get("null")
+                    values = [None if raw == null else (raw if scale == 1 else raw / scale) for raw in data]
+            columns[meta["name"]] = values
+        tables[name] = columns
+    return header, tables
@@ -0,0 +1,161 @@
+"""
+Snapshot binario del catálogo, pensado para abrirse con mmap.
+
+El paso de exportación escribe las tablas ya normalizadas (incluidas las
+columnas derivadas, como el socket del CPU) en un único archivo:
+
+    cabecera fija | cabecera JSON | relleno | secciones de datos (alineadas a 8)
+
+- columnas numéricas: arrays contiguos (int64 para `id`, float64 con NaN = NULL);
+- columnas de texto: códigos int32 sobre una tabla de cadenas común a todas
+  las tablas (-1 = NULL), guardada como UTF-8 separado por NUL.
+
+Al abrirlo, las columnas numéricas son memoryviews sobre el mmap (sin copia:
+varios procesos comparten las mismas páginas de la page cache); solo la tabla
+de cadenas y los códigos de texto se convierten a objetos Python.
+
+Uso (desde la raíz del repo, tras cargar la BD):
+    python backend/catalog_snapshot.py [--db RUTA] [--out RUTA]
+"""
+
+import json
+import mmap
+import os
+import struct
+import sys
+import time
+from array import array
+
+MAGIC = b"BSCATLG\0"
+FORMAT_VERSION = 1
+# magic, versión de formato, longitud de la cabecera JSON
+_HEADER = struct.Struct("<8sII")
+_ALIGN = 8
+
+DEFAULT_SNAPSHOT_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "database", "catalog.snap")
+
+
+class SnapshotError(ValueError):
+    """El archivo no es un snapshot legible por esta versión."""
+
+
+def _aligned(offset):
+    return -(-offset // _ALIGN) * _ALIGN
+
+
+def write_snapshot(tables, path, source_revision):
+    """
+    Escribe `tables` (nombre -> CatalogTable) en `path` de forma atómica.
+    `source_revision` es la revisión de la BD (catalog_changes) de la que
+    salen los datos: el snapshot solo se usa mientras la BD siga en ella.
+    """
+    strings = {}
+    sections = []
+    offset = 0
+
+    def add_section(data):
+        nonlocal offset
+        start = offset
+        blob = data.tobytes() if isinstance(data, array) else data
+        sections.append((start, blob))
+        offset = _aligned(start + len(blob))
+        return start, len(blob)
+
+    meta_tables = {}
+    for name, table in tables.items():
+        columns = []
+        for col in table.columns:
+            kind = table.types[col]
+            raw = table.column(col)
+            if kind == "text":
+                data = array("i", (-1 if v is None else strings.setdefault(v, len(strings)) for v in raw))
+            elif col == "id":
+                data = array("q", raw)
+            else:
+                data = array("d", raw)
+            start, length = add_section(data)
+            columns.append({"name": col, "kind": kind, "typecode": data.typecode,
+                            "offset": start, "length": length})
+        meta_tables[name] = {"rows": len(table), "columns": columns}
+
+    if any("\0" in s for s in strings):
+        raise SnapshotError("Hay cadenas con NUL; no se pueden guardar en la tabla de cadenas")
+    start, length = add_section("\0".join(strings).encode("utf-8"))
+
+    header = json.dumps({
+        "byteorder": sys.byteorder,
+        "source_revision": source_revision,
+        "created_at": time.time(),
+        "strings": {"offset": start, "length": length, "count": len(strings)},
+        "tables": meta_tables,
+    }, separators=(",", ":")).encode("utf-8")
+    base = _aligned(_HEADER.size + len(header))
+
+    tmp_path = f"{path}.tmp{os.getpid()}"
+    with open(tmp_path, "wb") as f:
+        f.write(_HEADER.pack(MAGIC, FORMAT_VERSION, len(header)))
+        f.write(header)
+        for start, blob in sections:
+            f.seek(base + start)
+            f.write(blob)
+    os.replace(tmp_path, path)
+
+
+def read_snapshot(path):
+    """
+    Abre un snapshot. Devuelve (meta, {tabla: (schema, data)}), con `data`
+    en el formato que espera CatalogTable.
+    """
+    with open(path, "rb") as f:
+        mm = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+    view = memoryview(mm)
+
+    if len(mm) < _HEADER.size:
+        raise SnapshotError(f"{path}: archivo truncado")
+    magic, version, header_length = _HEADER.unpack_from(mm, 0)
+    if magic != MAGIC or version != FORMAT_VERSION:
+        raise SnapshotError(f"{path}: formato desconocido (versión {version})")
+    meta = json.loads(bytes(view[_HEADER.size:_HEADER.size + header_length]))
+    if meta["byteorder"] != sys.byteorder:
+        raise SnapshotError(f"{path}: generado con otro orden de bytes")
+    base = _aligned(_HEADER.size + header_length)
+
+    def section(start, length):
+        return view[base + start:base + start + length]
+
+    info = meta["strings"]
+    strings = bytes(section(info["offset"], info["length"])).decode("utf-8").split("\0") if info["count"] else []
+    strings.append(None)  # el código -1 apunta aquí
+    lookup = strings.__getitem__
+
+    tables = {}
+    for name, table in meta["tables"].items():
+        schema, data = [], {}
+        for col in table["columns"]:
+            values = section(col["offset"], col["length"]).cast(col["typecode"])
+            data[col["name"]] = list(map(lookup, values)) if col["kind"] == "text" else values
+            schema.append((col["name"], col["kind"]))
+        tables[name] = (tuple(schema), data)
+    return meta, tables
+
+
+def main():
+    import argparse
+
+    from catalog import ComponentCatalog
+
+    default_db = os.path.join(os.path.dirname(os.path.abspath(__file__)), "database", "buildsensei.db")
+    parser = argparse.ArgumentParser(description="Exporta el catálogo a un snapshot binario mmap-able.")
+    parser.add_argument("--db", default=default_db, help="BD SQLite de origen")
+    parser.add_argument("--out", default=DEFAULT_SNAPSHOT_PATH, help="archivo de salida")
+    args = parser.parse_args()
+
+    start = time.perf_counter()
+    snapshot = ComponentCatalog(args.db).load()  # tablas y revisión de una misma transacción
+    write_snapshot(snapshot.tables, args.out, snapshot.revision)
+    size = os.path.getsize(args.out)
+    print(f"✔ Snapshot escrito en {args.out} ({size / 1024:.0f} KiB, {time.perf_counter() - start:.2f}s)")
+
+
+if __name__ == "__main__":
+    main()
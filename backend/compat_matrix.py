@@ -0,0 +1,131 @@
+"""
+Matrices de compatibilidad sobre todo el catálogo (NumPy).
+
+Responde preguntas del tipo "qué motherboards sirven para este CPU" o "qué
+PSUs alcanzan para esta GPU" sin evaluar builds una a una. Las columnas del
+catálogo se convierten a arrays y las máscaras se calculan por broadcasting.
+Para no materializar matrices enormes (13.5k memorias x 5k placas) cada regla
+se calcula sobre las claves distintas que la determinan (socket, número de
+módulos, TDP de la GPU) y cada fila apunta a su clave.
+"""
+
+import numpy as np
+
+from compatibility import (
+    COMPONENT_TABLES, CPU_POWER_TDP, PSU_SAFETY_MARGIN, get_gpu_power,
+)
+
+
+def _codes(values):
+    """Codifica cadenas (sin distinguir mayúsculas) como enteros; None -> -1."""
+    vocabulary = {}
+    codes = np.empty(len(values), dtype=np.int32)
+    for i, value in enumerate(values):
+        if value is None:
+            codes[i] = -1
+        else:
+            codes[i] = vocabulary.setdefault(value.lower(), len(vocabulary))
+    return codes, vocabulary
+
+
+def _group(keys):
+    """(claves distintas, índice de grupo por fila) para un array de claves."""
+    return np.unique(keys, return_inverse=True)
+
+
+class CompatibilityMatrix:
+    """Máscaras de compatibilidad precalculadas para un snapshot del catálogo."""
+
+    def __init__(self, snapshot):
+        cpus = snapshot["cpu"]
+        boards = snapshot["motherboard"]
+        memory = snapshot["memory"]
+        gpus = snapshot["video_card"]
+        psus = snapshot["power_supply"]
+
+        self.ids = {
+            kind: np.frombuffer(snapshot[table].column("id"), dtype=np.int64)
+            for kind, table in COMPONENT_TABLES.items()
+        }
+        self.positions = {kind: snapshot[table].position for kind, table in COMPONENT_TABLES.items()}
+
+        # ---- CPU ↔ Motherboard: socket ----
+        sockets = list(cpus.column("socket")) + list(boards.column("socket"))
+        socket_codes, vocabulary = _codes(sockets)
+        self.cpu_socket = socket_codes[:len(cpus)]
+        self.board_socket = socket_codes[len(cpus):]
+        socket_ids = np.arange(len(vocabulary))
+        # (socket, placa): la placa usa ese socket
+        self.socket_board = socket_ids[:, None] == self.board_socket[None, :]
+
+        # ---- Memoria ↔ Motherboard: módulos <= slots ----
+        slots = np.nan_to_num(np.frombuffer(boards.column("memory_slots")), nan=0).astype(np.int32)
+        modules = np.nan_to_num(np.frombuffer(memory.column("module_count")), nan=0).astype(np.int32)
+        self.module_values, self.memory_group = _group(modules)
+        self.board_slots = slots
+        # (número de módulos, placa)
+        self.modules_board = self.module_values[:, None] <= slots[None, :]
+
+        # ---- GPU (+ CPU) ↔ PSU: vatios >= (TDP GPU + TDP CPU) * margen ----
+        tdp = np.fromiter((get_gpu_power(c) for c in gpus.column("chipset")),
+                          dtype=np.float64, count=len(gpus))
+        self.tdp_values, self.gpu_group = _group(tdp)
+        self.psu_wattage = np.nan_to_num(np.frombuffer(psus.column("wattage")), nan=-1.0)
+        required = (self.tdp_values + CPU_POWER_TDP) * PSU_SAFETY_MARGIN
+        # (TDP de GPU, PSU)
+        self.tdp_psu = self.psu_wattage[None, :] >= required[:, None]
+
+    # ------------------------------------------------
+    # CONSULTAS POR POSICIÓN
+    # ------------------------------------------------
+    def boards_for_cpu(self, pos):
+        socket = self.cpu_socket[pos]
+        if socket < 0:
+            return np.zeros(len(self.board_socket), dtype=bool)
+        return self.socket_board[socket]
+
+    def cpus_for_board(self, pos):
+        socket = self.board_socket[pos]
+        return (self.cpu_socket == socket) if socket >= 0 else np.zeros(len(self.cpu_socket), dtype=bool)
+
+    def boards_for_memory(self, pos):
+        return self.modules_board[self.memory_group[pos]]
+
+    def memory_for_board(self, pos):
+        return self.modules_board[:, pos][self.memory_group]
+
+    def psus_for_gpu(self, pos):
+        return self.tdp_psu[self.gpu_group[pos]]
+
+    def gpus_for_psu(self, pos):
+        return self.tdp_psu[:, pos][self.gpu_group]
+
+    # ------------------------------------------------
+    # CONSULTAS POR ID
+    # ------------------------------------------------
+    def compatible(self, kind, row_id):
+        """
+        Ids compatibles con el componente `kind`/`row_id`, agrupados por tipo.
+        Devuelve None si el componente no existe.
+        """
+        pos = self.positions[kind](row_id)
+        if pos is None:
+            return None
+
+        if kind == "cpu":
+            masks = {"motherboard": self.boards_for_cpu(pos)}
+        elif kind == "motherboard":
+            masks = {"cpu": self.cpus_for_board(pos), "memory": self.memory_for_board(pos)}
+        elif kind == "memory":
+            masks = {"motherboard": self.boards_for_memory(pos)}
+        elif kind == "gpu":
+            masks = {"psu": self.psus_for_gpu(pos)}
+        else:
+            masks = {"gpu": self.gpus_for_psu(pos)}
+
+        return {other: self.ids[other][mask].tolist() for other, mask in masks.items()}
+
+
+def get_matrix(snapshot):
+    """Matriz del snapshot, construida la primera vez que se pide."""
+    return snapshot.derived("compat_matrix", CompatibilityMatrix)
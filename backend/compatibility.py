@@ -0,0 +1,597 @@
+"""
+Reglas de compatibilidad de BuildSensei.
+
+Resuelve los componentes de una build contra un snapshot del catálogo y
+evalúa socket, slots de RAM, potencia de la PSU y cuello de botella. Lo usan
+tanto `/api/check-compatibility` (una build) como el endpoint por lotes.
+"""
+
+import asyncio
+import logging
+import math
+import time
+from collections import namedtuple
+
+from catalog import CATALOG_SCHEMA, DERIVED_COLUMNS, CatalogTable
+from gpu_benchmarks import GPU_RESOLVER, get_gpu_benchmark_url
+from metrics import LOOKUP_SECONDS, STAGE_SECONDS
+
+logger = logging.getLogger(__name__)
+
+CPU_POWER_TDP = 125  # TDP estimado por defecto para CPUs
+PSU_SAFETY_MARGIN = 1.25  # Margen de seguridad del 25%
+PSU_TIGHT_MARGIN = 1.5
+
+# Tipo de componente en una build -> tabla del catálogo
+COMPONENT_TABLES = {
+    "cpu": "cpu",
+    "motherboard": "motherboard",
+    "memory": "memory",
+    "gpu": "video_card",
+    "psu": "power_supply",
+}
+
+BuildParts = namedtuple("BuildParts", ["cpu", "gpu", "motherboard", "memory", "psu"])
+
+
+class BuildError(ValueError):
+    """Build inválida: componente no encontrado o dato que no se puede interpretar."""
+
+
+# ------------------------------------------------
+# FUNCIONES DE LIMPIEZA
+# ------------------------------------------------
+def safe_number(value):
+    if value is None:
+        return None
+
+    if isinstance(value, str):
+        value = value.replace(",", ".").strip()
+
+    try:
+        num = float(value)
+        if num.is_integer():
+            return int(num)
+        return num
+    except (ValueError, OverflowError):
+        return None
+
+
+def get_gpu_power(gpu_name):
+    """
+    Obtiene el consumo de potencia aproximado (TDP) de una GPU.
+    La resolución (exacta, parcial y heurística) la hace GPU_RESOLVER.
+    """
+    if not gpu_name:
+        return 0
+    return GPU_RESOLVER.resolve(gpu_name).tdp
+
+
+# ---------------------------
+# NUEVA FUNCIÓN: BOTTLENECK
+# ---------------------------
+# Umbrales de la heurística. bottleneck.py los evalúa sobre arrays (todas las
+# GPUs para una CPU de una vez): cualquier cambio aquí vale para los dos caminos.
+HIGH_END_CPU_SCORE = 80      # core-GHz
+HIGH_END_GPU_TDP = 400
+FEW_CORES = 4
+DEMANDING_GPU_TDP = 300
+LOW_BOOST_GHZ = 3.5
+FAST_GPU_TDP = 350
+MANY_CORES = 10
+LIGHT_GPU_TDP = 200
+GPU_TDP_SCALE = 50.0         # normaliza gpu_tdp a la escala del score de CPU
+GPU_BOUND_RATIO = 12.0
+CPU_BOUND_RATIO = 1.8
+
+# Reglas en orden de evaluación: (result, summary, claves de details, nota)
+BOTTLENECK_RULES = (
+    ("no_significant_bottleneck",
+     "Combo de alta gama: no se detecta un cuello de botella significativo.",
+     ("cpu_score", "gpu_tdp", "cpu_cores", "cpu_boost_ghz"), None),
+    ("possible_cpu_bottleneck",
+     "La CPU podría limitar el rendimiento frente a esta GPU (CPU con pocos núcleos).",
+     ("cpu_cores", "cpu_boost_ghz", "cpu_tdp", "gpu_tdp"), "GPU de alta demanda vs CPU con pocos núcleos."),
+    ("possible_cpu_bottleneck",
+     "La frecuencia de la CPU puede ser limitada para esta GPU.",
+     ("cpu_cores", "cpu_boost_ghz", "cpu_tdp", "gpu_tdp"), "Frecuencia boost baja vs GPU potente."),
+    ("possible_gpu_bottleneck",
+     "La GPU podría limitar el rendimiento frente a esta CPU.",
+     ("cpu_cores", "cpu_boost_ghz", "cpu_tdp", "gpu_tdp"), "CPU relativamente potente vs GPU de baja demanda."),
+    ("possible_gpu_bottleneck",
+     "La CPU es mucho más potente que la GPU; la GPU podría ser el cuello de botella.",
+     ("cpu_score", "gpu_tdp", "cpu_cores", "cpu_boost_ghz"), "Relación CPU/GPU elevada."),
+    ("possible_cpu_bottleneck",
+     "La relación CPU/GPU sugiere que la CPU podría limitar el rendimiento en algunos escenarios.",
+     ("cpu_score", "gpu_tdp", "cpu_cores", "cpu_boost_ghz"), "Relación aproximada entre capacidad CPU y demanda GPU."),
+    ("no_significant_bottleneck",
+     "No se detecta un cuello de botella evidente entre CPU y GPU.",
+     ("cpu_cores", "cpu_boost_ghz", "cpu_tdp", "gpu_tdp"), None),
+)
+
+
+def cpu_features(cpu_cores, cpu_boost_ghz):
+    """(núcleos, boost, score) normalizados como los usa la heurística."""
+    cores = int(cpu_cores) if cpu_cores else 0
+    boost = float(cpu_boost_ghz) if cpu_boost_ghz else 0.0
+    return cores, boost, cores * boost  # score: proxy simple en core-GHz
+
+
+def bottleneck_rule(cores, boost, cpu_score, gpu_tdp):
+    """Índice en BOTTLENECK_RULES de la primera regla que se cumple."""
+    # Regla explícita: combos de muy alta gama se consideran balanceados
+    if cpu_score >= HIGH_END_CPU_SCORE and gpu_tdp >= HIGH_END_GPU_TDP:
+        return 0
+    # Casos claros (CPU limita GPU)
+    if cores <= FEW_CORES and gpu_tdp >= DEMANDING_GPU_TDP:
+        return 1
+    if boost < LOW_BOOST_GHZ and gpu_tdp >= FAST_GPU_TDP:
+        return 2
+    # GPU limita CPU — GPU débiles frente a CPUs muy potentes
+    if cores >= MANY_CORES and gpu_tdp <= LIGHT_GPU_TDP:
+        return 3
+    # Heurística general: relación CPU/GPU (menos sensible)
+    rel = cpu_score / max(1.0, gpu_tdp / GPU_TDP_SCALE)
+    if rel > GPU_BOUND_RATIO:
+        return 4
+    if gpu_tdp > 0 and rel < CPU_BOUND_RATIO:
+        return 5
+    return 6
+
+
+def bottleneck_verdict(rule, cores, boost, cpu_score, cpu_tdp, gpu_tdp):
+    """Resultado { result, summary, details } de la regla `rule`."""
+    result, summary, keys, note = BOTTLENECK_RULES[rule]
+    values = {
+        "cpu_score": round(cpu_score, 1),
+        "cpu_cores": cores,
+        "cpu_boost_ghz": boost,
+        "cpu_tdp": cpu_tdp,
+        "gpu_tdp": gpu_tdp,
+    }
+    details = {key: values[key] for key in keys}
+    if note:
+        details["note"] = note
+    return {"result": result, "summary": summary, "details": details}
+
+
+def detect_bottleneck(cpu_cores, cpu_boost_ghz, cpu_tdp, gpu_tdp, gpu_chipset=None):
+    """
+    Heurística ajustada para detectar cuellos de botella.
+    Devuelve: { result, summary, details }
+    Ajustes principales:
+     - Umbrales menos sensibles para marcar "CPU significativamente superior".
+     - Regla explícita de "balanced" para CPUs y GPUs de muy alta gama.
+     - Summary legible y detalles numéricos separados.
+    """
+    cores, boost, cpu_score = cpu_features(cpu_cores, cpu_boost_ghz)
+    cpu_tdp = safe_number(cpu_tdp) or 0
+    gpu_tdp = safe_number(gpu_tdp) or 0
+    rule = bottleneck_rule(cores, boost, cpu_score, gpu_tdp)
+    return bottleneck_verdict(rule, cores, boost, cpu_score, cpu_tdp, gpu_tdp)
+
+
+# ------------------------------------------------
+# RESOLUCIÓN DE COMPONENTES
+# ------------------------------------------------
+# Columna con la que se busca cada tipo por texto (clientes anteriores a los
+# ids). La PSU solo se busca por id; la GPU por chipset devuelve la primera
+# tarjeta de ese chipset, no una concreta.
+NAME_COLUMNS = {
+    "gpu": "chipset",
+    "cpu": "name",
+    "motherboard": "name",
+    "memory": "name",
+}
+
+
+class ComponentLookup:
+    """
+    Búsquedas de componentes sobre un snapshot, memorizadas por clave: un id
+    entero se resuelve por clave primaria y un texto por NAME_COLUMNS.
+
+    Para lotes, `prefetch` resuelve de una vez el conjunto de claves distintas
+    de cada tipo, así cada componente repetido se busca una sola vez.
+    """
+
+    def __init__(self, snapshot):
+        self.snapshot = snapshot
+        self._tables = {kind: snapshot[table] for kind, table in COMPONENT_TABLES.items()}
+        self._memo = {kind: {} for kind in COMPONENT_TABLES}
+
+    def _find(self, kind, key):
+        table = self._tables[kind]
+        if isinstance(key, int):
+            return table.get(key)
+        column = NAME_COLUMNS.get(kind)
+        return table.find(column, key) if column else None
+
+    def find(self, kind, key):
+        memo = self._memo[kind]
+        try:
+            return memo[key]
+        except KeyError:
+            row = memo[key] = self._find(kind, key)
+            return row
+        except TypeError:  # clave no hashable (p. ej. lista en un JSON)
+            return None
+
+    def prefetch(self, builds):
+        for kind, memo in self._memo.items():
+            keys = set()
+            for build in builds:
+                if not isinstance(build, dict):
+                    continue
+                key = _lookup_key(build, kind)
+                if isinstance(key, (str, int)):
+                    keys.add(key)
+            memo.update((key, self._find(kind, key)) for key in keys - memo.keys())
+
+
+class PoolLookup:
+    """
+    Las mismas búsquedas que ComponentLookup, pero con una consulta a SQLite
+    por componente sobre el pool de conexiones de solo lectura. Devuelve filas
+    con la misma forma que las del catálogo (columnas derivadas incluidas).
+    Cada `find` bloquea: pensado para resolve_build_async con un pool de hilos.
+    """
+
+    def __init__(self, pool):
+        self.pool = pool
+
+    def find(self, kind, key):
+        if isinstance(key, int):
+            column = "id"
+        elif isinstance(key, str) and kind in NAME_COLUMNS:
+            column = NAME_COLUMNS[kind]
+        else:
+            return None
+        table = COMPONENT_TABLES[kind]
+        schema = CATALOG_SCHEMA[table]
+        cols = ", ".join(col for col, _ in schema)
+        # ORDER BY id: la misma fila que devuelve el índice del catálogo
+        query = f"SELECT {cols} FROM {table} WHERE {column} = ? ORDER BY id LIMIT 1"
+        with self.pool.connection() as conn:
+            rows = conn.execute(query, (key,)).fetchall()
+        if not rows:
+            return None
+        return CatalogTable.from_rows(table, schema, rows, derived=DERIVED_COLUMNS.get(table)).row(0)
+
+
+def parse_psu_id(psu):
+    """Id de PSU, o None si no es un número finito ("nan", "inf", "1e400"...)."""
+    if not isinstance(psu, (str, int, float)):
+        return None
+    psu_id = safe_number(psu)
+    return int(psu_id) if psu_id is not None and math.isfinite(psu_id) else None
+
+
+def parse_component_key(value):
+    """
+    Clave de búsqueda de un componente: id entero si `value` es un entero o
+    un texto de dígitos; si no, el valor tal cual (nombre, o chipset de GPU).
+    """
+    if isinstance(value, bool):
+        return None
+    if isinstance(value, str) and value.isdigit():
+        return int(value)
+    return value
+
+
+def _lookup_key(build, kind):
+    value = build.get(kind)
+    return parse_psu_id(value) if kind == "psu" else parse_component_key(value)
+
+
+def build_key(build):
+    """
+    Build normalizada (cpu, gpu, motherboard, memoria, PSU; ids o nombres):
+    dos peticiones con la misma clave obtienen el mismo resultado.
+    """
+    return tuple(_lookup_key(build, kind) for kind in BuildParts._fields)
+
+
+def _timed_find(lookup, kind, key):
+    start = time.perf_counter()
+    row = lookup.find(kind, key)
+    LOOKUP_SECONDS.observe(time.perf_counter() - start, kind)
+    return row
+
+
+# Orden en que se resuelven (y se comprueban) los componentes de una build,
+# con el error si no se encuentran.
+RESOLUTION_ORDER = (
+    ("gpu", "GPU no encontrada"),
+    ("cpu", "CPU no encontrada"),
+    ("motherboard", "Motherboard no encontrada"),
+    ("psu", "PSU no encontrada"),
+    ("memory", "Memoria no encontrada"),
+)
+INVALID_PSU = "PSU inválida o no especificada (se espera id numérico)."
+
+
+def resolve_build(lookup, build):
+    """
+    Devuelve BuildParts para un dict {cpu, gpu, motherboard, memory, psu} de
+    ids (enteros o texto numérico). Por compatibilidad se aceptan también
+    nombres y, para la GPU, el chipset; la PSU siempre es un id. Lanza
+    BuildError si algo falla.
+    """
+    found = {}
+    for kind, not_found in RESOLUTION_ORDER:
+        key = _lookup_key(build, kind)
+        if kind == "psu" and key is None:
+            raise BuildError(INVALID_PSU)
+        row = found[kind] = _timed_find(lookup, kind, key)
+        if not row:
+            raise BuildError(not_found)
+    return BuildParts(**found)
+
+
+async def resolve_build_async(lookup, build, run=None):
+    """
+    Como resolve_build, pero lanza las cinco búsquedas a la vez. `run(func,
+    *args)` ejecuta una búsqueda bloqueante y devuelve un awaitable (p. ej.
+    `loop.run_in_executor` sobre un pool de hilos); sin `run` se resuelven en
+    línea, que es lo adecuado para el catálogo en memoria. Los errores se
+    comprueban en el mismo orden que en resolve_build.
+    """
+    keys = {kind: _lookup_key(build, kind) for kind, _ in RESOLUTION_ORDER}
+    pending = [kind for kind, key in keys.items() if not (kind == "psu" and key is None)]
+    if run is None:
+        rows = [_timed_find(lookup, kind, keys[kind]) for kind in pending]
+    else:
+        rows = await asyncio.gather(*(run(_timed_find, lookup, kind, keys[kind]) for kind in pending))
+    found = dict(zip(pending, rows))
+
+    for kind, not_found in RESOLUTION_ORDER:
+        if kind not in found:
+            raise BuildError(INVALID_PSU)
+        if not found[kind]:
+            raise BuildError(not_found)
+    return BuildParts(**found)
+
+
+def resolve_ids(snapshot, ids):
+    """
+    BuildParts por clave primaria: `ids` es {cpu, gpu, motherboard, memory,
+    psu} -> id de su tabla (así se guardan las builds). Lanza BuildError si
+    algún id no existe en el snapshot.
+    """
+    found = {}
+    for kind, not_found in RESOLUTION_ORDER:
+        row = found[kind] = snapshot[COMPONENT_TABLES[kind]].get(ids[kind])
+        if not row:
+            raise BuildError(not_found)
+    return BuildParts(**found)
+
+
+# ------------------------------------------------
+# EVALUACIÓN
+# ------------------------------------------------
+def _memoized(memo, key, compute, *args):
+    """compute(*args), guardado en `memo` bajo `key` si hay memo."""
+    if memo is None:
+        return compute(*args)
+    try:
+        return memo[key]
+    except KeyError:
+        value = memo[key] = compute(*args)
+        return value
+
+
+def socket_analysis(cpu, mb):
+    """Issues de CPU ↔ Motherboard (socket resuelto al cargar el catálogo con deduce_socket)."""
+    cpu_socket = cpu.socket
+    if cpu_socket is None:
+        return [f"No se pudo determinar el socket del CPU ({cpu.microarchitecture})."]
+    if cpu_socket.lower() != mb.socket.lower():
+        return [f"El CPU ({cpu.name}) requiere socket {cpu_socket}, pero la motherboard usa {mb.socket}."]
+    return []
+
+
+def memory_analysis(ram, mb):
+    """RAM ↔ Motherboard: (módulos, slots, issues, warnings). Lanza BuildError si no se entiende la RAM."""
+    issues = []
+    warnings = []
+
+    module_count = ram.module_count
+    if module_count is None:
+        raise BuildError(f"No se pudo interpretar la cantidad de módulos RAM: '{ram.modules}'")
+
+    # Asegurar que mb_slots es un número entero
+    mb_slots_int = safe_number(mb.memory_slots) if mb.memory_slots else 0
+    if not isinstance(mb_slots_int, int) or mb_slots_int <= 0:
+        mb_slots_int = int(mb_slots_int) if mb_slots_int else 0
+
+    module_count_int = int(module_count) if module_count else 0
+
+    if module_count_int > mb_slots_int:
+        issues.append(
+            f"Incompatibilidad de RAM: Se requieren {module_count_int} módulos, "
+            f"pero la motherboard solo tiene {mb_slots_int} slots."
+        )
+    elif module_count_int == mb_slots_int and mb_slots_int > 0:
+        # Compatible, solo agregar warning
+        warnings.append(
+            f"Uso máximo de slots: La RAM usa todos los {mb_slots_int} slots disponibles. "
+            f"No hay espacio para ampliación futura."
+        )
+    elif mb_slots_int - module_count_int == 1:
+        # Sin warning si hay 2+ slots libres
+        warnings.append(
+            f"Slot disponible: La RAM usa {module_count_int} de {mb_slots_int} slots. "
+            f"Queda 1 slot libre para ampliación."
+        )
+    return module_count, mb_slots_int, issues, warnings
+
+
+def power_analysis(gpu_chipset, psu):
+    """PSU ↔ GPU (análisis con TDP): (power_analysis, issues, warnings)."""
+    issues = []
+    warnings = []
+
+    gpu_power_tdp = get_gpu_power(gpu_chipset)
+    psu_wattage = safe_number(psu.wattage)
+    cpu_power_tdp = CPU_POWER_TDP
+    total_power_needed = gpu_power_tdp + cpu_power_tdp
+    required_psu = total_power_needed * PSU_SAFETY_MARGIN
+
+    logger.debug("Potencia: GPU %s=%sW, CPU=%sW, total=%sW, requerido=%dW, PSU=%sW",
+                 gpu_chipset, gpu_power_tdp, cpu_power_tdp, total_power_needed,
+                 int(required_psu), psu_wattage)
+
+    if psu_wattage < required_psu:
+        issues.append(
+            f"PSU insuficiente. GPU ({gpu_power_tdp}W TDP) + CPU ({cpu_power_tdp}W TDP) = {total_power_needed}W. "
+            f"Se recomienda PSU de {int(required_psu)}W (con 25% margen), pero tienes {psu_wattage}W."
+        )
+    elif psu_wattage < total_power_needed * PSU_TIGHT_MARGIN:
+        warnings.append(
+            f"PSU ajustada. Consumo estimado: {total_power_needed}W, "
+            f"PSU actual: {psu_wattage}W (margen: {int(psu_wattage - total_power_needed)}W)."
+        )
+
+    analysis = {
+        "gpu_power_tdp": gpu_power_tdp,
+        "cpu_power_tdp": cpu_power_tdp,
+        "total_estimated": total_power_needed,
+        "psu_available": int(psu_wattage),
+        "margin": int(psu_wattage - total_power_needed)
+    }
+    return analysis, issues, warnings
+
+
+def evaluate_build(parts, memo=None):
+    """
+    Aplica todas las reglas a una build ya resuelta y devuelve el resultado.
+
+    Cada etapa depende solo de un par de componentes; con `memo` (un dict
+    compartido entre builds del mismo snapshot) cada par se evalúa una vez.
+    """
+    cpu, gpu, mb, ram, psu = parts
+    gpu_chipset = gpu.chipset
+    clock = time.perf_counter
+    start = clock()
+
+    issues = list(_memoized(memo, ("socket", cpu.id, mb.id), socket_analysis, cpu, mb))
+    mark = clock()
+    STAGE_SECONDS.observe(mark - start, "socket_resolution")
+
+    module_count, mb_slots_int, memory_issues, warnings = _memoized(
+        memo, ("memory", ram.id, mb.id), memory_analysis, ram, mb)
+    issues += memory_issues
+    warnings = list(warnings)
+    start, mark = mark, clock()
+    STAGE_SECONDS.observe(mark - start, "memory_analysis")
+
+    power, power_issues, power_warnings = _memoized(
+        memo, ("power", gpu_chipset, psu.id), power_analysis, gpu_chipset, psu)
+    issues += power_issues
+    warnings += power_warnings
+    start, mark = mark, clock()
+    STAGE_SECONDS.observe(mark - start, "power_analysis")
+
+    bottleneck = _memoized(memo, ("bottleneck", cpu.id, gpu_chipset), detect_bottleneck,
+                           cpu.core_count, cpu.boost_clock, cpu.tdp, power["gpu_power_tdp"], gpu_chipset)
+    start, mark = mark, clock()
+    STAGE_SECONDS.observe(mark - start, "bottleneck_detection")
+
+    result = {
+        "compatible": len(issues) == 0,
+        "power_analysis": power,
+        "psu_selected": {"id": int(psu.id), "name": psu.name},
+        "memory_analysis": {
+            "modules_required": int(module_count),
+            "slots_available": int(mb_slots_int)
+        },
+        "bottleneck_analysis": bottleneck,
+        "gpu_benchmark": {
+            "chipset": gpu_chipset,
+            "url": get_gpu_benchmark_url(gpu_chipset)
+        }
+    }
+
+    if len(issues) == 0:
+        result["message"] = "Todos los componentes son compatibles."
+    else:
+        result["issues"] = issues
+
+    if warnings:
+        result["warnings"] = warnings
+
+    STAGE_SECONDS.observe(clock() - mark, "result_assembly")
+    return result
+
+
+def check_builds(snapshot, builds):
+    """
+    Evalúa un lote de builds sobre el mismo snapshot.
+
+    Genera, en el orden de entrada, (índice, resultado) o (índice, BuildError).
+    Los componentes se resuelven por conjuntos, las builds idénticas (mismas
+    filas) se evalúan una sola vez y las etapas de las reglas se comparten
+    entre builds que tienen el mismo par de componentes.
+    """
+    lookup = ComponentLookup(snapshot)
+    lookup.prefetch(builds)
+    results = {}
+    memo = {}
+
+    for index, build in enumerate(builds):
+        try:
+            if not isinstance(build, dict):
+                raise BuildError("Cada build debe ser un objeto con cpu, gpu, motherboard, memory y psu.")
+            parts = resolve_build(lookup, build)
+            key = tuple(part.id for part in parts)
+            result = results.get(key)
+            if result is None:
+                result = results[key] = evaluate_build(parts, memo)
+            yield index, result
+        except BuildError as exc:
+            yield index, exc
+
+
+# ------------------------------------------------
+# COMPARACIÓN DE BUILDS
+# ------------------------------------------------
+def compare_builds(snapshot, builds):
+    """
+    Evalúa varias builds alternativas (comparten resolución de componentes y
+    etapas de las reglas, ver check_builds) y resume en qué se diferencian.
+
+    Devuelve {"results": [...], "diff": {...}}: un resultado (o {"error"}) por
+    build, en orden, y las listas paralelas del diff con None en las que fallaron.
+    """
+    results = []
+    for _, outcome in check_builds(snapshot, builds):
+        results.append({"error": str(outcome)} if isinstance(outcome, BuildError) else outcome)
+    valid = [result for result in results if "error" not in result]
+
+    # Componentes que cambian entre builds (ignorando las que no son objetos)
+    keys = [build_key(build) for build in builds if isinstance(build, dict)]
+    varying = [kind for kind, values in zip(BuildParts._fields, zip(*keys)) if len(set(map(repr, values))) > 1]
+
+    def per_build(get):
+        return [None if "error" in result else get(result) for result in results]
+
+    margins = per_build(lambda result: result["power_analysis"]["margin"])
+    issue_sets = [set(result.get("issues", ())) for result in valid]
+    common = set.intersection(*issue_sets) if issue_sets else set()
+    best = max((i for i, margin in enumerate(margins) if margin is not None),
+               key=lambda i: margins[i], default=None)
+
+    return {
+        "results": results,
+        "diff": {
+            "varying_components": varying,
+            "compatible": per_build(lambda result: result["compatible"]),
+            "power_margin": margins,
+            "best_power_margin": best,
+            "bottleneck": per_build(lambda result: result["bottleneck_analysis"]["result"]),
+            "issues": {
+                "common": [issue for issue in valid[0].get("issues", ()) if issue in common] if valid else [],
+                "unique": per_build(lambda result: [i for i in result.get("issues", ()) if i not in common]),
+            },
+        },
+    }
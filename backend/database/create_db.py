@@ -5,6 +5,8 @@ BASE_DIR = os.path.dirname(os.path.abspath(__file__))
 DB_PATH = os.path.join(BASE_DIR, "buildsensei.db")
 
 SQL_PATH = os.path.join(BASE_DIR, "scripts_sql", "create_tables.sql")
+INDEXES_PATH = os.path.join(BASE_DIR, "scripts_sql", "create_indexes.sql")
+CHANGES_PATH = os.path.join(BASE_DIR, "scripts_sql", "create_changes.sql")
 
 conn = sqlite3.connect(DB_PATH)
 cursor = conn.cursor()
@@ -13,6 +15,12 @@ with open(SQL_PATH, "r", encoding="utf-8") as f:
     sql_script = f.read()
 
 cursor.executescript(sql_script)
+
+with open(INDEXES_PATH, "r", encoding="utf-8") as f:
+    cursor.executescript(f.read())
+
+with open(CHANGES_PATH, "r", encoding="utf-8") as f:
+    cursor.executescript(f.read())
 conn.commit()
 conn.close()
 
@@ -1,5 +1,16 @@
+import json
 import sqlite3
 import os
+import sys
+
+# catalog, db_pool and search live in backend/ (the app's import root)
+_BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if _BACKEND_DIR not in sys.path:
+    sys.path.insert(0, _BACKEND_DIR)
+
+from catalog import ComponentCatalog  # noqa: E402
+from db_pool import get_pool  # noqa: E402
+from search import CatalogSearch  # noqa: E402
 
 # ================================
 #  Database Connection Helper
@@ -7,11 +18,31 @@ import os
 
 BASE_DIR = os.path.dirname(os.path.abspath(__file__))
 DB_PATH = os.path.join(BASE_DIR, "buildsensei.db")
+SNAPSHOT_PATH = os.path.join(BASE_DIR, "catalog.snap")
+
+# In-memory catalog used by the compatibility helpers (reloads on DB change;
+# opens the binary snapshot instead of SQLite when it is up to date)
+_catalog = ComponentCatalog(DB_PATH, snapshot_path=SNAPSHOT_PATH)
+
+# Search indexes over _catalog's snapshots (rebuilt along with the catalog)
+_search = CatalogSearch()
+
+
+# Read-only connection pool shared with app.py (same DB file, same process).
+_pool = get_pool(DB_PATH)
 
 
 def get_connection():
-    """Return a new SQLite connection."""
-    return sqlite3.connect(DB_PATH)
+    """
+    Context manager lending a pooled read-only connection:
+
+        with get_connection() as conn:
+            conn.execute(...)
+
+    Pooled connections keep their statement cache warm, so repeated queries
+    skip both the connect and the prepare step.
+    """
+    return _pool.connection()
 
 
 # ================================
@@ -19,21 +50,20 @@ def get_connection():
 # ================================
 
 def fetch_all(query, params=()):
-    conn = get_connection()
-    cursor = conn.cursor()
-    cursor.execute(query, params)
-    rows = cursor.fetchall()
-    conn.close()
-    return rows
+    with get_connection() as conn:
+        return conn.execute(query, params).fetchall()
 
 
 def fetch_one(query, params=()):
-    conn = get_connection()
-    cursor = conn.cursor()
-    cursor.execute(query, params)
-    row = cursor.fetchone()
-    conn.close()
-    return row
+    with get_connection() as conn:
+        return conn.execute(query, params).fetchone()
+
+
+def fetch_limited(query, limit=None):
+    """Run `query` with an optional bound LIMIT (one prepared statement per shape)."""
+    if limit:
+        return fetch_all(query + " LIMIT ?", (int(limit),))
+    return fetch_all(query)
 
 
 # ================================
@@ -41,20 +71,21 @@ def fetch_one(query, params=()):
 # ================================
 
 def get_all_cpus(limit=None):
-    q = "SELECT * FROM cpu"
-    if limit:
-        q += f" LIMIT {limit}"
-    return fetch_all(q)
+    return fetch_limited("SELECT * FROM cpu", limit)
 
 
 def get_cpu_by_id(cpu_id):
     return fetch_one("SELECT * FROM cpu WHERE id = ?", (cpu_id,))
 
 
-def search_cpu(name):
+def search_cpu(name, limit=100):
+    """Ranked prefix/token search over CPU names (replaces a LIKE '%x%' scan)."""
+    snapshot = _catalog.snapshot()
+    positions, _ = _search.index(snapshot, "cpu").search(name, limit)
+    cpu_ids = snapshot["cpu"].column("id")
     return fetch_all(
-        "SELECT * FROM cpu WHERE name LIKE ?",
-        (f"%{name}%",)
+        "SELECT cpu.* FROM json_each(?) AS ranked JOIN cpu ON cpu.id = ranked.value ORDER BY ranked.key",
+        (json.dumps([cpu_ids[pos] for pos in positions]),)
     )
 
 
@@ -63,10 +94,7 @@ def search_cpu(name):
 # ================================
 
 def get_all_motherboards(limit=None):
-    q = "SELECT * FROM motherboard"
-    if limit:
-        q += f" LIMIT {limit}"
-    return fetch_all(q)
+    return fetch_limited("SELECT * FROM motherboard", limit)
 
 
 def get_motherboard_by_id(mb_id):
@@ -85,10 +113,7 @@ def get_motherboards_by_socket(socket):
 # ================================
 
 def get_all_ram(limit=None):
-    q = "SELECT * FROM memory"
-    if limit:
-        q += f" LIMIT {limit}"
-    return fetch_all(q)
+    return fetch_limited("SELECT * FROM memory", limit)
 
 
 def get_ram_by_id(ram_id):
@@ -100,10 +125,7 @@ def get_ram_by_id(ram_id):
 # ================================
 
 def get_all_gpus(limit=None):
-    q = "SELECT * FROM video_card"
-    if limit:
-        q += f" LIMIT {limit}"
-    return fetch_all(q)
+    return fetch_limited("SELECT * FROM video_card", limit)
 
 
 def get_gpu_by_id(gpu_id):
@@ -115,10 +137,7 @@ def get_gpu_by_id(gpu_id):
 # ================================
 
 def get_all_psu(limit=None):
-    q = "SELECT * FROM power_supply"
-    if limit:
-        q += f" LIMIT {limit}"
-    return fetch_all(q)
+    return fetch_limited("SELECT * FROM power_supply", limit)
 
 
 def get_psu_by_id(psu_id):
@@ -130,13 +149,20 @@ def get_psu_by_id(psu_id):
 # ================================
 
 def get_compatible_motherboards_for_cpu(cpu_id):
-    """Return all motherboards with matching socket."""
-    cpu = get_cpu_by_id(cpu_id)
-    if cpu is None:
+    """Return all motherboards with matching socket (precomputed mask lookup)."""
+    from compat_matrix import get_matrix  # NumPy only loads when this helper is used
+
+    snapshot = _catalog.snapshot()
+    pos = snapshot["cpu"].position(cpu_id)
+    if pos is None:
         return []
 
-    socket = cpu[3]  # assuming order is id, name, price, socket...
-    return get_motherboards_by_socket(socket)
+    board_ids = snapshot["motherboard"].column("id")
+    ids = [board_ids[i] for i in get_matrix(snapshot).boards_for_cpu(pos).nonzero()[0].tolist()]
+    return fetch_all(
+        "SELECT * FROM motherboard WHERE id IN (SELECT value FROM json_each(?)) ORDER BY id",
+        (json.dumps(ids),)
+    )
 
 
 def get_psu_by_min_wattage(min_watts):
@@ -1,14 +1,64 @@
-import sqlite3
-import pandas as pd
+"""
+Streaming CSV → SQLite loader.
+
+Each CSV is read in fixed-size chunks with the csv module, so memory stays
+flat whatever the file size. Every row is converted, normalized and hashed
+once, then upserted on its natural key (the product name, see normalize.py):
+
+- new keys are inserted,
+- keys whose content hash changed (a new price, wattage, clock...) are
+  updated in place, keeping their id,
+- unchanged rows are not written at all,
+
+one transaction per chunk. Once a table's feed has been read, the rows whose
+key no longer appears in it (products dropped from the dataset) are deleted.
+Rerunning the loader therefore never duplicates rows, and a feed refresh only
+touches what changed.
+
+The ids of the deleted rows and of the updated rows whose specs changed (not
+just the price, which no compatibility rule reads) are collected per table:
+if there is a saved builds database (see saved_builds.py), only the builds
+that use one of those rows are re-evaluated against the new data, in bulk, at
+the end of the run. New rows need no revalidation, since no saved build can
+reference them yet.
+
+Every chunk (and every deletion) also appends its row ids to catalog_changes
+under a new revision (see create_changes.sql), in the same transaction as the
+rows themselves; /api/catalog?since=<revision> serves deltas from that log.
+
+With --workers N the CPU-bound part (convert/normalize/hash) runs in a pool
+of N processes, chunk by chunk across all tables, while this process stays
+the only writer: SQLite never sees concurrent writers, and chunks are
+written in file order so natural keys are assigned exactly as in a
+sequential run.
+"""
+
+import argparse
+import csv
+import json
 import os
+import sqlite3
+import sys
+import time
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from itertools import islice
+
+from normalize import NaturalKeys, normalize_row, normalized_columns, row_identity, rule_columns_changed
 
 # Paths
 BASE_DIR = os.path.dirname(os.path.abspath(__file__))
 DB_PATH = os.path.join(BASE_DIR, "buildsensei.db")
+CHANGES_SQL_PATH = os.path.join(BASE_DIR, "scripts_sql", "create_changes.sql")
+BUILDS_DB_PATH = os.path.join(BASE_DIR, "builds.db")
+BACKEND_DIR = os.path.dirname(BASE_DIR)
 
 # Directorio datasets (sube 2 niveles: database -> backend -> raíz)
 DATASET_PATH = os.path.join(os.path.dirname(os.path.dirname(BASE_DIR)), "datasets")
 
+# Filas por chunk (y por transacción)
+CHUNK_SIZE = 5000
+
 # Dataset → columnas a usar para cada tabla
 TABLE_SPECS = {
     "cpu": {
@@ -69,50 +119,289 @@ TABLE_SPECS = {
     }
 }
 
-def clean_dataframe(df, columns):
-    """Keep only required columns, drop missing columns gracefully."""
-    available_cols = [col for col in columns if col in df.columns]
-    missing = [col for col in columns if col not in df.columns]
+def column_types(conn, table):
+    """Declared SQL type of each column of `table`."""
+    return {row[1]: row[2].upper() for row in conn.execute(f"PRAGMA table_info({table})")}
 
-    if missing:
-        print(f"   ⚠ Missing columns in CSV: {missing} (ignored)")
 
-    return df[available_cols].copy()
+def convert(value, sql_type):
+    """CSV text -> value to store: "" is NULL, numeric columns become numbers."""
+    if value is None or value == "":
+        return None
+    if sql_type not in ("INTEGER", "REAL"):
+        return value
+    try:
+        number = float(value)
+    except ValueError:
+        return value
+    if sql_type == "INTEGER" and number.is_integer():
+        return int(number)
+    return number
 
 
-def main():
-    print("\n=== BuildSensei CSV → SQLite Loader (Updated) ===\n")
+def read_chunks(csv_path, columns, chunk_size=CHUNK_SIZE):
+    """Yield lists of raw rows (tuples in `columns` order); missing CSV columns read as None."""
+    with open(csv_path, newline="", encoding="utf-8") as f:
+        reader = csv.reader(f)
+        header = next(reader)
+
+        missing = [col for col in columns if col not in header]
+        if missing:
+            print(f"   ⚠ Missing columns in CSV: {missing} (loaded as NULL)")
+        positions = [header.index(col) if col in header else None for col in columns]
+
+        while True:
+            chunk = list(islice(reader, chunk_size))
+            if not chunk:
+                return
+            yield [
+                tuple(row[i] if i is not None and i < len(row) else None for i in positions)
+                for row in chunk
+            ]
+
+
+def parse_chunk(table, columns, types, rows):
+    """
+    Convert, normalize and hash raw rows.
+    Returns (key digest, content hash, values) per row; values are the
+    source columns followed by the normalized ones.
+    """
+    extra = normalized_columns(table)
+    parsed = []
+    for raw in rows:
+        values = tuple(convert(value, types[col]) for col, value in zip(columns, raw))
+        key, content = row_identity(columns, values)
+        if extra:
+            normalized = normalize_row(table, dict(zip(columns, values)))
+            values += tuple(normalized[col] for col in extra)
+        parsed.append((key, content, values))
+    return parsed
 
-    # Connect to database
-    conn = sqlite3.connect(DB_PATH)
-    cursor = conn.cursor()
 
-    for table, info in TABLE_SPECS.items():
-        csv_path = os.path.join(DATASET_PATH, info["file"])
+class TableWriter:
+    """Upserts parsed chunks of one table on (natural_key, content_hash)."""
 
-        print(f"→ Loading {csv_path} into table '{table}'...")
+    def __init__(self, conn, table, columns):
+        self.conn = conn
+        self.table = table
+        self.keys = NaturalKeys()
+        self.inserted = self.updated = self.unchanged = 0
+        self.changed_ids = []  # ids of the rows updated in place with new specs
+        self.removed_ids = []  # ids of the rows deleted by finish()
 
-        # Read CSV
-        df = pd.read_csv(csv_path)
+        all_columns = self.columns = [*columns, *normalized_columns(table)]
+        placeholders = ", ".join(["?"] * (len(all_columns) + 2))
+        self.insert_query = (
+            f"INSERT INTO {table} ({', '.join(all_columns)}, content_hash, natural_key) "
+            f"VALUES ({placeholders})"
+        )
+        assignments = ", ".join(f"{col} = ?" for col in all_columns)
+        self.update_query = f"UPDATE {table} SET {assignments}, content_hash = ? WHERE natural_key = ?"
+        self.lookup_query = (
+            f"SELECT natural_key, content_hash, id, {', '.join(all_columns)} FROM {table} "
+            f"WHERE natural_key IN (SELECT value FROM json_each(?))"
+        )
+        self.inserted_ids_query = f"SELECT id FROM {table} WHERE natural_key IN (SELECT value FROM json_each(?))"
 
-        # Clean dataframe
-        df = clean_dataframe(df, info["columns"])
+    def write(self, parsed):
+        """Write one chunk in its own transaction."""
+        rows = [(self.keys.assign(key), content, values) for key, content, values in parsed]
+        existing = {
+            natural_key: (content, row_id, stored_values)
+            for natural_key, content, row_id, *stored_values in self.conn.execute(
+                self.lookup_query, (json.dumps([row[0] for row in rows]),))
+        }
+
+        inserts, updates, updated_ids, changed = [], [], [], []
+        for natural_key, content, values in rows:
+            stored = existing.get(natural_key)
+            if stored is None:
+                inserts.append((*values, content, natural_key))
+            elif stored[0] != content:
+                updates.append((*values, content, natural_key))
+                updated_ids.append(stored[1])
+                if rule_columns_changed(self.columns, stored[2], values):
+                    changed.append(stored[1])
+
+        with self.conn:
+            self.conn.executemany(self.insert_query, inserts)
+            self.conn.executemany(self.update_query, updates)
+            if inserts or updates:
+                self.log_changes(updated_ids, [row[-1] for row in inserts])
+
+        self.inserted += len(inserts)
+        self.updated += len(updates)
+        self.changed_ids += changed
+        self.unchanged += len(rows) - len(inserts) - len(updates)
+        return len(rows)
+
+    def finish(self):
+        """
+        Delete the rows whose natural key did not appear in the feed, in one
+        transaction. A feed without rows deletes nothing, so an empty CSV
+        never wipes a table.
+        """
+        if not self.inserted + self.updated + self.unchanged:
+            return 0
+        seen = set(self.keys.assigned())
+        removed = [
+            row_id for row_id, natural_key in self.conn.execute(f"SELECT id, natural_key FROM {self.table}")
+            if natural_key not in seen
+        ]
+        if removed:
+            with self.conn:
+                self.conn.execute(f"DELETE FROM {self.table} WHERE id IN (SELECT value FROM json_each(?))",
+                                  (json.dumps(removed),))
+                self.log_changes(removed, [])
+        self.removed_ids = removed
+        return len(removed)
 
-        # Replace NaN with None
-        df = df.where(pd.notnull(df), None)
+    def log_changes(self, updated_ids, inserted_keys):
+        """Record this chunk's inserted, updated or deleted rows under a new revision."""
+        row_ids = list(updated_ids)
+        if inserted_keys:
+            row_ids += [row[0] for row in self.conn.execute(self.inserted_ids_query, (json.dumps(inserted_keys),))]
+        revision = next_revision(self.conn)
+        self.conn.executemany(
+            "INSERT INTO catalog_changes (revision, table_name, row_id) VALUES (?, ?, ?)",
+            [(revision, self.table, row_id) for row_id in row_ids],
+        )
+
+
+def next_revision(conn):
+    """
+    Revision for the next chunk: higher than any logged one and never behind
+    the clock (milliseconds), so it keeps growing even if the DB is rebuilt.
+    """
+    last = conn.execute("SELECT MAX(revision) FROM catalog_changes").fetchone()[0] or 0
+    return max(last + 1, time.time_ns() // 1_000_000)
+
+
+def report(table, writer, elapsed):
+    total = writer.inserted + writer.updated + writer.unchanged
+    rate = total / elapsed if elapsed > 0 else float("inf")
+    print(f"   ✔ {table}: {writer.inserted} inserted, {writer.updated} updated, "
+          f"{writer.unchanged} unchanged, {len(writer.removed_ids)} removed "
+          f"in {elapsed:.2f}s ({rate:,.0f} rows/s)")
+
+
+def load_table(conn, table, info, chunk_size=CHUNK_SIZE):
+    csv_path = os.path.join(DATASET_PATH, info["file"])
+    print(f"→ Loading {csv_path} into table '{table}'...")
+
+    columns = info["columns"]
+    types = column_types(conn, table)
+    writer = TableWriter(conn, table, columns)
+
+    start = time.perf_counter()
+    for rows in read_chunks(csv_path, columns, chunk_size):
+        writer.write(parse_chunk(table, columns, types, rows))
+    writer.finish()
+    report(table, writer, time.perf_counter() - start)
+    return writer
+
+
+def load_parallel(conn, workers, chunk_size=CHUNK_SIZE):
+    """
+    Parse chunks of every table in a process pool; write them here, in order.
+    At most 2 * workers chunks are in flight, so memory stays bounded.
+    """
+    types = {table: column_types(conn, table) for table in TABLE_SPECS}
+    writers = {table: TableWriter(conn, table, info["columns"]) for table, info in TABLE_SPECS.items()}
+    started = {}
+    pending = deque()
+
+    def write_next():
+        table, future, last = pending.popleft()
+        writers[table].write(future.result())
+        if last:
+            writers[table].finish()
+            report(table, writers[table], time.perf_counter() - started[table])
+
+    print(f"→ Loading {len(TABLE_SPECS)} tables with {workers} parser processes...")
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        for table, info in TABLE_SPECS.items():
+            started[table] = time.perf_counter()
+            csv_path = os.path.join(DATASET_PATH, info["file"])
+            chunks = read_chunks(csv_path, info["columns"], chunk_size)
+            rows = next(chunks, None)
+            if rows is None:
+                report(table, writers[table], 0.0)  # CSV without rows
+            while rows is not None:
+                following = next(chunks, None)
+                future = pool.submit(parse_chunk, table, info["columns"], types[table], rows)
+                pending.append((table, future, following is None))
+                rows = following
+                while len(pending) >= 2 * workers:
+                    write_next()
+        while pending:
+            write_next()
+    return writers
+
+
+def connect(db_path=DB_PATH):
+    conn = sqlite3.connect(db_path)
+    # WAL + NORMAL: one fsync per checkpoint instead of per transaction
+    conn.execute("PRAGMA synchronous = NORMAL")
+    for table in TABLE_SPECS:
+        if "natural_key" not in column_types(conn, table):
+            conn.close()
+            sys.exit(f"Table '{table}' has no natural_key column: run migrate_db.py first.")
+    with open(CHANGES_SQL_PATH, "r", encoding="utf-8") as f:
+        conn.executescript(f.read())
+    return conn
+
+
+def revalidate_builds(changed, db_path=DB_PATH, builds_db_path=BUILDS_DB_PATH):
+    """Re-evaluate the saved builds that use a changed row; returns how many."""
+    sys.path.insert(0, BACKEND_DIR)  # rule engine and catalog live in backend/
+    from catalog import ComponentCatalog
+    import saved_builds
+
+    snapshot = ComponentCatalog(db_path).load()
+    conn = saved_builds.connect(builds_db_path)
+    try:
+        return saved_builds.revalidate(conn, snapshot, changed)
+    finally:
+        conn.close()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Load the CSV datasets into SQLite (incremental upsert).")
+    parser.add_argument("--chunk-size", type=int, default=CHUNK_SIZE,
+                        help=f"rows per chunk and per transaction (default {CHUNK_SIZE})")
+    parser.add_argument("--workers", type=int, default=1,
+                        help="parser processes; 1 parses in this process, 0 uses every core (default 1)")
+    parser.add_argument("--no-revalidate", action="store_true",
+                        help="do not re-evaluate the saved builds that use a changed row")
+    args = parser.parse_args()
+    workers = args.workers or os.cpu_count() or 1
 
-        # Build SQL insert
-        placeholders = ", ".join(["?"] * len(df.columns))
-        columns_sql = ", ".join(df.columns)
-        insert_query = f"INSERT INTO {table} ({columns_sql}) VALUES ({placeholders})"
+    print("\n=== BuildSensei CSV → SQLite Loader (Streaming) ===\n")
 
-        # Insert records
-        cursor.executemany(insert_query, df.values.tolist())
-        conn.commit()
+    start = time.perf_counter()
+    conn = connect()
+    try:
+        if workers > 1:
+            writers = load_parallel(conn, workers, args.chunk_size)
+        else:
+            writers = {table: load_table(conn, table, info, args.chunk_size)
+                       for table, info in TABLE_SPECS.items()}
+    finally:
+        conn.close()
+    print(f"\n   Total: {time.perf_counter() - start:.2f}s")
 
-        print(f"   ✔ Inserted {len(df)} records into {table}")
+    changed = {table: writer.changed_ids + writer.removed_ids
+               for table, writer in writers.items() if writer.changed_ids or writer.removed_ids}
+    if changed:
+        print("\n   Changed rows: " + ", ".join(f"{table}={len(ids)}" for table, ids in changed.items()))
+        if args.no_revalidate or not os.path.exists(BUILDS_DB_PATH):
+            print("   (saved builds not revalidated)")
+        else:
+            start = time.perf_counter()
+            count = revalidate_builds(changed)
+            print(f"   ✔ {count} saved builds revalidated in {time.perf_counter() - start:.2f}s")
 
-    conn.close()
     print("\n=== DONE! Database 'buildsensei.db' updated successfully. ===\n")
 
 
@@ -0,0 +1,111 @@
+import sqlite3
+import os
+import sys
+
+from load_csv_to_db import TABLE_SPECS, next_revision
+from normalize import COLUMN_TYPES, NORMALIZERS, NaturalKeys, normalize_row, normalized_columns, row_identity
+
+# Paths
+BASE_DIR = os.path.dirname(os.path.abspath(__file__))
+DB_PATH = os.path.join(BASE_DIR, "buildsensei.db")
+INDEXES_PATH = os.path.join(BASE_DIR, "scripts_sql", "create_indexes.sql")
+CHANGES_PATH = os.path.join(BASE_DIR, "scripts_sql", "create_changes.sql")
+
+
+def existing_columns(conn, table):
+    return {row[1] for row in conn.execute(f"PRAGMA table_info({table})")}
+
+
+def add_normalized_columns(conn, table):
+    """
+    Add the typed columns missing from `table` and fill them from the raw
+    fields. Returns (added columns, ids of the rows whose values changed).
+    """
+    columns = normalized_columns(table)
+    missing = [col for col in columns if col not in existing_columns(conn, table)]
+    for col in missing:
+        conn.execute(f"ALTER TABLE {table} ADD COLUMN {col} {COLUMN_TYPES[col]}")
+
+    sources, _ = NORMALIZERS[table]
+    cursor = conn.execute(f"SELECT id, {', '.join(sources)}, {', '.join(columns)} FROM {table}")
+    names = ["id", *sources]
+    updates = []
+    for row in cursor:
+        values = [normalize_row(table, dict(zip(names, row)))[col] for col in columns]
+        if values != list(row[len(names):]):
+            updates.append(values + [row[0]])
+
+    assignments = ", ".join(f"{col} = ?" for col in columns)
+    conn.executemany(f"UPDATE {table} SET {assignments} WHERE id = ?", updates)
+    return missing, [update[-1] for update in updates]
+
+
+def log_changes(conn, changed):
+    """
+    Record the rows rewritten by the migration ({table: ids}) in catalog_changes
+    under one new revision: the app reloads its catalog (and drops stale binary
+    snapshots) only when the revision moves.
+    """
+    rows = [(table, row_id) for table, ids in changed.items() for row_id in ids]
+    if rows:
+        revision = next_revision(conn)
+        conn.executemany("INSERT INTO catalog_changes (revision, table_name, row_id) VALUES (?, ?, ?)",
+                         [(revision, table, row_id) for table, row_id in rows])
+    return len(rows)
+
+
+def add_identity_columns(conn, table, columns):
+    """Add natural_key/content_hash to `table` and key the existing rows in id order."""
+    missing = [col for col in ("natural_key", "content_hash") if col not in existing_columns(conn, table)]
+    for col in missing:
+        conn.execute(f"ALTER TABLE {table} ADD COLUMN {col} TEXT")
+
+    keys = NaturalKeys()
+    updates = []
+    for row in conn.execute(f"SELECT id, {', '.join(columns)} FROM {table} ORDER BY id"):
+        key, content = row_identity(columns, row[1:])
+        updates.append((keys.assign(key), content, row[0]))
+
+    conn.executemany(f"UPDATE {table} SET natural_key = ?, content_hash = ? WHERE id = ?", updates)
+    return missing, len(updates)
+
+
+def migrate(db_path=DB_PATH):
+    """Bring an existing database to the current schema. Safe to run repeatedly."""
+    conn = sqlite3.connect(db_path)
+    try:
+        with conn:
+            with open(CHANGES_PATH, "r", encoding="utf-8") as f:
+                conn.executescript(f.read())
+            print("   ✔ Change log created")
+
+            changed = {}
+            for table in NORMALIZERS:
+                added, changed[table] = add_normalized_columns(conn, table)
+                note = f"added {', '.join(added)}" if added else "columns already present"
+                print(f"   ✔ {table}: {note}, {len(changed[table])} rows normalized")
+            if log_changes(conn, changed):
+                print("   ✔ Normalized rows logged in catalog_changes")
+
+            for table, info in TABLE_SPECS.items():
+                added, count = add_identity_columns(conn, table, info["columns"])
+                note = f"added {', '.join(added)}" if added else "identity columns already present"
+                print(f"   ✔ {table}: {note}, {count} rows keyed")
+
+            with open(INDEXES_PATH, "r", encoding="utf-8") as f:
+                conn.executescript(f.read())
+            print("   ✔ Indexes created")
+
+        # Reclaim the pages rewritten by the UPDATEs and refresh planner stats
+        conn.execute("VACUUM")
+        conn.execute("ANALYZE")
+        mode = conn.execute("PRAGMA journal_mode = WAL").fetchone()[0]
+        print(f"   ✔ journal_mode = {mode}")
+    finally:
+        conn.close()
+
+
+if __name__ == "__main__":
+    print("\n=== BuildSensei schema migration ===\n")
+    migrate(sys.argv[1] if len(sys.argv) > 1 else DB_PATH)
+    print("\n=== DONE! ===\n")
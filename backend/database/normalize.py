@@ -0,0 +1,163 @@
+"""
+Row normalization and identity shared by the CSV loader and the schema migration.
+
+The raw datasets pack two numbers into one field ("5,6000" = DDR5 at
+6000 MHz, "2,16" = 2 modules of 16 GB). These helpers parse them once so
+the normalized values can be stored in typed, indexable columns.
+"""
+
+import hashlib
+import os
+import sys
+from collections import Counter
+
+# socket_rules lives in backend/ (the app's import root)
+_BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if _BACKEND_DIR not in sys.path:
+    sys.path.insert(0, _BACKEND_DIR)
+
+from socket_rules import deduce_socket  # noqa: E402
+
+
+def to_int(value):
+    """Integer from a number or numeric string ("1,5" -> 1), or None."""
+    if value is None:
+        return None
+    try:
+        return int(float(str(value).replace(",", ".").strip()))
+    except ValueError:
+        return None
+
+
+def split_pair(value):
+    """Split "a,b" into (int a, int b). A single number returns (None, n)."""
+    if value is None:
+        return None, None
+    text = str(value).strip()
+    if "," not in text:
+        return None, to_int(text)
+    first, second = text.split(",", 1)
+    return to_int(first), to_int(second)
+
+
+def memory_columns(speed, modules):
+    """Normalized memory columns: ddr_generation, speed_mhz, module_count, module_size_gb, capacity_gb."""
+    generation, speed_mhz = split_pair(speed)
+    module_count, module_size = split_pair(modules)
+    capacity = module_count * module_size if module_count and module_size else None
+    return {
+        "ddr_generation": generation,
+        "speed_mhz": speed_mhz,
+        "module_count": module_count,
+        "module_size_gb": module_size,
+        "capacity_gb": capacity,
+    }
+
+
+def cpu_columns(microarchitecture):
+    """Normalized cpu columns: socket (resolved from the microarchitecture)."""
+    return {"socket": deduce_socket(microarchitecture)}
+
+
+# table -> (source columns, function returning the normalized columns)
+NORMALIZERS = {
+    "cpu": (("microarchitecture",), cpu_columns),
+    "memory": (("speed", "modules"), memory_columns),
+}
+
+# SQL type of each normalized column (must match create_tables.sql)
+COLUMN_TYPES = {
+    "socket": "TEXT",
+    "ddr_generation": "INTEGER",
+    "speed_mhz": "INTEGER",
+    "module_count": "INTEGER",
+    "module_size_gb": "INTEGER",
+    "capacity_gb": "INTEGER",
+}
+
+
+def normalized_columns(table):
+    """Names of the normalized columns a table gets, in insert order."""
+    if table not in NORMALIZERS:
+        return ()
+    sources, func = NORMALIZERS[table]
+    return tuple(func(*([None] * len(sources))))
+
+
+def normalize_row(table, record):
+    """Normalized values for one row, given a mapping with its source columns."""
+    if table not in NORMALIZERS:
+        return {}
+    sources, func = NORMALIZERS[table]
+    return func(*(record.get(col) for col in sources))
+
+
+# ================================
+#  Row identity
+# ================================
+# Columns that identify a product across feed snapshots. Everything else
+# (price, clocks, wattage...) is content: a change there updates the row in
+# place, detected through the content hash. Rows sharing a name are told
+# apart by their order in the feed (see NaturalKeys).
+IDENTITY_COLUMNS = frozenset({"name"})
+
+# Content no compatibility rule reads: rows that only change here keep the
+# saved builds that use them valid.
+RULE_NEUTRAL_COLUMNS = frozenset({"price"})
+
+
+def canonical(value):
+    """
+    Text form of a value that is the same whether it comes from the CSV
+    ("5", "") or from SQLite (5.0, None), so keys computed by the loader and
+    by the migration agree.
+    """
+    if value is None:
+        return ""
+    text = str(value).strip()
+    try:
+        number = float(text)
+    except ValueError:
+        return text
+    if number != number:  # NaN
+        return ""
+    return str(int(number)) if number.is_integer() else repr(number)
+
+
+def digest(values):
+    return hashlib.blake2b("\x1f".join(map(canonical, values)).encode(), digest_size=16).hexdigest()
+
+
+def row_identity(columns, values):
+    """(key digest, content hash) of one row from its source column values."""
+    key = digest(value for col, value in zip(columns, values) if col in IDENTITY_COLUMNS)
+    return key, digest(values)
+
+
+def rule_columns_changed(columns, old, new):
+    """True if two versions of a row differ in a column the compatibility rules read."""
+    return any(canonical(before) != canonical(after)
+               for col, before, after in zip(columns, old, new) if col not in RULE_NEUTRAL_COLUMNS)
+
+
+class NaturalKeys:
+    """
+    Turns key digests into natural keys in feed order. The feeds list
+    several products under the same name (memory kits at different speeds,
+    PSUs at different wattages); the n-th one gets "#n" appended.
+    """
+
+    def __init__(self):
+        self._seen = Counter()
+
+    def assign(self, key_digest):
+        ordinal = self._seen[key_digest]
+        self._seen[key_digest] = ordinal + 1
+        return key_digest if ordinal == 0 else f"{key_digest}#{ordinal}"
+
+    def assigned(self):
+        """Every natural key handed out so far."""
+        for key_digest, count in self._seen.items():
+            yield key_digest
+            for ordinal in range(1, count):
+                yield f"{key_digest}#{ordinal}"
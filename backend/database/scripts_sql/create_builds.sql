@@ -0,0 +1,31 @@
+-- =========================================
+-- BuildSensei - Builds guardadas
+-- (BD aparte, builds.db: el loader reescribe buildsensei.db y cualquier
+-- escritura en ella haría recargar el catálogo; idempotente)
+-- =========================================
+
+PRAGMA journal_mode = WAL;
+
+CREATE TABLE IF NOT EXISTS builds (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    share_id TEXT NOT NULL,           -- id corto y no secuencial para compartir (/api/builds/<share_id>)
+    cpu_id INTEGER NOT NULL,          -- ids de las tablas del catálogo
+    gpu_id INTEGER NOT NULL,
+    motherboard_id INTEGER NOT NULL,
+    memory_id INTEGER NOT NULL,
+    psu_id INTEGER NOT NULL,
+    compatible INTEGER,               -- NULL: sin evaluar o con componentes que ya no existen
+    result TEXT,                      -- último resultado de compatibilidad (JSON)
+    checked_at REAL,                  -- cuándo se calculó `result` (epoch)
+    created_at REAL NOT NULL
+);
+
+CREATE UNIQUE INDEX IF NOT EXISTS idx_builds_share_id ON builds(share_id);
+
+-- Índice de dependencias componente -> builds que lo usan:
+-- la revalidación incremental solo toca las builds de las filas cambiadas
+CREATE INDEX IF NOT EXISTS idx_builds_cpu ON builds(cpu_id);
+CREATE INDEX IF NOT EXISTS idx_builds_gpu ON builds(gpu_id);
+CREATE INDEX IF NOT EXISTS idx_builds_motherboard ON builds(motherboard_id);
+CREATE INDEX IF NOT EXISTS idx_builds_memory ON builds(memory_id);
+CREATE INDEX IF NOT EXISTS idx_builds_psu ON builds(psu_id);
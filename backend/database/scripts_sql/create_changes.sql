@@ -0,0 +1,15 @@
+-- =========================================
+-- BuildSensei - Registro de cambios del catálogo
+-- (idempotente: lo usan create_db.py, migrate_db.py y el loader)
+-- =========================================
+
+-- Una fila por fila insertada o actualizada por el loader. Cada chunk
+-- confirmado recibe una revisión mayor que todas las anteriores: la
+-- exportación /api/catalog?since=<revisión> devuelve solo lo cambiado después.
+CREATE TABLE IF NOT EXISTS catalog_changes (
+    revision INTEGER NOT NULL,
+    table_name TEXT NOT NULL,
+    row_id INTEGER NOT NULL
+);
+
+CREATE INDEX IF NOT EXISTS idx_catalog_changes_revision ON catalog_changes(revision);
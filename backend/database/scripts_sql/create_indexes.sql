@@ -0,0 +1,25 @@
+-- =========================================
+-- BuildSensei - Índices de búsqueda
+-- (idempotente: lo usan create_db.py y migrate_db.py)
+-- =========================================
+
+CREATE INDEX IF NOT EXISTS idx_cpu_name ON cpu(name);
+CREATE INDEX IF NOT EXISTS idx_cpu_socket ON cpu(socket);
+
+CREATE INDEX IF NOT EXISTS idx_motherboard_name ON motherboard(name);
+CREATE INDEX IF NOT EXISTS idx_motherboard_socket ON motherboard(socket);
+
+CREATE INDEX IF NOT EXISTS idx_memory_name ON memory(name);
+CREATE INDEX IF NOT EXISTS idx_memory_module_count ON memory(module_count);
+
+CREATE INDEX IF NOT EXISTS idx_video_card_name ON video_card(name);
+CREATE INDEX IF NOT EXISTS idx_video_card_chipset ON video_card(chipset);
+
+CREATE INDEX IF NOT EXISTS idx_power_supply_wattage ON power_supply(wattage);
+
+-- Clave natural: el loader hace upsert sobre ella
+CREATE UNIQUE INDEX IF NOT EXISTS idx_cpu_natural_key ON cpu(natural_key);
+CREATE UNIQUE INDEX IF NOT EXISTS idx_motherboard_natural_key ON motherboard(natural_key);
+CREATE UNIQUE INDEX IF NOT EXISTS idx_memory_natural_key ON memory(natural_key);
+CREATE UNIQUE INDEX IF NOT EXISTS idx_video_card_natural_key ON video_card(natural_key);
+CREATE UNIQUE INDEX IF NOT EXISTS idx_power_supply_natural_key ON power_supply(natural_key);
@@ -3,6 +3,7 @@
 -- =========================================
 
 PRAGMA foreign_keys = ON;
+PRAGMA journal_mode = WAL;
 
 -- ============================
 -- Tabla: CPU
@@ -18,7 +19,10 @@ CREATE TABLE cpu (
     boost_clock REAL,
     microarchitecture TEXT,
     tdp INTEGER,
-    graphics TEXT
+    graphics TEXT,
+    socket TEXT,             -- normalizado: deducido de microarchitecture
+    natural_key TEXT,        -- identidad estable entre cargas (ver normalize.py)
+    content_hash TEXT        -- hash del contenido: filas sin cambios no se reescriben
 );
 
 -- ============================
@@ -33,7 +37,9 @@ CREATE TABLE motherboard (
     socket TEXT NOT NULL,
     form_factor TEXT,
     max_memory INTEGER,
-    memory_slots INTEGER
+    memory_slots INTEGER,
+    natural_key TEXT,        -- identidad estable entre cargas (ver normalize.py)
+    content_hash TEXT        -- hash del contenido: filas sin cambios no se reescriben
 );
 
 -- ============================
@@ -45,9 +51,16 @@ CREATE TABLE memory (
     id INTEGER PRIMARY KEY AUTOINCREMENT,
     name TEXT NOT NULL,
     price REAL,
-    speed INTEGER,
-    modules TEXT,
-    cas_latency REAL
+    speed TEXT,              -- crudo: "5,6000"
+    modules TEXT,            -- crudo: "2,16"
+    cas_latency REAL,
+    ddr_generation INTEGER,  -- normalizado desde speed
+    speed_mhz INTEGER,       -- normalizado desde speed
+    module_count INTEGER,    -- normalizado desde modules
+    module_size_gb INTEGER,  -- normalizado desde modules
+    capacity_gb INTEGER,     -- module_count * module_size_gb
+    natural_key TEXT,        -- identidad estable entre cargas (ver normalize.py)
+    content_hash TEXT        -- hash del contenido: filas sin cambios no se reescriben
 );
 
 -- ============================
@@ -63,7 +76,9 @@ CREATE TABLE video_card (
     memory INTEGER,
     core_clock REAL,     
     boost_clock REAL,    
-    length REAL
+    length REAL,
+    natural_key TEXT,        -- identidad estable entre cargas (ver normalize.py)
+    content_hash TEXT        -- hash del contenido: filas sin cambios no se reescriben
 );
 
 -- ============================
@@ -77,5 +92,7 @@ CREATE TABLE power_supply (
     price REAL,
     efficiency TEXT,
     wattage INTEGER,
-    modular TEXT
+    modular TEXT,
+    natural_key TEXT,        -- identidad estable entre cargas (ver normalize.py)
+    content_hash TEXT        -- hash del contenido: filas sin cambios no se reescriben
 );
@@ -0,0 +1,201 @@
+"""
+Pool de conexiones SQLite de solo lectura.
+
+Abrir y cerrar una conexión por consulta cuesta más que la propia consulta
+cuando esta es un lookup por índice. El pool mantiene hasta `size`
+conexiones abiertas en modo `?mode=ro` (URI) con mmap y caché de sentencias,
+y las presta a quien las pida: las rutas de Flask se quedan una durante la
+petición (ver app.py) y las funciones de database/db.py la piden por consulta.
+
+Hay un pool por archivo de BD y proceso (`get_pool`), compartido por app.py
+y db.py.
+"""
+
+import os
+import pathlib
+import sqlite3
+import threading
+import time
+from collections import deque
+from contextlib import contextmanager
+
+# Tamaño del memory map y de la caché de sentencias preparadas por conexión
+MMAP_SIZE = 64 * 1024 * 1024
+CACHED_STATEMENTS = 128
+
+# Configurables por entorno (p. ej. igual al número de hilos del servidor)
+DEFAULT_POOL_SIZE = int(os.environ.get("BUILDSENSEI_DB_POOL_SIZE", "4"))
+DEFAULT_POOL_TIMEOUT = float(os.environ.get("BUILDSENSEI_DB_POOL_TIMEOUT", "5.0"))
+
+
+class PoolTimeout(sqlite3.OperationalError):
+    """No quedó ninguna conexión libre dentro del tiempo de espera."""
+
+
+class ConnectionPool:
+    """
+    Pool acotado y thread-safe de conexiones de solo lectura.
+
+    Las conexiones se crean bajo demanda hasta `size`; después, quien pide una
+    espera (como mucho `timeout` segundos) a que otro hilo la devuelva.
+    `stats()` expone checkouts, reutilizaciones (hits), esperas y hit rate.
+    """
+
+    def __init__(self, db_path, size=DEFAULT_POOL_SIZE, timeout=DEFAULT_POOL_TIMEOUT):
+        if size < 1:
+            raise ValueError("El pool necesita al menos una conexión")
+        self.db_path = os.path.abspath(db_path)
+        self.size = size
+        self.timeout = timeout
+        self._idle = deque()
+        self._opened = 0
+        self._closed = False
+        self._available = threading.Condition(threading.Lock())
+        self._checkouts = 0
+        self._hits = 0
+        self._waits = 0
+        self._wait_time = 0.0
+        self._discarded = 0
+
+    def _connect(self):
+        # as_uri() escapa "?", "#" y "%" del path, que en una URI cambiarían su sentido
+        conn = sqlite3.connect(
+            pathlib.Path(self.db_path).resolve().as_uri() + "?mode=ro",
+            uri=True,
+            check_same_thread=False,  # se presta a distintos hilos, nunca a dos a la vez
+            cached_statements=CACHED_STATEMENTS,
+        )
+        conn.execute(f"PRAGMA mmap_size = {MMAP_SIZE}")
+        return conn
+
+    # ------------------------------------------------
+    # PRÉSTAMO Y DEVOLUCIÓN
+    # ------------------------------------------------
+    def acquire(self):
+        """Presta una conexión; lanza PoolTimeout si no hay ninguna libre a tiempo."""
+        with self._available:
+            if self._closed:
+                raise sqlite3.ProgrammingError("El pool está cerrado")
+            self._checkouts += 1
+
+            if self._idle:
+                self._hits += 1
+                return self._idle.pop()
+
+            if self._opened >= self.size:
+                self._waits += 1
+                start = time.monotonic()
+                deadline = start + self.timeout
+                while not self._idle and self._opened >= self.size:
+                    remaining = deadline - time.monotonic()
+                    if remaining <= 0 or self._closed:
+                        self._wait_time += time.monotonic() - start
+                        raise PoolTimeout(f"Sin conexiones libres tras {self.timeout:.1f}s")
+                    self._available.wait(remaining)
+                self._wait_time += time.monotonic() - start
+                if self._idle:
+                    self._hits += 1
+                    return self._idle.pop()
+
+            # Hay hueco: se abre fuera del lock (connect toca disco)
+            self._opened += 1
+
+        try:
+            return self._connect()
+        except Exception:
+            with self._available:
+                self._opened -= 1
+                self._available.notify()
+            raise
+
+    def release(self, conn, discard=False):
+        """Devuelve una conexión al pool (o la descarta si quedó inservible)."""
+        if not discard:
+            try:
+                if conn.in_transaction:
+                    conn.rollback()
+                conn.row_factory = None
+            except sqlite3.Error:
+                discard = True
+
+        with self._available:
+            if discard or self._closed:
+                self._opened -= 1
+                self._discarded += discard
+                conn.close()
+            else:
+                self._idle.append(conn)
+            self._available.notify()
+
+    @contextmanager
+    def connection(self):
+        """`with pool.connection() as conn:` presta y devuelve una conexión."""
+        conn = self.acquire()
+        try:
+            yield conn
+        finally:
+            self.release(conn)
+
+    # ------------------------------------------------
+    # SALUD Y MÉTRICAS
+    # ------------------------------------------------
+    def health_check(self, conn=None):
+        """
+        (ok, detalle): ejecuta una consulta trivial con `conn` o, si no se
+        pasa, con una conexión prestada por el pool.
+        """
+        try:
+            if conn is not None:
+                conn.execute("SELECT 1 FROM sqlite_master LIMIT 1").fetchall()
+            else:
+                with self.connection() as pooled:
+                    pooled.execute("SELECT 1 FROM sqlite_master LIMIT 1").fetchall()
+        except sqlite3.Error as exc:
+            return False, str(exc)
+        return True, None
+
+    def stats(self):
+        with self._available:
+            checkouts = self._checkouts
+            return {
+                "size": self.size,
+                "open": self._opened,
+                "idle": len(self._idle),
+                "in_use": self._opened - len(self._idle),
+                "checkouts": checkouts,
+                "hits": self._hits,
+                "hit_rate": round(self._hits / checkouts, 4) if checkouts else None,
+                "waits": self._waits,
+                "wait_seconds": round(self._wait_time, 6),
+                "discarded": self._discarded,
+            }
+
+    def close(self):
+        """Cierra las conexiones libres; las prestadas se cierran al devolverse."""
+        with self._available:
+            self._closed = True
+            while self._idle:
+                self._idle.pop().close()
+                self._opened -= 1
+            self._available.notify_all()
+
+
+_pools = {}
+_pools_lock = threading.Lock()
+
+
+def get_pool(db_path, size=None, timeout=None):
+    """
+    Pool compartido del proceso para `db_path` (se crea la primera vez).
+    `size`/`timeout` solo se aplican al crearlo.
+    """
+    key = os.path.abspath(db_path)
+    with _pools_lock:
+        pool = _pools.get(key)
+        if pool is None:
+            pool = _pools[key] = ConnectionPool(
+                key,
+                size=DEFAULT_POOL_SIZE if size is None else size,
+                timeout=DEFAULT_POOL_TIMEOUT if timeout is None else timeout,
+            )
+        return pool
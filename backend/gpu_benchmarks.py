@@ -3,6 +3,9 @@ Mapeo de GPUs a URLs de TechPowerUp (TPU) Specs.
 URLs actualizadas a la base de datos de TechPowerUp para una mayor estabilidad.
 """
 
+from gpu_power import GPU_POWER_CONSUMPTION
+from gpu_resolver import ChipsetResolver
+
 GPU_BENCHMARK_URLS = {
     # NVIDIA RTX 50 Series (Especulativas)
     'RTX 5090': 'https://www.techpowerup.com/gpu-specs/geforce-rtx-5090.c4216',
@@ -68,7 +71,10 @@ GPU_BENCHMARK_URLS = {
     'GT 710': 'https://www.techpowerup.com/gpu-specs/geforce-gt-710.c1990',
 }
 
-# La función para obtener la URL no necesita cambios, ya que solo lee del diccionario
+# Resolver compartido (consumo + benchmark), compilado una sola vez al importar
+GPU_RESOLVER = ChipsetResolver(GPU_POWER_CONSUMPTION, GPU_BENCHMARK_URLS)
+
+
 def get_gpu_benchmark_url(gpu_chipset):
     """
     Obtiene la URL de TechPowerUp Specs para una GPU según su chipset.
@@ -78,26 +84,8 @@ def get_gpu_benchmark_url(gpu_chipset):
         gpu_chipset (str): Nombre del chipset de la GPU (ej: "GeForce RTX 4090")
     
     Returns:
-        str: URL de la página de especificaciones (o 'PENDIENTE_LANZAMIENTO') o None si no encuentra coincidencia
+        str: URL de la página de especificaciones o None si no encuentra coincidencia
     """
     if not gpu_chipset:
         return None
-    
-    gpu_chipset_upper = gpu_chipset.strip().upper()
-    
-    # Búsqueda exacta primero
-    for model, url in GPU_BENCHMARK_URLS.items():
-        if model.upper() == gpu_chipset_upper:
-            return url
-    
-    # Búsqueda parcial (mejor coincidencia)
-    best_match_url = None
-    best_match_len = 0
-    
-    for model, url in GPU_BENCHMARK_URLS.items():
-        if model.upper() in gpu_chipset_upper:
-            if len(model) > best_match_len:
-                best_match_url = url
-                best_match_len = len(model)
-    
-    return best_match_url
\ No newline at end of file
+    return GPU_RESOLVER.resolve(gpu_chipset).benchmark_url
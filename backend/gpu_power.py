@@ -0,0 +1,71 @@
+"""
+Consumo aproximado (TDP en Watts) por modelo de GPU.
+"""
+
+# ------------------------------------------------
+# DICCIONARIO DE CONSUMO DE GPU (TDP en Watts)
+# ------------------------------------------------
+GPU_POWER_CONSUMPTION = {
+    # NVIDIA RTX 50 Series
+    'RTX 5090': 575,
+    'RTX 5080': 320,
+    'RTX 5070 Ti': 320,
+    'RTX 5070': 250,
+    'RTX 5060 Ti': 190,
+    'RTX 5060': 170,
+    
+    # NVIDIA RTX 40 Series
+    'RTX 4090': 450,
+    'RTX 4080 SUPER': 320,
+    'RTX 4080': 320,
+    'RTX 4070 Ti SUPER': 285,
+    'RTX 4070 Ti': 285,
+    'RTX 4070 SUPER': 220,
+    'RTX 4070': 200,
+    'RTX 4060 Ti': 130,
+    'RTX 4060': 115,
+    
+    # NVIDIA RTX 30 Series
+    'RTX 3090': 420,
+    'RTX 3080 Ti': 420,
+    'RTX 3080 10GB': 320,
+    'RTX 3070': 220,
+    'RTX 3060 Ti': 210,
+    'RTX 3060 12GB': 170,
+    'RTX 3050': 70,
+    'RTX 3050 6GB': 70,
+    'RTX 3050 8GB': 70,
+    
+    # AMD RX 9000 Series
+    'RX 9070 XT': 420,
+    'RX 9070': 340,
+    'RX 9060 XT': 210,
+    
+    # AMD RX 7000 Series
+    'RX 7900 XTX': 420,
+    'RX 7900 XT': 380,
+    'RX 7900': 380,
+    'RX 7800 XT': 310,
+    'RX 7700 XT': 250,
+    'RX 7600 XT': 190,
+    'RX 7600': 100,
+    
+    # AMD RX 6000 Series
+    'RX 6800 XT': 305,
+    'RX 6800': 250,
+    'RX 6750 XT': 250,
+    'RX 6700 XT': 230,
+    'RX 6600': 110,
+    'RX 6500 XT': 107,
+    
+    # Intel Arc
+    'Arc B580': 190,
+    
+    # NVIDIA Legacy
+    'GTX 1660 SUPER': 125,
+    'GT 710': 19,
+    
+    # NVIDIA Professional
+    'RTX 6000 Ada Generation': 320,
+    'RTX A5000': 250,
+}
@@ -0,0 +1,155 @@
+"""
+Resolución de chipsets de GPU a un modelo canónico (TDP, URL de benchmark, gama).
+
+Sustituye los recorridos lineales sobre GPU_POWER_CONSUMPTION y
+GPU_BENCHMARK_URLS: todos los modelos conocidos se compilan una sola vez en un
+autómata Aho–Corasick sobre el texto en mayúsculas, de modo que un chipset se
+resuelve en una sola pasada. Un LRU delante evita incluso esa pasada para los
+chipsets repetidos (hay ~370 distintos en la BD).
+"""
+
+from collections import deque, namedtuple
+from functools import lru_cache
+
+GpuModel = namedtuple("GpuModel", ["chipset", "power_model", "tdp", "benchmark_model", "benchmark_url", "tier"])
+
+# Heurística de respaldo cuando ningún modelo conocido coincide (en orden)
+FALLBACK_TDP_RULES = (
+    (("RTX 4090", "RTX 3090", "RTX 5090"), 450),
+    (("RTX 408", "RTX 308", "RTX 508", "RX 7900", "RX 9070 XT"), 320),
+    (("RTX 407", "RTX 307", "RTX 507", "RX 7800", "RX 9060"), 250),
+)
+DEFAULT_TDP = 150  # Valor por defecto conservador
+
+# Gama aproximada según el TDP resuelto (umbral mínimo, nombre)
+TIER_THRESHOLDS = (
+    (400, "enthusiast"),
+    (280, "high"),
+    (180, "mid"),
+    (0, "entry"),
+)
+
+
+def tier_for_tdp(tdp):
+    for threshold, tier in TIER_THRESHOLDS:
+        if tdp >= threshold:
+            return tier
+    return "entry"
+
+
+class _Automaton:
+    """Aho–Corasick sobre caracteres; cada nodo guarda todos los patrones que terminan en él."""
+
+    def __init__(self, patterns):
+        self.goto = [{}]
+        self.fail = [0]
+        self.out = [()]
+
+        for index, pattern in enumerate(patterns):
+            node = 0
+            for char in pattern:
+                nxt = self.goto[node].get(char)
+                if nxt is None:
+                    nxt = len(self.goto)
+                    self.goto[node][char] = nxt
+                    self.goto.append({})
+                    self.fail.append(0)
+                    self.out.append(())
+                node = nxt
+            self.out[node] = self.out[node] + (index,)
+
+        # BFS para los enlaces de fallo; las salidas se heredan del nodo de fallo
+        queue = deque(self.goto[0].values())
+        while queue:
+            node = queue.popleft()
+            for char, nxt in self.goto[node].items():
+                queue.append(nxt)
+                fallback = self.fail[node]
+                while fallback and char not in self.goto[fallback]:
+                    fallback = self.fail[fallback]
+                self.fail[nxt] = self.goto[fallback].get(char, 0)
+                self.out[nxt] = self.out[nxt] + self.out[self.fail[nxt]]
+
+    def matches(self, text):
+        """Índices de todos los patrones contenidos en `text` (una sola pasada)."""
+        goto, fail, out = self.goto, self.fail, self.out
+        node = 0
+        found = []
+        for char in text:
+            while node and char not in goto[node]:
+                node = fail[node]
+            node = goto[node].get(char, 0)
+            if out[node]:
+                found.extend(out[node])
+        return found
+
+
+class ChipsetResolver:
+    """
+    Resuelve un chipset contra las tablas de consumo y de benchmarks a la vez.
+
+    Mantiene la semántica de las búsquedas originales por tabla: coincidencia
+    exacta (sin distinguir mayúsculas) y, si no, el modelo más largo contenido
+    en el chipset; ante empate gana el que aparece antes en su diccionario.
+    """
+
+    def __init__(self, power_table, url_table, cache_size=1024):
+        patterns = {}
+        for rank, model in enumerate(power_table):
+            patterns.setdefault(model.upper(), {})["power"] = (rank, model)
+        for rank, model in enumerate(url_table):
+            patterns.setdefault(model.upper(), {})["url"] = (rank, model)
+
+        self._patterns = list(patterns)
+        self._sources = [patterns[key] for key in self._patterns]
+        self._exact = {key: i for i, key in enumerate(self._patterns)}
+        self._automaton = _Automaton(self._patterns)
+        self._power_table = dict(power_table)
+        self._url_table = dict(url_table)
+
+        self.resolve = lru_cache(maxsize=cache_size)(self._resolve)
+
+    def _best(self, candidates, source):
+        """Modelo más largo (y primero en su tabla) entre los candidatos de `source`."""
+        best = None
+        best_key = None
+        for index in candidates:
+            entry = self._sources[index].get(source)
+            if entry is None:
+                continue
+            key = (-len(self._patterns[index]), entry[0])
+            if best_key is None or key < best_key:
+                best, best_key = entry[1], key
+        return best
+
+    def _resolve(self, chipset):
+        if not chipset:
+            return None
+
+        upper = chipset.strip().upper()
+        exact = self._exact.get(upper)
+        if exact is not None and len(self._sources[exact]) == 2:
+            # Coincidencia exacta presente en ambas tablas: es la más larga posible
+            candidates = (exact,)
+        else:
+            candidates = self._automaton.matches(upper)
+
+        power_model = self._best(candidates, "power")
+        benchmark_model = self._best(candidates, "url")
+
+        if power_model is not None:
+            tdp = self._power_table[power_model]
+        else:
+            tdp = next(
+                (watts for keys, watts in FALLBACK_TDP_RULES if any(k in upper for k in keys)),
+                DEFAULT_TDP,
+            )
+
+        return GpuModel(
+            chipset=chipset,
+            power_model=power_model,
+            tdp=tdp,
+            benchmark_model=benchmark_model,
+            benchmark_url=self._url_table[benchmark_model] if benchmark_model else None,
+            tier=tier_for_tdp(tdp),
+        )
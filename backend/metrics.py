@@ -0,0 +1,116 @@
+"""
+Métricas en formato de texto de Prometheus.
+
+Histogramas de latencia con buckets fijos (Prometheus calcula p50/p99 con
+`histogram_quantile`) y utilidades para exportar contadores que ya llevan
+otras piezas (pool de conexiones, caché de resultados). Observar un valor
+cuesta una bisección y una suma bajo un lock: apto para el camino caliente.
+"""
+
+import threading
+import time
+from bisect import bisect_left
+from contextlib import contextmanager
+
+# Buckets en segundos: de 10 µs (búsqueda en el catálogo) a 2.5 s (lotes grandes)
+LATENCY_BUCKETS = (
+    0.00001, 0.000025, 0.00005, 0.0001, 0.00025, 0.0005,
+    0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5,
+)
+
+# Claves de los dicts de stats() que son contadores monótonos (el resto, gauges)
+COUNTER_KEYS = frozenset({
+    "checkouts", "hits", "misses", "waits", "discarded",
+    "evictions", "expirations", "invalidations",
+    "commits", "writes", "rejected", "failed",
+})
+
+
+def _labels(names, values, extra=()):
+    pairs = [*zip(names, values), *extra]
+    if not pairs:
+        return ""
+    return "{" + ",".join(f'{name}="{value}"' for name, value in pairs) + "}"
+
+
+def _number(value):
+    return repr(float(value)) if isinstance(value, float) else str(value)
+
+
+class Histogram:
+    """Histograma con etiquetas; `observe` y `time` son thread-safe."""
+
+    def __init__(self, name, help_text, labelnames=(), buckets=LATENCY_BUCKETS):
+        self.name = name
+        self.help = help_text
+        self.labelnames = tuple(labelnames)
+        self.buckets = tuple(buckets)
+        self._series = {}  # valores de etiquetas -> [conteos por bucket..., +Inf], suma
+        self._lock = threading.Lock()
+
+    def observe(self, value, *labels):
+        index = bisect_left(self.buckets, value)
+        with self._lock:
+            series = self._series.get(labels)
+            if series is None:
+                series = self._series[labels] = [[0] * (len(self.buckets) + 1), 0.0]
+            series[0][index] += 1
+            series[1] += value
+
+    @contextmanager
+    def time(self, *labels):
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(time.perf_counter() - start, *labels)
+
+    def render(self):
+        lines = [f"# HELP {self.name} {self.help}", f"# TYPE {self.name} histogram"]
+        with self._lock:
+            series = sorted((labels, list(counts), total) for labels, (counts, total) in self._series.items())
+        for labels, counts, total in series:
+            cumulative = 0
+            for bound, count in zip((*self.buckets, "+Inf"), counts):
+                cumulative += count
+                le = bound if bound == "+Inf" else repr(bound)
+                lines.append(f"{self.name}_bucket{_labels(self.labelnames, labels, [('le', le)])} {cumulative}")
+            lines.append(f"{self.name}_sum{_labels(self.labelnames, labels)} {total!r}")
+            lines.append(f"{self.name}_count{_labels(self.labelnames, labels)} {cumulative}")
+        return lines
+
+
+def render_stats(prefix, stats, help_text):
+    """Líneas Prometheus para un dict de stats() (contadores -> _total, el resto gauges)."""
+    lines = []
+    for key, value in stats.items():
+        if not isinstance(value, (int, float)) or isinstance(value, bool):
+            continue  # None (p. ej. hit_rate sin datos) o texto
+        if key in COUNTER_KEYS:
+            name, kind = f"{prefix}_{key}_total", "counter"
+        else:
+            name, kind = f"{prefix}_{key}", "gauge"
+        lines += [f"# HELP {name} {help_text}: {key}", f"# TYPE {name} {kind}", f"{name} {_number(value)}"]
+    return lines
+
+
+# ------------------------------------------------
+# MÉTRICAS DEL PROCESO
+# ------------------------------------------------
+REQUEST_SECONDS = Histogram(
+    "buildsensei_request_seconds", "Latencia de las peticiones HTTP por endpoint", ("endpoint",))
+LOOKUP_SECONDS = Histogram(
+    "buildsensei_lookup_seconds", "Búsqueda de un componente en el catálogo", ("component",))
+STAGE_SECONDS = Histogram(
+    "buildsensei_stage_seconds", "Etapas de la evaluación de compatibilidad", ("stage",))
+
+HISTOGRAMS = (REQUEST_SECONDS, LOOKUP_SECONDS, STAGE_SECONDS)
+
+
+def render(extra_lines=()):
+    """Exposición completa: histogramas del proceso más `extra_lines`."""
+    lines = []
+    for histogram in HISTOGRAMS:
+        lines += histogram.render()
+    lines += extra_lines
+    return "\n".join(lines) + "\n"
@@ -0,0 +1,107 @@
+"""
+Caché de respuestas precomputadas para los endpoints de listas (JSON) y la
+exportación del catálogo (binaria, ver catalog_export.py).
+
+Cada payload se serializa una sola vez por versión del catálogo y se guarda
+ya comprimido (gzip y deflate, ambos de la librería estándar). Se sirve con
+ETags fuertes para que el navegador reciba `304 Not Modified` en visitas
+repetidas, y se invalida automáticamente cuando el catálogo se recarga.
+"""
+
+import gzip
+import hashlib
+import json
+import threading
+import zlib
+
+from flask import Response, request
+
+# Codificaciones soportadas, en orden de preferencia
+ENCODINGS = ("gzip", "deflate")
+
+
+class CachedPayload:
+    """Un cuerpo serializado (JSON, o bytes ya codificados) más sus variantes comprimidas."""
+
+    __slots__ = ("bodies", "etags")
+
+    def __init__(self, data):
+        if isinstance(data, bytes):
+            body = data
+        else:
+            body = json.dumps(data, ensure_ascii=False, separators=(",", ":")).encode("utf-8")
+        digest = hashlib.sha256(body).hexdigest()[:32]
+
+        self.bodies = {
+            "identity": body,
+            "gzip": gzip.compress(body, compresslevel=9, mtime=0),
+            "deflate": zlib.compress(body, 9),
+        }
+        # Una ETag fuerte distinta por representación (RFC 9110 §8.8.3)
+        self.etags = {
+            encoding: digest if encoding == "identity" else f"{digest}-{encoding}"
+            for encoding in self.bodies
+        }
+
+    def size(self, encoding="identity"):
+        return len(self.bodies[encoding])
+
+
+def _negotiate_encoding():
+    accepted = request.accept_encodings
+    for encoding in ENCODINGS:
+        if accepted[encoding] > 0:
+            return encoding
+    return "identity"
+
+
+class PayloadCache:
+    """
+    Payloads por nombre, ligados a una versión del catálogo.
+
+    `respond(name, builder)` construye el payload con `builder(snapshot)` la
+    primera vez que se pide en la versión actual y después lo reutiliza. Con
+    cache=False lo construye en cada petición sin guardarlo (payloads de los
+    que puede haber demasiadas variantes).
+    """
+
+    def __init__(self, catalog):
+        self.catalog = catalog
+        self._version = None
+        self._payloads = {}
+        self._lock = threading.Lock()
+
+    def get(self, name, builder, cache=True):
+        snapshot = self.catalog.snapshot()
+        if not cache:
+            return CachedPayload(builder(snapshot))
+        payloads = self._payloads
+        if self._version == snapshot.version and name in payloads:
+            return payloads[name]
+
+        with self._lock:
+            if self._version != snapshot.version:
+                self._payloads = payloads = {}
+                self._version = snapshot.version
+            payload = payloads.get(name)
+            if payload is None:
+                payload = payloads[name] = CachedPayload(builder(snapshot))
+        return payload
+
+    def respond(self, name, builder, mimetype="application/json", cache=True):
+        payload = self.get(name, builder, cache)
+        encoding = _negotiate_encoding()
+        etag = payload.etags[encoding]
+
+        if request.if_none_match.contains(etag):
+            response = Response(status=304)
+        else:
+            response = Response(payload.bodies[encoding], mimetype=mimetype)
+            if encoding != "identity":
+                response.headers["Content-Encoding"] = encoding
+
+        response.set_etag(etag)
+        response.headers["Vary"] = "Accept-Encoding"
+        # Los navegadores pueden guardar la respuesta, pero deben revalidarla
+        response.headers["Cache-Control"] = "no-cache"
+        return response
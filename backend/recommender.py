@@ -0,0 +1,355 @@
+"""
+Recomendador de builds bajo presupuesto.
+
+Busca en el espacio CPU x GPU x motherboard x RAM x PSU las mejores builds
+compatibles y sin cuello de botella, usando las mismas reglas que
+/api/check-compatibility. Para no recorrer el producto completo:
+
+ - Las GPUs se agrupan por TDP (las reglas de potencia y de cuello de botella
+   solo dependen del TDP), y de cada grupo queda la más barata.
+ - Las CPUs se agrupan por (socket, núcleos, boost) y de cada grupo queda la
+   más barata (dominancia: mismas restricciones, mismo score, más cara).
+ - Placa + RAM no afectan al score: por socket se precalcula la plataforma
+   más barata que cumple los slots y la capacidad mínima.
+ - La PSU más barata para cada TDP sale de un índice ordenado por vatios.
+ - La combinación CPU x GPU se recorre por score descendente con
+   ramificación y poda contra el k-ésimo mejor resultado.
+"""
+
+import heapq
+import math
+from bisect import bisect_left
+from collections import namedtuple
+
+from compatibility import (
+    COMPONENT_TABLES, CPU_POWER_TDP, PSU_SAFETY_MARGIN, BuildParts, cpu_features, detect_bottleneck,
+    evaluate_build, get_gpu_power,
+)
+
+# Peso de CPU y GPU en el score según el uso objetivo
+USE_WEIGHTS = {
+    "gaming": {"cpu": 0.3, "gpu": 0.7},
+    "workstation": {"cpu": 0.7, "gpu": 0.3},
+}
+
+# Capacidad mínima de RAM (GB) según el uso objetivo
+MIN_MEMORY_GB = {
+    "gaming": 16,
+    "workstation": 32,
+}
+
+PINNABLE = tuple(COMPONENT_TABLES)
+
+Platform = namedtuple("Platform", ["board_pos", "memory_pos", "price"])
+
+
+class RecommendationError(ValueError):
+    """Parámetros de recomendación inválidos (uso desconocido, pieza fijada inexistente...)."""
+
+
+def _price(table, pos):
+    price = table.column("price")[pos]
+    return None if math.isnan(price) else price
+
+
+def _memory_layout(table, pos):
+    """(número de módulos, capacidad total en GB) de una fila de memoria."""
+    return table.value(pos, "module_count") or 0, float(table.value(pos, "capacity_gb") or 0)
+
+
+class RecommenderIndex:
+    """Índices del catálogo independientes del presupuesto, construidos una vez por snapshot."""
+
+    def __init__(self, snapshot):
+        cpus = snapshot["cpu"]
+        gpus = snapshot["video_card"]
+        boards = snapshot["motherboard"]
+        memory = snapshot["memory"]
+        psus = snapshot["power_supply"]
+
+        # ---- CPUs: la más barata por (socket, núcleos, boost) ----
+        groups = {}
+        for pos in range(len(cpus)):
+            price = _price(cpus, pos)
+            socket = cpus.column("socket")[pos]
+            if price is None or socket is None:
+                continue
+            cores, boost, _ = self._features(cpus, pos)
+            key = (socket.lower(), cores, boost)
+            if key not in groups or price < groups[key][0]:
+                groups[key] = (price, pos)
+        self.cpus = [(key[0], pos, price) for key, (price, pos) in groups.items()]
+        self.max_cpu_score = max((cores * boost for _, cores, boost in groups), default=0) or 1.0
+
+        # ---- GPUs: la más barata por TDP resuelto ----
+        by_tdp = {}
+        for pos, chipset in enumerate(gpus.column("chipset")):
+            price = _price(gpus, pos)
+            if price is None:
+                continue
+            tdp = get_gpu_power(chipset)
+            if tdp not in by_tdp or price < by_tdp[tdp][0]:
+                by_tdp[tdp] = (price, pos)
+        self.gpus = [(tdp, pos, price) for tdp, (price, pos) in by_tdp.items()]
+        self.max_gpu_tdp = max(by_tdp, default=0) or 1.0
+
+        # ---- PSUs ordenadas por vatios, con mínimo de precio en el sufijo ----
+        priced = sorted(
+            (psus.value(pos, "wattage"), price, pos)
+            for pos in range(len(psus))
+            if (price := _price(psus, pos)) is not None and psus.value(pos, "wattage") is not None
+        )
+        self.psu_watts = [watts for watts, _, _ in priced]
+        self.psu_cheapest_from = [None] * len(priced)
+        best = None
+        for i in range(len(priced) - 1, -1, -1):
+            if best is None or priced[i][1] < best[1]:
+                best = priced[i]
+            self.psu_cheapest_from[i] = (best[2], best[1])
+
+        # ---- Placas: la más barata por (socket, slots) ----
+        self.boards = {}
+        for pos in range(len(boards)):
+            price = _price(boards, pos)
+            if price is None:
+                continue
+            socket = boards.column("socket")[pos].lower()
+            slots = boards.value(pos, "memory_slots") or 0
+            per_socket = self.boards.setdefault(socket, {})
+            if slots not in per_socket or price < per_socket[slots][0]:
+                per_socket[slots] = (price, pos)
+
+        # ---- RAM: (módulos, capacidad, precio, posición) ----
+        self.memory = [
+            (*_memory_layout(memory, pos), price, pos)
+            for pos in range(len(memory))
+            if (price := _price(memory, pos)) is not None
+        ]
+        self._platforms = {}
+
+    @staticmethod
+    def _features(cpus, pos):
+        """
+        (núcleos, boost, score) de una CPU tal como los ve detect_bottleneck:
+        la misma fuente para agrupar, puntuar y comprobar el cuello de botella.
+        """
+        return cpu_features(cpus.value(pos, "core_count"), cpus.value(pos, "boost_clock"))
+
+    def cheapest_psu(self, required_watts):
+        """(posición, precio) de la PSU más barata con al menos `required_watts`, o None."""
+        i = bisect_left(self.psu_watts, required_watts)
+        return self.psu_cheapest_from[i] if i < len(self.psu_watts) else None
+
+    def cheapest_memory(self, min_gb):
+        """RAM más barata por número de módulos: {módulos: (precio, posición)}."""
+        best = {}
+        for modules, capacity, price, pos in self.memory:
+            if modules <= 0 or capacity < min_gb:
+                continue
+            if modules not in best or price < best[modules][0]:
+                best[modules] = (price, pos)
+        return best
+
+    def platform(self, socket, min_gb):
+        """Placa + RAM más baratas para `socket` con al menos `min_gb` de RAM (cacheado)."""
+        key = (socket, min_gb)
+        if key not in self._platforms:
+            memory = self.cheapest_memory(min_gb)
+            self._platforms[key] = _cheapest_platform(self.boards.get(socket, {}), memory)
+        return self._platforms[key]
+
+
+def _cheapest_platform(boards_by_slots, memory_by_modules):
+    best = None
+    for slots, (board_price, board_pos) in boards_by_slots.items():
+        for modules, (memory_price, memory_pos) in memory_by_modules.items():
+            if modules > slots:
+                continue
+            price = board_price + memory_price
+            if best is None or price < best.price:
+                best = Platform(board_pos, memory_pos, price)
+    return best
+
+
+def get_index(snapshot):
+    return snapshot.derived("recommender", RecommenderIndex)
+
+
+# ------------------------------------------------
+# BÚSQUEDA
+# ------------------------------------------------
+def _pinned_position(snapshot, kind, row_id):
+    table = snapshot[COMPONENT_TABLES[kind]]
+    pos = table.position(row_id)
+    if pos is None:
+        raise RecommendationError(f"Componente fijado no encontrado: {kind}={row_id}")
+    return table, pos
+
+
+def recommend(snapshot, budget, use="gaming", pinned=None, limit=5):
+    """
+    Devuelve hasta `limit` builds ordenadas por score para el presupuesto dado.
+    `pinned` fija componentes por id: {"cpu": 12, "psu": 40, ...}.
+    """
+    if use not in USE_WEIGHTS:
+        raise RecommendationError(f"Uso desconocido. Usa uno de: {', '.join(USE_WEIGHTS)}.")
+    pinned = pinned or {}
+    unknown = set(pinned) - set(PINNABLE)
+    if unknown:
+        raise RecommendationError(f"No se puede fijar: {', '.join(sorted(unknown))}.")
+
+    index = get_index(snapshot)
+    weights = USE_WEIGHTS[use]
+    min_gb = MIN_MEMORY_GB[use]
+    cpus_table = snapshot["cpu"]
+
+    # ---- Candidatos (aplicando piezas fijadas) ----
+    cpu_candidates = index.cpus
+    if "cpu" in pinned:
+        table, pos = _pinned_position(snapshot, "cpu", pinned["cpu"])
+        socket = table.column("socket")[pos]
+        cpu_candidates = [(socket.lower(), pos, _price(table, pos) or 0.0)] if socket else []
+
+    gpu_candidates = index.gpus
+    if "gpu" in pinned:
+        table, pos = _pinned_position(snapshot, "gpu", pinned["gpu"])
+        gpu_candidates = [(get_gpu_power(table.column("chipset")[pos]), pos, _price(table, pos) or 0.0)]
+
+    platform_for = _platform_resolver(snapshot, index, pinned, min_gb)
+    psu_for = _psu_resolver(snapshot, index, pinned)
+
+    # CPU: score = núcleos x boost; GPU: score = TDP (mismos proxies que detect_bottleneck)
+    cpu_options = []
+    for socket, pos, price in cpu_candidates:
+        platform = platform_for(socket)
+        if platform is None:
+            continue
+        score = RecommenderIndex._features(cpus_table, pos)[2]
+        cpu_options.append((score, pos, price + platform.price, platform))
+
+    gpu_options = []
+    for tdp, pos, price in gpu_candidates:
+        psu = psu_for(tdp)
+        if psu is None:
+            continue
+        gpu_options.append((tdp, pos, price + psu[1], psu[0]))
+
+    if not cpu_options or not gpu_options:
+        return []
+
+    # Normalización contra todo el catálogo (no solo los candidatos) para que
+    # los scores sean comparables con y sin piezas fijadas
+    max_cpu = max(index.max_cpu_score, max(score for score, *_ in cpu_options))
+    max_gpu = max(index.max_gpu_tdp, max(tdp for tdp, *_ in gpu_options))
+    cpu_options.sort(key=lambda option: -option[0])
+    gpu_options.sort(key=lambda option: -option[0])
+    min_cpu_cost = min(cost for _, _, cost, _ in cpu_options)
+
+    # ---- Ramificación y poda ----
+    best = []  # min-heap de (score, desempate, cpu_option, gpu_option)
+    feasible_cache = {}
+    for gpu_option in gpu_options:
+        tdp, _, gpu_cost, _ = gpu_option
+        gpu_part = weights["gpu"] * tdp / max_gpu
+        if len(best) == limit and gpu_part + weights["cpu"] <= best[0][0]:
+            break  # ninguna GPU restante (más débil) puede mejorar el top-k
+        if gpu_cost + min_cpu_cost > budget:
+            continue
+
+        for cpu_option in cpu_options:
+            cpu_score, cpu_pos, cpu_cost, _ = cpu_option
+            score = gpu_part + weights["cpu"] * cpu_score / max_cpu
+            if len(best) == limit and score <= best[0][0]:
+                break  # CPUs ordenadas por score: el resto tampoco mejora
+            if gpu_cost + cpu_cost > budget:
+                continue
+
+            cores, boost, _ = RecommenderIndex._features(cpus_table, cpu_pos)
+            key = (cores, boost, tdp)
+            if key not in feasible_cache:
+                verdict = detect_bottleneck(cores, boost, cpus_table.value(cpu_pos, "tdp"), tdp)
+                feasible_cache[key] = verdict["result"] == "no_significant_bottleneck"
+            if not feasible_cache[key]:
+                continue
+
+            entry = (score, -(gpu_cost + cpu_cost), cpu_option, gpu_option)
+            if len(best) < limit:
+                heapq.heappush(best, entry)
+            else:
+                heapq.heappushpop(best, entry)
+
+    return [_materialize(snapshot, score, cpu_option, gpu_option)
+            for score, _, cpu_option, gpu_option in sorted(best, reverse=True)]
+
+
+def _platform_resolver(snapshot, index, pinned, min_gb):
+    """Función socket -> Platform teniendo en cuenta placa y RAM fijadas."""
+    board = memory = None
+    if "motherboard" in pinned:
+        board = _pinned_position(snapshot, "motherboard", pinned["motherboard"])
+    if "memory" in pinned:
+        memory = _pinned_position(snapshot, "memory", pinned["memory"])
+
+    if board is None and memory is None:
+        return lambda socket: index.platform(socket, min_gb)
+
+    if board is not None:
+        table, pos = board
+        board_socket = table.column("socket")[pos].lower()
+        boards = {table.value(pos, "memory_slots") or 0: (_price(table, pos) or 0.0, pos)}
+    if memory is not None:
+        table, pos = memory
+        modules, _ = _memory_layout(table, pos)
+        memory_by_modules = {modules: (_price(table, pos) or 0.0, pos)}
+    else:
+        memory_by_modules = index.cheapest_memory(min_gb)
+
+    cache = {}
+
+    def resolve(socket):
+        if socket not in cache:
+            if board is not None:
+                cache[socket] = _cheapest_platform(boards, memory_by_modules) if socket == board_socket else None
+            else:
+                cache[socket] = _cheapest_platform(index.boards.get(socket, {}), memory_by_modules)
+        return cache[socket]
+
+    return resolve
+
+
+def _psu_resolver(snapshot, index, pinned):
+    """Función TDP de GPU -> (posición, precio) de la PSU a usar, o None."""
+    if "psu" in pinned:
+        table, pos = _pinned_position(snapshot, "psu", pinned["psu"])
+        watts = table.value(pos, "wattage") or 0
+        price = _price(table, pos) or 0.0
+        return lambda tdp: (pos, price) if watts >= (tdp + CPU_POWER_TDP) * PSU_SAFETY_MARGIN else None
+    return lambda tdp: index.cheapest_psu((tdp + CPU_POWER_TDP) * PSU_SAFETY_MARGIN)
+
+
+def _materialize(snapshot, score, cpu_option, gpu_option):
+    _, cpu_pos, _, platform = cpu_option
+    _, gpu_pos, _, psu_pos = gpu_option
+    positions = {
+        "cpu": ("cpu", cpu_pos),
+        "gpu": ("video_card", gpu_pos),
+        "motherboard": ("motherboard", platform.board_pos),
+        "memory": ("memory", platform.memory_pos),
+        "psu": ("power_supply", psu_pos),
+    }
+    rows = {kind: snapshot[table].row(pos) for kind, (table, pos) in positions.items()}
+
+    components = {}
+    total = 0.0
+    for kind, row in rows.items():
+        price = row.price or 0.0
+        total += price
+        components[kind] = {"id": row.id, "name": row.name, "price": row.price}
+    components["gpu"]["chipset"] = rows["gpu"].chipset
+
+    return {
+        "score": round(score, 4),
+        "total_price": round(total, 2),
+        "components": components,
+        "analysis": evaluate_build(BuildParts(**rows)),
+    }
@@ -0,0 +1,95 @@
+"""
+Caché de resultados de compatibilidad.
+
+Las combinaciones populares se piden una y otra vez; esta caché guarda la
+respuesta ya serializada de /api/check-compatibility por build normalizada
+(cpu, chipset de GPU, motherboard, memoria, id de PSU). Es LRU con TTL, está
+acotada en bytes (no en entradas) y se vacía cuando avanza la versión del
+catálogo, así una recarga de datos nunca sirve resultados viejos. Las
+peticiones que aún usan un snapshot anterior ni leen ni escriben.
+"""
+
+import threading
+import time
+from collections import OrderedDict
+
+# Coste fijo aproximado de una entrada (tupla, claves, nodo del OrderedDict)
+ENTRY_OVERHEAD = 256
+
+
+class ResultCache:
+    """LRU + TTL acotada por bytes, con contadores de aciertos/fallos/desalojos."""
+
+    def __init__(self, max_bytes=8 * 1024 * 1024, ttl=300.0):
+        self.max_bytes = max_bytes
+        self.ttl = ttl
+        self.version = None
+        self._entries = OrderedDict()  # clave -> (expira, bytes, status, body)
+        self._bytes = 0
+        self._lock = threading.Lock()
+        self.hits = self.misses = self.evictions = self.expirations = self.invalidations = 0
+
+    @staticmethod
+    def entry_size(key, body):
+        return ENTRY_OVERHEAD + len(body) + sum(len(str(part)) for part in key)
+
+    def _check_version(self, version):
+        """Avanza a `version` si es más nueva; True si es la versión actual."""
+        if self.version is None or version > self.version:
+            if self._entries:
+                self.invalidations += 1
+            self._entries.clear()
+            self._bytes = 0
+            self.version = version
+        return version == self.version
+
+    def get(self, version, key):
+        """(status, body) cacheado para `key` en esa versión del catálogo, o None."""
+        with self._lock:
+            entry = self._entries.get(key) if self._check_version(version) else None
+            if entry is None:
+                self.misses += 1
+                return None
+            expires, size, status, body = entry
+            if expires < time.monotonic():
+                del self._entries[key]
+                self._bytes -= size
+                self.expirations += 1
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return status, body
+
+    def put(self, version, key, status, body):
+        size = self.entry_size(key, body)
+        if size > self.max_bytes:
+            return
+        with self._lock:
+            if not self._check_version(version):
+                return
+            previous = self._entries.pop(key, None)
+            if previous is not None:
+                self._bytes -= previous[1]
+            self._entries[key] = (time.monotonic() + self.ttl, size, status, body)
+            self._bytes += size
+            while self._bytes > self.max_bytes:
+                _, (_, evicted, _, _) = self._entries.popitem(last=False)
+                self._bytes -= evicted
+                self.evictions += 1
+
+    def stats(self):
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "entries": len(self._entries),
+                "bytes": self._bytes,
+                "max_bytes": self.max_bytes,
+                "ttl_seconds": self.ttl,
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_rate": round(self.hits / lookups, 4) if lookups else None,
+                "evictions": self.evictions,
+                "expirations": self.expirations,
+                "invalidations": self.invalidations,
+            }
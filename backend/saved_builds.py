@@ -0,0 +1,398 @@
+"""
+Builds guardadas y su revalidación incremental.
+
+Las builds se guardan por ids de componente en una BD aparte (builds.db, ver
+database/scripts_sql/create_builds.sql), junto con el último resultado de
+compatibilidad ya serializado y un id corto para compartirlas. BuildStore
+(lo usa /api/builds) lee con un pool de solo lectura y escribe a través de
+un único hilo que agrupa las escrituras en lotes (BuildWriter).
+
+Cuando el loader actualiza filas del catálogo (precios, vatios, specs),
+`revalidate` no recorre todas las builds: con los índices por columna *_id
+(el índice componente -> builds) selecciona solo las que usan alguna fila
+cambiada, las vuelve a evaluar en bloque sobre el catálogo nuevo y guarda
+los resultados en una sola transacción.
+
+    python backend/saved_builds.py --all     # revalidar todas (p. ej. tras cambiar las reglas)
+"""
+
+import json
+import logging
+import os
+import queue
+import secrets
+import sqlite3
+import threading
+import time
+from collections import namedtuple
+from concurrent.futures import Future
+
+from compatibility import COMPONENT_TABLES, BuildError, evaluate_build, resolve_ids
+from db_pool import get_pool
+
+logger = logging.getLogger(__name__)
+
+BASE_DIR = os.path.dirname(os.path.abspath(__file__))
+BUILDS_DB_PATH = os.path.join(BASE_DIR, "database", "builds.db")
+BUILDS_SCHEMA_PATH = os.path.join(BASE_DIR, "database", "scripts_sql", "create_builds.sql")
+
+# Tipo de componente -> columna de la tabla builds
+BUILD_COLUMNS = {kind: f"{kind}_id" for kind in COMPONENT_TABLES}
+TABLE_KINDS = {table: kind for kind, table in COMPONENT_TABLES.items()}
+
+# Builds por UPDATE en bloque
+REVALIDATE_CHUNK = 5000
+
+# Escritor: operaciones en cola, por lote (group commit) y espera máxima
+# para completar un lote antes de confirmarlo
+DEFAULT_QUEUE_SIZE = 1024
+DEFAULT_BATCH_SIZE = 256
+DEFAULT_LINGER = 0.002
+
+# Bytes aleatorios del id compartible (6 -> 8 caracteres base64url)
+SHARE_ID_BYTES = 6
+SHARE_ID_ATTEMPTS = 5
+
+_SELECT_BUILDS = f"SELECT id, {', '.join(BUILD_COLUMNS.values())} FROM builds"
+# Solo si la build sigue teniendo los componentes evaluados (ver revalidate)
+_UPDATE_RESULT = (f"UPDATE builds SET compatible = ?, result = ?, checked_at = ? "
+                  f"WHERE id = ? AND {' AND '.join(f'{col} = ?' for col in BUILD_COLUMNS.values())}")
+_SELECT_SHARED = (f"SELECT {', '.join(BUILD_COLUMNS.values())}, compatible, result, checked_at, created_at "
+                  f"FROM builds WHERE share_id = ?")
+_INSERT_BUILD = (f"INSERT INTO builds (share_id, {', '.join(BUILD_COLUMNS.values())}, "
+                 f"compatible, result, checked_at, created_at) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)")
+_UPDATE_BUILD = (f"UPDATE builds SET {', '.join(f'{col} = ?' for col in BUILD_COLUMNS.values())}, "
+                 f"compatible = ?, result = ?, checked_at = ? WHERE share_id = ?")
+_DELETE_BUILD = "DELETE FROM builds WHERE share_id = ?"
+
+
+def connect(db_path=BUILDS_DB_PATH):
+    """Conexión a la BD de builds; crea el esquema si falta."""
+    conn = sqlite3.connect(db_path)
+    conn.execute("PRAGMA synchronous = NORMAL")
+    with open(BUILDS_SCHEMA_PATH, "r", encoding="utf-8") as f:
+        conn.executescript(f.read())
+    return conn
+
+
+def encode_result(result):
+    """Resultado -> JSON compacto con claves ordenadas, como lo serializa Flask."""
+    return json.dumps(result, sort_keys=True, separators=(",", ":"))
+
+
+def evaluate_saved(snapshot, ids, memo=None):
+    """
+    (compatible, JSON del resultado) de una build guardada. Si algún
+    componente ya no está en el catálogo, compatible es None y el resultado
+    es {"error": ...}.
+    """
+    try:
+        result = evaluate_build(resolve_ids(snapshot, ids), memo)
+    except BuildError as exc:
+        return None, encode_result({"error": str(exc)})
+    return int(result["compatible"]), encode_result(result)
+
+
+def dependent_builds(conn, changed):
+    """
+    Cursor de (id, *ids de componente en el orden de BUILD_COLUMNS) de las
+    builds que usan alguna fila cambiada. `changed` es {tabla: ids} tal como
+    lo emite el loader; cada build sale una vez aunque dependa de varias filas.
+    """
+    selects, params = [], []
+    for table, ids in changed.items():
+        if ids and table in TABLE_KINDS:
+            column = BUILD_COLUMNS[TABLE_KINDS[table]]
+            selects.append(f"{_SELECT_BUILDS} WHERE {column} IN (SELECT value FROM json_each(?))")
+            params.append(json.dumps(sorted(ids)))
+    if not selects:
+        return iter(())
+    return conn.execute(" UNION ".join(selects), params)
+
+
+def revalidate(conn, snapshot, changed=None, chunk_size=REVALIDATE_CHUNK):
+    """
+    Reevalúa y guarda el resultado de las builds afectadas por `changed`
+    ({tabla: ids}; None = todas) sobre `snapshot`. Las builds con los mismos
+    componentes se evalúan una vez y las etapas de las reglas se comparten
+    (ver evaluate_build). Devuelve cuántas builds se actualizaron.
+
+    La evaluación no bloquea al escritor de /api/builds: cada UPDATE lleva
+    los componentes evaluados en el WHERE, así una build cambiada por un PUT
+    entre la lectura y la escritura se omite en lugar de quedarse con el
+    veredicto de sus componentes anteriores.
+    """
+    cursor = conn.execute(_SELECT_BUILDS) if changed is None else dependent_builds(conn, changed)
+    kinds = tuple(BUILD_COLUMNS)
+    memo, outcomes = {}, {}
+    checked_at = time.time()
+    updated = 0
+
+    # Se lee y se evalúa todo antes de escribir: el cursor y los UPDATE
+    # comparten conexión, y el lock de escritura solo se toma para los UPDATE
+    updates = []
+    for build_id, *component_ids in cursor.fetchall():
+        key = tuple(component_ids)
+        outcome = outcomes.get(key)
+        if outcome is None:
+            outcome = outcomes[key] = evaluate_saved(snapshot, dict(zip(kinds, key)), memo)
+        updates.append((*outcome, checked_at, build_id, *key))
+    with conn:
+        for start in range(0, len(updates), chunk_size):
+            updated += conn.executemany(_UPDATE_RESULT, updates[start:start + chunk_size]).rowcount
+    skipped = len(updates) - updated
+    logger.info("%d builds revalidadas (%d combinaciones distintas, %d cambiadas mientras tanto)",
+                updated, len(outcomes), skipped)
+    return updated
+
+
+# ------------------------------------------------
+# ESCRITOR POR LOTES
+# ------------------------------------------------
+class WriterBusy(RuntimeError):
+    """La cola del escritor está llena: la petición debe reintentarse más tarde."""
+
+
+class BuildWriter:
+    """
+    Único escritor de builds.db, en un hilo propio (se arranca con el primer
+    `submit`).
+
+    Cada petición encola una operación `func(conn, *args)` y espera su Future.
+    El hilo toma lo que haya en la cola (hasta `batch_size` operaciones,
+    esperando como mucho `linger` segundos a que llegue más) y lo aplica en
+    una sola transacción: una ráfaga de guardados paga un commit por lote en
+    lugar de uno por petición y no compite por el lock de escritura de SQLite.
+    Cada operación va en su propio SAVEPOINT, así un fallo solo afecta a la
+    suya. La cola es acotada: llena, `submit` lanza WriterBusy.
+    """
+
+    def __init__(self, db_path, queue_size=DEFAULT_QUEUE_SIZE, batch_size=DEFAULT_BATCH_SIZE,
+                 linger=DEFAULT_LINGER):
+        self.db_path = db_path
+        self.batch_size = batch_size
+        self.linger = linger
+        self._queue = queue.Queue(queue_size)
+        self._thread = None
+        self._start_lock = threading.Lock()
+        self._commits = self._writes = self._rejected = self._failed = 0
+
+    def submit(self, func, *args):
+        """Encola `func(conn, *args)`; devuelve un Future con su resultado."""
+        if self._thread is None:
+            self._start()
+        future = Future()
+        try:
+            self._queue.put_nowait((func, args, future))
+        except queue.Full:
+            self._rejected += 1
+            raise WriterBusy("Demasiadas escrituras pendientes") from None
+        return future
+
+    def _start(self):
+        with self._start_lock:
+            if self._thread is None:
+                self._thread = threading.Thread(target=self._run, name="buildsensei-builds-writer", daemon=True)
+                self._thread.start()
+
+    def close(self, timeout=None):
+        """Aplica lo que quede en la cola y detiene el hilo."""
+        if self._thread is not None:
+            self._queue.put(None)
+            self._thread.join(timeout)
+
+    def _run(self):
+        conn = connect(self.db_path)
+        conn.isolation_level = None  # transacciones explícitas (BEGIN/SAVEPOINT)
+        try:
+            running = True
+            while running:
+                item = self._queue.get()
+                if item is None:
+                    break
+                batch = [item]
+                deadline = time.monotonic() + self.linger
+                while len(batch) < self.batch_size:
+                    try:
+                        item = self._queue.get(timeout=max(0.0, deadline - time.monotonic()))
+                    except queue.Empty:
+                        break
+                    if item is None:
+                        running = False
+                        break
+                    batch.append(item)
+                self._commit(conn, batch)
+        finally:
+            conn.close()
+
+    def _commit(self, conn, batch):
+        outcomes = []
+        try:
+            conn.execute("BEGIN IMMEDIATE")
+            for func, args, future in batch:
+                conn.execute("SAVEPOINT operation")
+                try:
+                    outcomes.append((future, func(conn, *args), None))
+                except Exception as exc:  # cualquier fallo de la operación: solo se deshace la suya
+                    conn.execute("ROLLBACK TO operation")
+                    outcomes.append((future, None, exc))
+                conn.execute("RELEASE operation")
+            conn.execute("COMMIT")
+        except Exception as exc:  # el hilo sigue vivo: se falla el lote entero
+            logger.warning("No se pudo confirmar un lote de %d escrituras: %s", len(batch), exc)
+            if conn.in_transaction:
+                try:
+                    conn.execute("ROLLBACK")
+                except sqlite3.Error:
+                    logger.exception("No se pudo deshacer el lote")
+            self._failed += len(batch)
+            for _, _, future in batch:
+                future.set_exception(exc)
+            return
+
+        self._commits += 1
+        self._writes += len(batch)
+        # Se responde tras el COMMIT: lo que ve el cliente ya está en disco
+        for future, value, exc in outcomes:
+            if exc is None:
+                future.set_result(value)
+            else:
+                self._failed += 1
+                future.set_exception(exc)
+
+    def stats(self):
+        return {
+            "queued": self._queue.qsize(),
+            "queue_size": self._queue.maxsize,
+            "commits": self._commits,
+            "writes": self._writes,
+            "writes_per_commit": round(self._writes / self._commits, 2) if self._commits else None,
+            "rejected": self._rejected,
+            "failed": self._failed,
+        }
+
+
+def _insert_build(conn, ids, compatible, result, now):
+    for _ in range(SHARE_ID_ATTEMPTS):
+        share_id = secrets.token_urlsafe(SHARE_ID_BYTES)
+        try:
+            conn.execute(_INSERT_BUILD, (share_id, *(ids[kind] for kind in BUILD_COLUMNS), compatible, result, now, now))
+        except sqlite3.IntegrityError:
+            continue  # share_id repetido: se prueba con otro
+        return share_id
+    raise sqlite3.IntegrityError("No se pudo generar un id compartible único")
+
+
+def _update_build(conn, share_id, ids, compatible, result, now):
+    return conn.execute(_UPDATE_BUILD, (*(ids[kind] for kind in BUILD_COLUMNS), compatible, result, now, share_id)).rowcount > 0
+
+
+def _delete_build(conn, share_id):
+    return conn.execute(_DELETE_BUILD, (share_id,)).rowcount > 0
+
+
+# ------------------------------------------------
+# ALMACÉN DE BUILDS
+# ------------------------------------------------
+SavedBuild = namedtuple("SavedBuild", ["share_id", "ids", "compatible", "result", "checked_at", "created_at"])
+
+
+class BuildStore:
+    """
+    Builds guardadas de una aplicación. Las escrituras pasan por BuildWriter
+    y esperan a su commit (como mucho `timeout` segundos); las lecturas usan
+    un pool de conexiones de solo lectura y devuelven el resultado guardado,
+    sin volver a evaluar la build.
+    """
+
+    def __init__(self, db_path, queue_size=DEFAULT_QUEUE_SIZE, batch_size=DEFAULT_BATCH_SIZE,
+                 linger=DEFAULT_LINGER, timeout=5.0, pool_size=None):
+        self.db_path = db_path
+        self.timeout = timeout
+        self.pool_size = pool_size
+        self.writer = BuildWriter(db_path, queue_size, batch_size, linger)
+        self._pool = None
+        self._lock = threading.Lock()
+
+    def _reader(self):
+        if self._pool is None:
+            with self._lock:
+                if self._pool is None:
+                    connect(self.db_path).close()  # el pool es de solo lectura: crear antes BD y esquema
+                    self._pool = get_pool(self.db_path, size=self.pool_size)
+        return self._pool
+
+    def _write(self, func, *args):
+        """Lanza WriterBusy si la cola está llena y TimeoutError si el commit no llega a tiempo."""
+        return self.writer.submit(func, *args).result(self.timeout)
+
+    def get(self, share_id):
+        """SavedBuild con ese id compartible, o None."""
+        with self._reader().connection() as conn:
+            row = conn.execute(_SELECT_SHARED, (share_id,)).fetchone()
+        if row is None:
+            return None
+        kinds = len(BUILD_COLUMNS)
+        return SavedBuild(share_id, dict(zip(BUILD_COLUMNS, row[:kinds])), *row[kinds:])
+
+    def create(self, ids, compatible, result):
+        """Guarda una build ya evaluada; devuelve su SavedBuild."""
+        now = time.time()
+        share_id = self._write(_insert_build, ids, compatible, result, now)
+        return SavedBuild(share_id, ids, compatible, result, now, now)
+
+    def update(self, share_id, ids, compatible, result):
+        """Sustituye los componentes (y el resultado); False si no existe."""
+        return self._write(_update_build, share_id, ids, compatible, result, time.time())
+
+    def delete(self, share_id):
+        return self._write(_delete_build, share_id)
+
+    def stats(self):
+        return self.writer.stats()
+
+    def close(self):
+        self.writer.close()
+
+
+def saved_build_json(build, url=None):
+    """
+    Cuerpo JSON de una build guardada. El resultado se inserta tal como está
+    guardado (ya serializado), sin decodificarlo ni volver a codificarlo.
+    """
+    compatible = None if build.compatible is None else bool(build.compatible)
+    head = {"id": build.share_id, "components": build.ids, "compatible": compatible,
+            "checked_at": build.checked_at, "created_at": build.created_at}
+    if url:
+        head["url"] = url
+    return f"{encode_result(head)[:-1]},\"result\":{build.result}}}"
+
+
+def main():
+    import argparse  # solo en la línea de comandos: fuera del arranque de la app
+
+    from catalog import ComponentCatalog
+
+    parser = argparse.ArgumentParser(description="Revalida las builds guardadas contra el catálogo actual.")
+    parser.add_argument("--db", default=os.path.join(BASE_DIR, "database", "buildsensei.db"),
+                        help="BD del catálogo")
+    parser.add_argument("--builds-db", default=BUILDS_DB_PATH, help="BD de builds guardadas")
+    parser.add_argument("--all", action="store_true", help="revalidar todas las builds")
+    parser.add_argument("--changed", metavar="JSON",
+                        help='filas cambiadas, p. ej. \'{"video_card": [12, 40]}\'')
+    args = parser.parse_args()
+    if args.all == bool(args.changed):
+        parser.error("indica --all o --changed")
+
+    start = time.perf_counter()
+    snapshot = ComponentCatalog(args.db).load()
+    conn = connect(args.builds_db)
+    try:
+        count = revalidate(conn, snapshot, None if args.all else json.loads(args.changed))
+    finally:
+        conn.close()
+    print(f"✔ {count} builds revalidadas en {time.perf_counter() - start:.2f}s")
+
+
+if __name__ == "__main__":
+    main()
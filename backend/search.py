@@ -0,0 +1,340 @@
+"""
+Índice de búsqueda por prefijo y por tokens para los componentes.
+
+Cada documento (una fila del catálogo) se indexa por sus campos de texto
+normalizados en arrays ordenados:
+ - prefijos del campo completo ("corsair vengeance" encuentra "Corsair Vengeance RGB 32 GB")
+ - tokens individuales ("veng 32" encuentra cualquier fila con un token que empiece
+   por "veng" y otro que empiece por "32")
+Las búsquedas son bisecciones sobre esos arrays más una intersección de conjuntos.
+
+Si un término no es prefijo de ningún token (una errata: "corsiar", "gefroce"),
+se sustituye por los tokens del vocabulario más parecidos según sus trigramas.
+`CatalogSearch` busca en las cinco tablas a la vez y devuelve los mejores
+resultados con los tramos a resaltar; sus índices se reutilizan entre
+recargas del catálogo cuando los textos de una tabla no han cambiado.
+"""
+
+import heapq
+import re
+import threading
+from array import array
+from bisect import bisect_left
+from collections import OrderedDict
+from functools import lru_cache
+
+_NON_ALNUM = re.compile(r"[^0-9a-z+]+")
+# Cantidad + unidad como un solo token: "32 GB" y "32GB" -> "32gb", "750 W" -> "750w"
+_UNIT = re.compile(r"\b(\d+) (gb|tb|mb|mhz|ghz|w)\b")
+_LABEL_TOKEN = re.compile(r"[0-9A-Za-z+]+")
+_ALNUM_RUN = re.compile(r"[a-z]+|[0-9]+")
+
+# Campos indexados por tabla (el primero es el principal para el ranking)
+SEARCH_FIELDS = {
+    "cpu": ("name", "socket"),
+    "motherboard": ("name", "socket"),
+    "memory": ("name",),
+    "video_card": ("name", "chipset"),
+    "power_supply": ("name",),
+}
+
+# Corrección de erratas por trigramas
+MIN_FUZZY_LENGTH = 3       # términos más cortos no se corrigen
+FUZZY_MIN_SIMILARITY = 0.4  # coeficiente de Dice entre conjuntos de trigramas
+FUZZY_MAX_TOKENS = 5       # sustitutos por término
+FUZZY_SPREAD = 0.15        # solo sustitutos casi tan parecidos como el mejor
+
+# Puntuación por nivel: el nombre empieza por la consulta, otro campo empieza
+# por ella, todos los términos casan; cada término corregido resta una parte
+TIER_SCORES = (3.0, 2.0, 1.0)
+FUZZY_PENALTY = 0.5
+
+
+@lru_cache(maxsize=65536)
+def normalize(text):
+    """Minúsculas, separadores colapsados a un espacio y cantidades unidas a su unidad."""
+    if not text:
+        return ""
+    return _UNIT.sub(r"\1\2", _NON_ALNUM.sub(" ", text.lower()).strip())
+
+
+def tokenize(text):
+    return normalize(text).split()
+
+
+def trigrams(token):
+    padded = f"${token}$"
+    return {padded[i:i + 3] for i in range(len(padded) - 2)}
+
+
+def highlight_spans(label, terms):
+    """Tramos [inicio, fin) de `label` que casan con algún término (como prefijo)."""
+    spans = []
+    for match in _LABEL_TOKEN.finditer(label):
+        word = match.group().lower()
+        length = 0
+        for term in terms:
+            if word.startswith(term):
+                length = max(length, len(term))
+            elif term.startswith(word):  # "32gb" frente a "32" + "GB" en la etiqueta
+                length = max(length, len(word))
+        if length:
+            spans.append([match.start(), match.start() + length])
+    return spans
+
+
+def _prefix_range(keys, prefix):
+    """Rango [lo, hi) de `keys` (ordenado) cuyos elementos empiezan por `prefix`."""
+    lo = bisect_left(keys, prefix)
+    hi = bisect_left(keys, prefix + "\uffff", lo)
+    return lo, hi
+
+
+class _SortedKeys:
+    """Pares (clave, posición) ordenados por clave, en dos arrays paralelos."""
+
+    __slots__ = ("keys", "positions")
+
+    def __init__(self, pairs):
+        pairs.sort()
+        self.keys = [key for key, _ in pairs]
+        self.positions = array("l", (pos for _, pos in pairs))
+
+    def prefixed(self, prefix):
+        lo, hi = _prefix_range(self.keys, prefix)
+        return self.positions[lo:hi]
+
+
+class SearchIndex:
+    """Índice de solo lectura sobre los campos de texto de una tabla."""
+
+    def __init__(self, documents, field_count=1):
+        """
+        Args:
+            documents: iterable de (posición, (campo0, campo1, ...)).
+            field_count: número de campos por documento; el campo 0 es el principal.
+        """
+        primary, secondary, tokens = [], [], []
+        for pos, fields in documents:
+            for i, value in enumerate(fields[:field_count]):
+                key = normalize(value)
+                if not key:
+                    continue
+                (primary if i == 0 else secondary).append((key, pos))
+                tokens.extend((token, pos) for token in set(key.split()))
+
+        self._primary = _SortedKeys(primary)
+        self._secondary = _SortedKeys(secondary)
+        self._tokens = _SortedKeys(tokens)
+        self._trigrams = None  # vocabulario por trigrama, al primer término sin coincidencias
+
+        self._cache = OrderedDict()
+        self._cache_size = 256
+        self._lock = threading.Lock()
+
+    @classmethod
+    def from_table(cls, table, fields=None):
+        fields = fields or SEARCH_FIELDS.get(table.name, ("name",))
+        columns = [table.column(field) for field in fields]
+        return cls(enumerate(zip(*columns)), len(fields))
+
+    # ------------------------------------------------
+    # ERRATAS
+    # ------------------------------------------------
+    def _trigram_index(self):
+        with self._lock:
+            if self._trigrams is None:
+                vocabulary = sorted(set(self._tokens.keys))
+                sizes = array("l")
+                index = {}
+                for token_id, token in enumerate(vocabulary):
+                    grams = trigrams(token)
+                    sizes.append(len(grams))
+                    for gram in grams:
+                        index.setdefault(gram, []).append(token_id)
+                self._trigrams = (vocabulary, sizes, index)
+            return self._trigrams
+
+    def has_prefix(self, term):
+        lo, hi = _prefix_range(self._tokens.keys, term)
+        return lo < hi
+
+    def corrections(self, term):
+        """[(similitud, token)] de los tokens del vocabulario parecidos a `term`."""
+        if len(term) < MIN_FUZZY_LENGTH:
+            return []
+        vocabulary, sizes, index = self._trigram_index()
+        grams = trigrams(term)
+        shared = {}
+        for gram in grams:
+            for token_id in index.get(gram, ()):
+                shared[token_id] = shared.get(token_id, 0) + 1
+
+        scored = []
+        for token_id, count in shared.items():
+            similarity = 2 * count / (len(grams) + sizes[token_id])
+            if similarity >= FUZZY_MIN_SIMILARITY:
+                scored.append((similarity, vocabulary[token_id]))
+        return scored
+
+    # ------------------------------------------------
+    # RANKING
+    # ------------------------------------------------
+    def _rank(self, terms, fuzzy):
+        """(posiciones ordenadas por relevancia, tamaño de los dos primeros niveles)."""
+        # Todos los términos deben casar como prefijo de algún token; un término
+        # corregido casa con cualquiera de sus sustitutos
+        ranges = []
+        for term in terms:
+            if term in fuzzy:
+                positions = set()
+                for token in fuzzy[term]:
+                    positions.update(self._tokens.prefixed(token))
+            else:
+                positions = self._tokens.prefixed(term)
+            ranges.append(positions)
+
+        ranges.sort(key=len)
+        matches = set(ranges[0])
+        for positions in ranges[1:]:
+            if not matches:
+                break
+            matches.intersection_update(positions)
+        if not matches:
+            return [], (0, 0)
+
+        # 1) el nombre empieza por la consulta, 2) otro campo empieza por ella, 3) resto
+        query = " ".join(terms)
+        ranked = []
+        seen = set()
+        tiers = []
+        for sorted_keys in (self._primary, self._secondary):
+            tier = sorted(set(sorted_keys.prefixed(query)) - seen) if not fuzzy else []
+            ranked.extend(tier)
+            seen.update(tier)
+            tiers.append(len(tier))
+        ranked.extend(sorted(matches - seen))
+        return ranked, tuple(tiers)
+
+    def ranked(self, terms, fuzzy):
+        """_rank con un LRU de rankings completos, para paginar sin recalcular."""
+        key = (tuple(terms), tuple(sorted(fuzzy.items())))
+        with self._lock:
+            entry = self._cache.get(key)
+            if entry is not None:
+                self._cache.move_to_end(key)
+                return entry
+
+        entry = self._rank(terms, fuzzy) if terms else ([], (0, 0))
+        with self._lock:
+            self._cache[key] = entry
+            if len(self._cache) > self._cache_size:
+                self._cache.popitem(last=False)
+        return entry
+
+    def search(self, query, limit=50, offset=0):
+        """Devuelve (posiciones, total) para la página [offset, offset + limit)."""
+        plan = plan_query(query, (self,))
+        if plan is None:
+            return [], 0
+        ranked, _ = self.ranked(*plan)
+        return ranked[offset:offset + limit], len(ranked)
+
+    def top(self, terms, fuzzy, k):
+        """Los `k` mejores como lista de (score, posición), más el total de coincidencias."""
+        ranked, (first, second) = self.ranked(terms, fuzzy)
+        penalty = FUZZY_PENALTY * len(fuzzy) / max(1, len(terms))
+        scored = []
+        for rank, pos in enumerate(ranked[:k]):
+            tier = 0 if rank < first else (1 if rank < first + second else 2)
+            scored.append((TIER_SCORES[tier] - penalty, pos))
+        return scored, len(ranked)
+
+
+def plan_query(query, indexes):
+    """
+    Términos de `query` frente a uno o varios índices: (términos, {término:
+    sustitutos}), o None si algún término no casa con nada. Un término que no
+    es prefijo de ningún token en ninguno de los índices se parte en letras y
+    cifras ("rtx4070" -> "rtx", "4070") si todas las partes existen; si no, se
+    sustituye por los tokens más parecidos por trigramas.
+    """
+    terms, fuzzy = [], {}
+    for term in normalize(query).split():
+        if any(index.has_prefix(term) for index in indexes):
+            terms.append(term)
+            continue
+        parts = _ALNUM_RUN.findall(term)
+        if len(parts) > 1 and all(any(index.has_prefix(part) for index in indexes) for part in parts):
+            terms.extend(parts)
+            continue
+
+        similar = {}
+        for index in indexes:
+            for similarity, token in index.corrections(term):
+                similar[token] = max(similarity, similar.get(token, 0.0))
+        if not similar:
+            return None
+        best = heapq.nlargest(FUZZY_MAX_TOKENS, similar.items(), key=lambda item: (item[1], -len(item[0])))
+        cutoff = best[0][1] - FUZZY_SPREAD
+        terms.append(term)
+        fuzzy[term] = tuple(token for token, similarity in best if similarity >= cutoff)
+    return terms, fuzzy
+
+
+# ------------------------------------------------
+# BÚSQUEDA EN TODO EL CATÁLOGO
+# ------------------------------------------------
+class CatalogSearch:
+    """
+    Índices de búsqueda de las tablas del catálogo.
+
+    Cada snapshot guarda sus índices (snapshot.derived); al recargar, una tabla
+    cuyos campos de texto no cambiaron (p. ej. solo cambiaron precios) reutiliza
+    el índice anterior tal cual, y en el resto los textos ya vistos no se
+    vuelven a normalizar (normalize está memorizada).
+    """
+
+    def __init__(self):
+        self._last = {}  # tabla -> (textos indexados, índice)
+        self._lock = threading.Lock()
+        self.reused = self.rebuilt = 0
+
+    def index(self, snapshot, table_name):
+        return snapshot.derived(("search", table_name), lambda snap: self._build(snap[table_name]))
+
+    def _build(self, table):
+        fields = SEARCH_FIELDS.get(table.name, ("name",))
+        texts = tuple(tuple(table.column(field)) for field in fields)
+        with self._lock:
+            previous = self._last.get(table.name)
+            if previous is not None and previous[0] == texts:
+                self.reused += 1
+                return previous[1]
+
+        index = SearchIndex(enumerate(zip(*texts)), len(fields))
+        with self._lock:
+            self._last[table.name] = (texts, index)
+            self.rebuilt += 1
+        return index
+
+    def search(self, snapshot, query, tables, k):
+        """
+        Los `k` mejores resultados entre `tables` (nombre de tipo -> tabla).
+        Devuelve (lista de (score, tipo, posición), total de coincidencias,
+        términos usados, {término: sustitutos}).
+        """
+        indexes = {kind: self.index(snapshot, table_name) for kind, table_name in tables.items()}
+        plan = plan_query(query, indexes.values())
+        if plan is None:
+            return [], 0, normalize(query).split(), {}
+        terms, fuzzy = plan
+
+        candidates, total = [], 0
+        for order, (kind, index) in enumerate(indexes.items()):
+            scored, count = index.top(terms, fuzzy, k)
+            total += count
+            # Desempate: puesto dentro de su tabla, luego el orden de `tables`
+            candidates.extend((score, -rank, -order, kind, pos) for rank, (score, pos) in enumerate(scored))
+        best = heapq.nlargest(k, candidates)
+        return [(score, kind, pos) for score, _, _, kind, pos in best], total, terms, fuzzy
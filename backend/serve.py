@@ -0,0 +1,93 @@
+"""
+Lanzador de producción de BuildSensei.
+
+    python backend/serve.py                                   # ASGI (uvicorn), un worker por núcleo
+    python backend/serve.py --workers 4 --threads 64
+    python backend/serve.py --mode wsgi --workers 4 --threads 8   # gunicorn con hilos (gthread)
+
+- --workers: procesos; cada uno carga su propio catálogo (o lo abre con mmap
+  desde el snapshot binario, compartiendo páginas entre procesos).
+- --threads: hilos por worker (en ASGI, el pool donde corren Flask y las
+  búsquedas bloqueantes; en WSGI, los hilos de gunicorn).
+- --max-concurrency: conexiones simultáneas por worker; por encima se responde
+  503 en lugar de dejar crecer la cola, lo que mantiene la latencia acotada.
+
+uvicorn y gunicorn solo se importan aquí: la app no depende de ellos.
+"""
+
+import argparse
+import importlib.util
+import os
+import sys
+
+BASE_DIR = os.path.dirname(os.path.abspath(__file__))
+
+
+def require(module, mode):
+    if importlib.util.find_spec(module) is None:
+        sys.exit(f"El modo {mode} necesita {module}: pip install -r requirements.txt")
+
+
+def serve_asgi(args):
+    require("uvicorn", "asgi")
+    import uvicorn
+
+    # Los workers son procesos nuevos: la configuración les llega por el entorno
+    os.environ["BUILDSENSEI_ASGI_THREADS"] = str(args.threads)
+    os.environ["BUILDSENSEI_ASGI_LOOKUPS"] = args.lookups
+    uvicorn.run(
+        "asgi:create_asgi_app",
+        factory=True,
+        app_dir=BASE_DIR,
+        host=args.host,
+        port=args.port,
+        workers=args.workers,
+        limit_concurrency=args.max_concurrency,
+        backlog=args.backlog,
+        log_level=args.log_level,
+        access_log=False,
+    )
+
+
+def serve_wsgi(args):
+    require("gunicorn", "wsgi")
+    command = [
+        sys.executable, "-m", "gunicorn",
+        "--chdir", BASE_DIR,
+        "--bind", f"{args.host}:{args.port}",
+        "--workers", str(args.workers),
+        "--worker-class", "gthread",
+        "--threads", str(args.threads),
+        "--backlog", str(args.backlog),
+        "--log-level", args.log_level,
+    ]
+    if args.max_concurrency:
+        command += ["--worker-connections", str(args.max_concurrency)]
+    os.execv(sys.executable, [*command, "app:create_app()"])
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Servidor de producción de BuildSensei.")
+    parser.add_argument("--mode", choices=("asgi", "wsgi"), default="asgi")
+    parser.add_argument("--host", default="0.0.0.0")
+    parser.add_argument("--port", type=int, default=int(os.environ.get("PORT", "8000")))
+    parser.add_argument("--workers", type=int, default=os.cpu_count() or 1, help="procesos (por defecto, uno por núcleo)")
+    parser.add_argument("--threads", type=int, default=32, help="hilos por worker (por defecto 32)")
+    parser.add_argument("--max-concurrency", type=int, default=None,
+                        help="conexiones simultáneas por worker antes de responder 503")
+    parser.add_argument("--backlog", type=int, default=2048, help="cola de conexiones del socket")
+    parser.add_argument("--lookups", choices=("catalog", "sqlite"), default="catalog",
+                        help="modo ASGI: búsquedas en el catálogo en memoria o en SQLite")
+    parser.add_argument("--log-level", default="warning")
+    args = parser.parse_args()
+
+    if args.workers < 1 or args.threads < 1:
+        parser.error("--workers y --threads deben ser al menos 1")
+    if args.mode == "asgi":
+        serve_asgi(args)
+    else:
+        serve_wsgi(args)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,77 @@
+"""
+Reglas microarquitectura -> socket del CPU.
+
+Las reglas se declaran en orden de prioridad y se compilan en una única
+expresión regular anclada: cada regla es una alternativa formada por
+lookaheads, y como el motor prueba las alternativas en orden en la posición 0,
+gana siempre la primera regla que casa (igual que la antigua cadena de ifs).
+"""
+
+import re
+from functools import lru_cache
+
+# (fragmentos que deben aparecer todos, socket). Texto en minúsculas.
+SOCKET_RULES = (
+    # ===== AMD SOCKETS =====
+    (("zen 5",), "AM5"),
+    (("zen 4",), "AM5"),
+    (("zen 3",), "AM4"),
+    (("zen 2",), "AM4"),
+    (("zen\\+|^zen$",), "AM4"),                        # Zen+ y Zen (primera gen)
+    (("piledriver|steamroller|excavator",), "AM3+"),
+    (("bulldozer",), "AM3+"),
+    (("k10|lynx",), "AM2+"),
+    (("jaguar",), "FP2"),
+    (("puma\\+",), "FP2"),
+
+    # ===== INTEL SOCKETS =====
+    (("raptor",), "LGA1700"),                           # Raptor Lake (Refresh)
+    (("arrow lake",), "LGA1851"),
+    (("alder lake",), "LGA1700"),
+    (("rocket lake",), "LGA1200"),
+    (("comet lake",), "LGA1200"),
+    (("coffee lake",), "LGA1151"),
+    (("kaby lake",), "LGA1151"),
+    (("skylake",), "LGA1151"),
+    (("broadwell",), "LGA1150"),
+    (("haswell",), "LGA1150"),
+    (("ivy bridge",), "LGA1155"),
+    (("sandy bridge",), "LGA1155"),
+    (("nehalem|westmere",), "LGA1156"),
+    (("core|wolfdale|yorkfield",), "LGA775"),
+
+    # Pentium 4 y Celeron antiguos
+    (("(?:pentium|celeron) [eg]", "e2|e5|e6"), "LGA775"),
+    (("(?:pentium|celeron) [eg]", "e3|g3|g4|g5|g6"), "LGA1155"),
+
+    # Xeon antiguos
+    (("xeon", "e3"), "LGA1155"),
+    (("xeon", "e5"), "LGA2011"),
+    (("xeon", "e2"), "LGA1151"),
+)
+
+
+def _compile(rules):
+    alternatives = []
+    for index, (fragments, _) in enumerate(rules):
+        lookaheads = "".join(f"(?=.*?(?:{fragment}))" for fragment in fragments)
+        alternatives.append(f"{lookaheads}(?P<r{index}>)")
+    return re.compile("|".join(alternatives))
+
+
+_SOCKET_MATCHER = _compile(SOCKET_RULES)
+
+
+@lru_cache(maxsize=256)
+def deduce_socket(microarch):
+    """
+    Deduce el socket del CPU basándose en la microarquitectura.
+    Devuelve None si ninguna regla aplica.
+    """
+    if not microarch:
+        return None
+
+    match = _SOCKET_MATCHER.match(microarch.lower().strip())
+    if match is None:
+        return None
+    return SOCKET_RULES[int(match.lastgroup[1:])][1]
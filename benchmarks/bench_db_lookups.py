@@ -0,0 +1,131 @@
+"""
+Before/after benchmark for the SQLite lookups behind backend/database/db.py.
+
+"before" is the original access pattern: no secondary indexes, rollback
+journal, and a fresh connection per query. "after" is the migrated schema
+(typed columns, indexes, WAL) queried through one reused connection with
+mmap and a warm statement cache.
+
+Usage (from the repo root):
+    python benchmarks/bench_db_lookups.py [--repeat N]
+"""
+
+import argparse
+import os
+import random
+import shutil
+import sqlite3
+import sys
+import tempfile
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+BACKEND_DIR = os.path.join(ROOT, "backend")
+sys.path[:0] = [BACKEND_DIR, os.path.join(BACKEND_DIR, "database")]
+
+from database.db import DB_PATH  # noqa: E402
+from db_pool import CACHED_STATEMENTS, MMAP_SIZE  # noqa: E402
+from migrate_db import migrate  # noqa: E402
+
+# name -> (query on the old schema, query on the new schema, sample column)
+LOOKUPS = {
+    "cpu by name": (
+        "SELECT * FROM cpu WHERE name = ?",
+        "SELECT * FROM cpu WHERE name = ?",
+        ("cpu", "name"),
+    ),
+    "gpu by chipset": (
+        "SELECT * FROM video_card WHERE chipset = ?",
+        "SELECT * FROM video_card WHERE chipset = ?",
+        ("video_card", "chipset"),
+    ),
+    "motherboards by socket": (
+        "SELECT * FROM motherboard WHERE socket = ?",
+        "SELECT * FROM motherboard WHERE socket = ?",
+        ("motherboard", "socket"),
+    ),
+    "memory by name": (
+        "SELECT * FROM memory WHERE name = ?",
+        "SELECT * FROM memory WHERE name = ?",
+        ("memory", "name"),
+    ),
+    "memory kits by module count": (
+        "SELECT * FROM memory WHERE modules LIKE ? || ',%'",
+        "SELECT * FROM memory WHERE module_count = ?",
+        ("memory", "module_count"),
+    ),
+    "psus by min wattage": (
+        "SELECT * FROM power_supply WHERE wattage >= ?",
+        "SELECT * FROM power_supply WHERE wattage >= ?",
+        ("power_supply", "wattage"),
+    ),
+}
+
+
+def make_before(path):
+    """Strip the copy back to the original layout: no indexes, rollback journal."""
+    conn = sqlite3.connect(path)
+    names = [row[0] for row in conn.execute(
+        "SELECT name FROM sqlite_master WHERE type = 'index' AND name LIKE 'idx_%'")]
+    for name in names:
+        conn.execute(f"DROP INDEX {name}")
+    conn.execute("PRAGMA journal_mode = DELETE")
+    conn.commit()
+    conn.close()
+
+
+def samples(path, table, column, count, seed):
+    conn = sqlite3.connect(path)
+    values = [row[0] for row in conn.execute(
+        f"SELECT {column} FROM {table} WHERE {column} IS NOT NULL")]
+    conn.close()
+    rng = random.Random(seed)
+    return [rng.choice(values) for _ in range(count)]
+
+
+def run_before(path, query, params):
+    start = time.perf_counter()
+    for value in params:
+        conn = sqlite3.connect(path)
+        conn.execute(query, (value,)).fetchall()
+        conn.close()
+    return time.perf_counter() - start
+
+
+def run_after(path, query, params):
+    conn = sqlite3.connect(path, cached_statements=CACHED_STATEMENTS)
+    conn.execute(f"PRAGMA mmap_size = {MMAP_SIZE}")
+    start = time.perf_counter()
+    for value in params:
+        conn.execute(query, (value,)).fetchall()
+    elapsed = time.perf_counter() - start
+    conn.close()
+    return elapsed
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--repeat", type=int, default=2000, help="lookups per query (default 2000)")
+    args = parser.parse_args()
+
+    workdir = tempfile.mkdtemp(prefix="buildsensei-bench-")
+    try:
+        before = os.path.join(workdir, "before.db")
+        after = os.path.join(workdir, "after.db")
+        shutil.copyfile(DB_PATH, before)
+        shutil.copyfile(DB_PATH, after)
+        make_before(before)
+        migrate(after)
+
+        print(f"\n{'lookup':<30}{'before µs':>12}{'after µs':>12}{'speedup':>10}")
+        for i, (name, (old_query, new_query, (table, column))) in enumerate(LOOKUPS.items()):
+            params = samples(after, table, column, args.repeat, seed=i)
+            old = run_before(before, old_query, params) / args.repeat * 1e6
+            new = run_after(after, new_query, params) / args.repeat * 1e6
+            print(f"{name:<30}{old:>12.1f}{new:>12.1f}{old / new:>9.1f}x")
+    finally:
+        shutil.rmtree(workdir)
+
+
+if __name__ == "__main__":
+    main()
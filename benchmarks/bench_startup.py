@@ -0,0 +1,107 @@
+"""
+Startup-time check for the serving path.
+
+Runs `python -X importtime` on `import app; app.create_app()` in fresh
+interpreters and reads the cumulative import time of `app` (everything
+the server imports before it can handle a request). Fails (exit 1) when:
+
+- the median exceeds the recorded baseline by more than the tolerance, or
+- a module that must stay off the serving path (pandas, numpy) is imported.
+
+Usage (from the repo root):
+    python benchmarks/bench_startup.py [--runs N]
+    python benchmarks/bench_startup.py --update    # record the current median as baseline
+"""
+
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+BACKEND_DIR = os.path.join(ROOT, "backend")
+BUDGET_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "startup_budget.json")
+
+# Only needed by ingestion or by endpoints that import them on first use
+FORBIDDEN_MODULES = ("pandas", "numpy")
+
+PROBE = (
+    "import sys, time; sys.path.insert(0, {backend!r}); t = time.perf_counter(); "
+    "import app; app.create_app(); print((time.perf_counter() - t) * 1000)"
+)
+
+
+def measure_once():
+    """(cumulative import µs of `app`, wall ms of import + create_app, imported module names)."""
+    proc = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", PROBE.format(backend=BACKEND_DIR)],
+        capture_output=True, text=True, cwd=ROOT, check=True,
+    )
+    modules, app_us = set(), None
+    for line in proc.stderr.splitlines():
+        if not line.startswith("import time:"):
+            continue
+        parts = line.split("|")
+        if len(parts) != 3 or not parts[1].strip().isdigit():
+            continue  # header line
+        name = parts[2].strip()
+        modules.add(name)
+        if name == "app":
+            app_us = int(parts[1])
+    if app_us is None:
+        raise RuntimeError("importtime output has no entry for 'app'")
+    return app_us, float(proc.stdout.strip().splitlines()[-1]), modules
+
+
+def load_budget():
+    if not os.path.exists(BUDGET_PATH):
+        return None
+    with open(BUDGET_PATH, encoding="utf-8") as f:
+        return json.load(f)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Serving-path import time regression check.")
+    parser.add_argument("--runs", type=int, default=7, help="fresh interpreters to measure (default 7)")
+    parser.add_argument("--update", action="store_true", help="record the current median as the new baseline")
+    args = parser.parse_args()
+
+    samples = [measure_once() for _ in range(args.runs)]
+    import_ms = statistics.median(app_us for app_us, _, _ in samples) / 1000
+    wall_ms = statistics.median(wall for _, wall, _ in samples)
+    leaked = sorted({
+        name for _, _, modules in samples for name in modules
+        if name.split(".")[0] in FORBIDDEN_MODULES
+    })
+    print(f"import app (cumulative, median of {args.runs}): {import_ms:.1f} ms")
+    print(f"import + create_app (wall, median):        {wall_ms:.1f} ms")
+
+    failed = False
+    if leaked:
+        roots = sorted({name.split(".")[0] for name in leaked})
+        print(f"FAIL: serving path imports {', '.join(roots)}")
+        failed = True
+
+    budget = load_budget()
+    if args.update:
+        budget = {"app_import_ms": round(import_ms, 1), "tolerance": (budget or {}).get("tolerance", 0.3)}
+        with open(BUDGET_PATH, "w", encoding="utf-8") as f:
+            json.dump(budget, f, indent=2)
+            f.write("\n")
+        print(f"Baseline updated: {budget['app_import_ms']} ms")
+    elif budget is None:
+        print(f"No baseline in {BUDGET_PATH}; run with --update to record one.")
+    else:
+        limit = budget["app_import_ms"] * (1 + budget["tolerance"])
+        print(f"baseline {budget['app_import_ms']:.1f} ms, limit {limit:.1f} ms")
+        if import_ms > limit:
+            print(f"FAIL: import time regressed ({import_ms:.1f} ms > {limit:.1f} ms)")
+            failed = True
+
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,363 @@
+"""
+Benchmark suite for the rule engine and the API.
+
+Three layers, each optional:
+
+- micro: the rule helpers (safe_number, deduce_socket, get_gpu_power,
+  get_gpu_benchmark_url, detect_bottleneck) and the loader's memory_columns
+  over every row of datasets/*.csv. Cached helpers are measured cold (cache cleared) and warm.
+- flask: throughput of every /api/* route through the Flask test client.
+- load: a multi-threaded keep-alive load generator against a running
+  server (only with --url).
+
+Results go to a JSON file; --compare prints the change against an older one.
+
+Usage (from the repo root):
+    python benchmarks/bench_suite.py                       # micro + flask
+    python benchmarks/bench_suite.py --url http://127.0.0.1:5000 --threads 16
+    python benchmarks/bench_suite.py --compare benchmarks/results/bench-abc1234.json
+"""
+
+import argparse
+import csv
+import http.client
+import json
+import os
+import platform
+import random
+import statistics
+import subprocess
+import sys
+import threading
+import time
+from urllib.parse import urlencode, urlsplit
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+DATASETS = os.path.join(ROOT, "datasets")
+RESULTS_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "results")
+sys.path.insert(0, os.path.join(ROOT, "backend"))
+sys.path.insert(0, os.path.join(ROOT, "backend", "database"))
+
+from compatibility import detect_bottleneck, get_gpu_power, safe_number  # noqa: E402
+from gpu_benchmarks import GPU_RESOLVER, get_gpu_benchmark_url  # noqa: E402
+from normalize import memory_columns  # noqa: E402
+from socket_rules import deduce_socket  # noqa: E402
+
+
+def read_csv(name):
+    with open(os.path.join(DATASETS, name), newline="", encoding="utf-8") as f:
+        return list(csv.DictReader(f))
+
+
+def percentile(sorted_values, fraction):
+    if not sorted_values:
+        return None
+    index = min(len(sorted_values) - 1, int(round(fraction * (len(sorted_values) - 1))))
+    return sorted_values[index]
+
+
+# ================================
+#  Micro-benchmarks
+# ================================
+
+def time_calls(func, args_list, repeats, clear=None):
+    """Median and best ns per call over `repeats` passes through `args_list`."""
+    per_call = []
+    for _ in range(repeats):
+        if clear:
+            clear()
+        start = time.perf_counter_ns()
+        for args in args_list:
+            func(*args)
+        per_call.append((time.perf_counter_ns() - start) / len(args_list))
+    return {"calls": len(args_list), "ns_per_call": statistics.median(per_call), "ns_best": min(per_call)}
+
+
+def run_micro(repeats):
+    tables = {name: read_csv(name) for name in sorted(os.listdir(DATASETS)) if name.endswith(".csv")}
+    cpus, gpus, memory = tables["cpu.csv"], tables["video-card.csv"], tables["memory.csv"]
+
+    numeric_fields = [
+        (value,) for rows in tables.values() for row in rows
+        for key, value in row.items() if key != "name"
+    ]
+    memory_fields = [(row["speed"], row["modules"]) for row in memory]
+    microarchs = [(row["microarchitecture"] or None,) for row in cpus]
+    chipsets = [(row["chipset"],) for row in gpus]
+    bottlenecks = [
+        (safe_number(cpu["core_count"]), safe_number(cpu["boost_clock"]), safe_number(cpu["tdp"]),
+         get_gpu_power(gpu["chipset"]), gpu["chipset"])
+        for cpu, gpu in zip((cpus[i % len(cpus)] for i in range(len(gpus))), gpus)
+    ]
+
+    clear_gpu = GPU_RESOLVER.resolve.cache_clear
+    results = {
+        "safe_number": time_calls(safe_number, numeric_fields, repeats),
+        "memory_columns": time_calls(memory_columns, memory_fields, repeats),
+        "deduce_socket_cold": time_calls(deduce_socket, microarchs, repeats, deduce_socket.cache_clear),
+        "deduce_socket_warm": time_calls(deduce_socket, microarchs, repeats),
+        "get_gpu_power_cold": time_calls(get_gpu_power, chipsets, repeats, clear_gpu),
+        "get_gpu_power_warm": time_calls(get_gpu_power, chipsets, repeats),
+        "get_gpu_benchmark_url_cold": time_calls(get_gpu_benchmark_url, chipsets, repeats, clear_gpu),
+        "get_gpu_benchmark_url_warm": time_calls(get_gpu_benchmark_url, chipsets, repeats),
+        "detect_bottleneck": time_calls(detect_bottleneck, bottlenecks, repeats),
+    }
+    for name, result in results.items():
+        print(f"  {name:<28}{result['calls']:>8} calls {result['ns_per_call']:>10.0f} ns/call")
+    return results
+
+
+# ================================
+#  Flask test client
+# ================================
+
+class BuildSampler:
+    """Random builds (and ids) drawn from the loaded catalog."""
+
+    def __init__(self, snapshot, seed=0):
+        tables = snapshot.tables
+        self.rng = random.Random(seed)
+        self.cpus = [n for n in tables["cpu"].column("name") if n]
+        self.chipsets = sorted({c for c in tables["video_card"].column("chipset") if c})
+        self.boards = [n for n in tables["motherboard"].column("name") if n]
+        self.memory = [n for n in tables["memory"].column("name") if n]
+        self.psu_ids = list(tables["power_supply"].column("id"))
+        self.cpu_ids = list(tables["cpu"].column("id"))
+        self.ids = {kind: list(tables[table].column("id"))
+                    for kind, table in (("cpu", "cpu"), ("gpu", "video_card"), ("motherboard", "motherboard"),
+                                        ("memory", "memory"), ("psu", "power_supply"))}
+
+    def build(self):
+        choice = self.rng.choice
+        return {"cpu": choice(self.cpus), "gpu": choice(self.chipsets), "motherboard": choice(self.boards),
+                "memory": choice(self.memory), "psu": str(choice(self.psu_ids))}
+
+    def build_ids(self):
+        """A random build as the frontend sends it: one row id per component."""
+        return {kind: str(self.rng.choice(ids)) for kind, ids in self.ids.items()}
+
+
+def flask_routes(sampler):
+    """name -> callable(client) performing one request; returns (status, builds evaluated)."""
+    hot = sampler.build()
+
+    def get(path, query=None):
+        return lambda client: (client.get(path, query_string=query() if callable(query) else query).status_code, 1)
+
+    def batch(client):
+        builds = [sampler.build() for _ in range(1000)]
+        response = client.post("/api/check-compatibility/batch", json=builds)
+        response.get_data()  # consume the NDJSON stream
+        return response.status_code, len(builds)
+
+    def compare(client):
+        base = sampler.build()
+        builds = [dict(base, gpu=sampler.build()["gpu"], psu=sampler.build()["psu"]) for _ in range(6)]
+        return client.post("/api/compare", json=builds).status_code, len(builds)
+
+    return {
+        "cpus_full": get("/api/cpus"),
+        "gpus_full": get("/api/gpus"),
+        "motherboards_full": get("/api/motherboards"),
+        "memory_full": get("/api/memory"),
+        "psus_full": get("/api/psus"),
+        "cpus_search": get("/api/cpus", {"q": "ryzen 7", "limit": 20}),
+        "memory_search": get("/api/memory", {"q": "corsair 32", "limit": 50}),
+        "search": get("/api/search", {"q": "4070 super", "limit": 10}),
+        "search_typo": get("/api/search", {"q": "corsiar vengence 32 gb", "limit": 10}),
+        "check_compatibility_random": get("/api/check-compatibility", sampler.build),
+        "check_compatibility_ids": get("/api/check-compatibility", sampler.build_ids),
+        "check_compatibility_hot": get("/api/check-compatibility", hot),
+        "check_compatibility_batch_1000": batch,
+        "compare_6": compare,
+        "compatible_cpu": lambda client: (
+            client.get(f"/api/compatible/cpu/{sampler.rng.choice(sampler.cpu_ids)}").status_code, 1),
+        "bottleneck_ranking": lambda client: (
+            client.get(f"/api/bottleneck/{sampler.rng.choice(sampler.cpu_ids)}").status_code, 1),
+        "recommend": get("/api/recommend", lambda: {"budget": sampler.rng.randint(800, 3000)}),
+        "health": get("/api/health"),
+        "metrics": get("/metrics"),
+    }
+
+
+def run_flask(seconds):
+    from app import create_app
+
+    app = create_app()
+    client = app.test_client()
+    snapshot = app.extensions["buildsensei"].catalog.snapshot()
+    sampler = BuildSampler(snapshot)
+
+    results = {}
+    for name, call in flask_routes(sampler).items():
+        call(client)  # warm-up: lazy indexes, payload cache, NumPy matrices
+        latencies, statuses, builds = [], {}, 0
+        deadline = time.perf_counter() + seconds
+        while time.perf_counter() < deadline or len(latencies) < 3:
+            start = time.perf_counter()
+            status, evaluated = call(client)
+            latencies.append(time.perf_counter() - start)
+            statuses[str(status)] = statuses.get(str(status), 0) + 1
+            builds += evaluated
+        total = sum(latencies)
+        latencies.sort()
+        results[name] = {
+            "requests": len(latencies),
+            "req_per_s": len(latencies) / total,
+            "p50_ms": percentile(latencies, 0.5) * 1000,
+            "p99_ms": percentile(latencies, 0.99) * 1000,
+            "statuses": statuses,
+        }
+        if builds != len(latencies):
+            results[name]["builds_per_s"] = builds / total
+        print(f"  {name:<32}{results[name]['req_per_s']:>10.1f} req/s  p50 {results[name]['p50_ms']:.2f} ms")
+    return results
+
+
+# ================================
+#  Load generator
+# ================================
+
+def run_load(url, threads, seconds, distinct, seed):
+    """Keep-alive GETs to /api/check-compatibility from `threads` threads."""
+    from app import create_app
+
+    parts = urlsplit(url)
+    snapshot = create_app().extensions["buildsensei"].catalog.snapshot()
+    sampler = BuildSampler(snapshot, seed)
+    # A fixed pool of combinations: popular builds repeat, like real traffic
+    paths = [f"{parts.path.rstrip('/')}/api/check-compatibility?{urlencode(sampler.build())}"
+             for _ in range(distinct)]
+
+    latencies, errors = [], []
+    lock = threading.Lock()
+    deadline = time.perf_counter() + seconds
+
+    def worker(index):
+        rng = random.Random(seed + index)
+        conn = http.client.HTTPConnection(parts.hostname, parts.port or 80, timeout=30)
+        mine, failed = [], 0
+        while time.perf_counter() < deadline:
+            start = time.perf_counter()
+            try:
+                conn.request("GET", rng.choice(paths))
+                response = conn.getresponse()
+                response.read()
+                if response.status >= 500:
+                    failed += 1
+            except (OSError, http.client.HTTPException):
+                failed += 1
+                conn.close()
+                conn = http.client.HTTPConnection(parts.hostname, parts.port or 80, timeout=30)
+                continue
+            mine.append(time.perf_counter() - start)
+        conn.close()
+        with lock:
+            latencies.extend(mine)
+            errors.append(failed)
+
+    started = time.perf_counter()
+    pool = [threading.Thread(target=worker, args=(i,)) for i in range(threads)]
+    for thread in pool:
+        thread.start()
+    for thread in pool:
+        thread.join()
+    elapsed = time.perf_counter() - started
+
+    latencies.sort()
+    result = {
+        "url": url,
+        "threads": threads,
+        "seconds": elapsed,
+        "distinct_builds": distinct,
+        "requests": len(latencies),
+        "errors": sum(errors),
+        "req_per_s": len(latencies) / elapsed,
+        "p50_ms": (percentile(latencies, 0.5) or 0) * 1000,
+        "p90_ms": (percentile(latencies, 0.9) or 0) * 1000,
+        "p99_ms": (percentile(latencies, 0.99) or 0) * 1000,
+    }
+    print(f"  {result['requests']} requests, {result['req_per_s']:.1f} req/s, "
+          f"p50 {result['p50_ms']:.2f} ms, p99 {result['p99_ms']:.2f} ms, {result['errors']} errors")
+    return result
+
+
+# ================================
+#  Output
+# ================================
+
+def git_commit():
+    try:
+        return subprocess.run(["git", "rev-parse", "--short", "HEAD"], cwd=ROOT, capture_output=True,
+                              text=True, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return "unknown"
+
+
+def flatten(data, prefix=""):
+    for key, value in data.items():
+        name = f"{prefix}.{key}" if prefix else key
+        if isinstance(value, dict):
+            yield from flatten(value, name)
+        elif isinstance(value, (int, float)) and not isinstance(value, bool):
+            yield name, value
+
+
+def compare(base_path, current):
+    with open(base_path, encoding="utf-8") as f:
+        base = dict(flatten(json.load(f)["results"]))
+    print(f"\nChange vs {base_path} (higher is better for *_per_s, lower for ns and ms):")
+    for name, value in flatten(current):
+        old = base.get(name)
+        if old and name.rsplit(".", 1)[-1] in ("ns_per_call", "req_per_s", "builds_per_s", "p50_ms", "p99_ms"):
+            print(f"  {name:<60}{old:>12.2f} -> {value:>12.2f} ({(value - old) / old:+.1%})")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="BuildSensei benchmark suite.")
+    parser.add_argument("--skip-micro", action="store_true")
+    parser.add_argument("--skip-flask", action="store_true")
+    parser.add_argument("--repeats", type=int, default=5, help="passes per micro-benchmark (default 5)")
+    parser.add_argument("--flask-seconds", type=float, default=1.0, help="time per route (default 1.0)")
+    parser.add_argument("--url", help="base URL of a running server for the load generator")
+    parser.add_argument("--threads", type=int, default=8, help="load generator threads (default 8)")
+    parser.add_argument("--seconds", type=float, default=10.0, help="load generator duration (default 10)")
+    parser.add_argument("--distinct", type=int, default=200, help="distinct builds in the load mix (default 200)")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--out", help="JSON output (default benchmarks/results/bench-<commit>.json)")
+    parser.add_argument("--compare", help="earlier JSON output to compare against")
+    args = parser.parse_args()
+
+    commit = git_commit()
+    results = {}
+    if not args.skip_micro:
+        print("micro-benchmarks:")
+        results["micro"] = run_micro(args.repeats)
+    if not args.skip_flask:
+        print("flask test client:")
+        results["flask"] = run_flask(args.flask_seconds)
+    if args.url:
+        print(f"load generator ({args.threads} threads, {args.seconds:.0f}s):")
+        results["load"] = run_load(args.url, args.threads, args.seconds, args.distinct, args.seed)
+
+    output = {
+        "commit": commit,
+        "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S%z"),
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "cpu_count": os.cpu_count(),
+        "results": results,
+    }
+    out = args.out or os.path.join(RESULTS_DIR, f"bench-{commit}.json")
+    os.makedirs(os.path.dirname(os.path.abspath(out)), exist_ok=True)
+    with open(out, "w", encoding="utf-8") as f:
+        json.dump(output, f, indent=2)
+        f.write("\n")
+    print(f"\nResults written to {out}")
+
+    if args.compare:
+        compare(args.compare, results)
+
+
+if __name__ == "__main__":
+    main()
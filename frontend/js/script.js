@@ -34,15 +34,9 @@ document.addEventListener("DOMContentLoaded", () => {
       const ch = choicesMap[selectId];
       if (!ch) return;
 
-      const opts = items.map(it => {
-        if (it.label && it.value) {
-          return { value: it.value, label: it.label };
-        }
-        if (typeof it === "string") return { value: it, label: it };
-        if (it.name) return { value: it.name, label: it.name };
-        if (it.id && it.name) return { value: it.id.toString(), label: it.name };
-        return { value: String(it), label: String(it) };
-      });
+      // Cada elemento es { id, label }: el id identifica la fila exacta
+      // (p. ej. una tarjeta concreta y no solo su chipset)
+      const opts = items.map(it => ({ value: String(it.id), label: it.label }));
 
       ch.clearChoices();
       ch.setChoices(opts, "value", "label", true);
@@ -52,12 +46,30 @@ document.addEventListener("DOMContentLoaded", () => {
     }
   }
 
+  // Búsqueda en servidor: evita descargar listas enormes (ej. ~13k memorias)
+  function enableRemoteSearch(url, selectId, limit = 100) {
+    const el = document.getElementById(selectId);
+    if (!el) return;
+    let timer = null;
+    el.addEventListener("search", (event) => {
+      clearTimeout(timer);
+      const q = event.detail.value.trim();
+      timer = setTimeout(() => {
+        const params = new URLSearchParams({ limit });
+        if (q) params.set("q", q);
+        loadIntoSelect(`${url}?${params.toString()}`, selectId, data => data.items || []);
+      }, 200);
+    });
+  }
+
   loadIntoSelect(endpoints.cpus, "cpu-select");
   loadIntoSelect(endpoints.gpus, "gpu-select");
   loadIntoSelect(endpoints.mobos, "mobo-select");
-  loadIntoSelect(endpoints.memory, "ram-select");
+  loadIntoSelect(`${endpoints.memory}?limit=100`, "ram-select", data => data.items || []);
   loadIntoSelect(endpoints.psus, "psu-select");
 
+  enableRemoteSearch(endpoints.memory, "ram-select");
+
   const checkBtn = document.getElementById("check-btn");
   const resultBox = document.getElementById("result-box");
 
@@ -0,0 +1,83 @@
+"""
+Shared fixtures. The backend modules import each other from backend/ (the
+app's import root) and the loader from backend/database, as when they are run
+as scripts, so both directories go on sys.path.
+"""
+
+import csv
+import os
+import sqlite3
+import sys
+
+import pytest
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+BACKEND_DIR = os.path.join(ROOT, "backend")
+DATABASE_DIR = os.path.join(BACKEND_DIR, "database")
+SCRIPTS_SQL = os.path.join(DATABASE_DIR, "scripts_sql")
+
+for path in (DATABASE_DIR, BACKEND_DIR):
+    if path not in sys.path:
+        sys.path.insert(0, path)
+
+
+def write_feed(directory, table, rows):
+    """Write `rows` (dicts) as the CSV the loader reads for `table`."""
+    from load_csv_to_db import TABLE_SPECS
+
+    info = TABLE_SPECS[table]
+    with open(os.path.join(directory, info["file"]), "w", newline="", encoding="utf-8") as f:
+        writer = csv.DictWriter(f, fieldnames=info["columns"])
+        writer.writeheader()
+        writer.writerows(rows)
+
+
+# One compatible build: Zen 4 CPU, AM5 board, DDR5 kit, RTX 4070 and a 750 W PSU
+FEEDS = {
+    "cpu": [{"name": "AMD Ryzen 5 7600", "price": "199", "core_count": "6", "core_clock": "3.8",
+             "boost_clock": "5.1", "microarchitecture": "Zen 4", "tdp": "65", "graphics": "Radeon"}],
+    "motherboard": [{"name": "MSI B650 Tomahawk", "price": "189", "socket": "AM5", "form_factor": "ATX",
+                     "max_memory": "192", "memory_slots": "4"}],
+    "memory": [{"name": "Corsair Vengeance 32 GB", "price": "99", "speed": "5,6000", "modules": "2,16",
+                "cas_latency": "30"}],
+    "video_card": [{"name": "MSI Ventus 2X", "price": "549", "chipset": "GeForce RTX 4070", "memory": "12",
+                    "core_clock": "1.92", "boost_clock": "2.475", "length": "242"}],
+    "power_supply": [{"name": "Corsair RM750", "price": "99", "efficiency": "gold", "wattage": "750",
+                      "modular": "Full"}],
+}
+
+
+def load_feeds(db_path, feeds, directory):
+    """Run the loader over `feeds` ({table: rows}); returns {table: writer}."""
+    import load_csv_to_db as loader
+
+    for table, rows in feeds.items():
+        write_feed(directory, table, rows)
+    conn = loader.connect(db_path)
+    try:
+        return {table: loader.load_table(conn, table, info) for table, info in loader.TABLE_SPECS.items()}
+    finally:
+        conn.close()
+
+
+@pytest.fixture
+def catalog_db(tmp_path):
+    """Path of an empty catalog database with the current schema."""
+    path = str(tmp_path / "buildsensei.db")
+    conn = sqlite3.connect(path)
+    for script in ("create_tables.sql", "create_indexes.sql", "create_changes.sql"):
+        with open(os.path.join(SCRIPTS_SQL, script), "r", encoding="utf-8") as f:
+            conn.executescript(f.read())
+    conn.close()
+    return path
+
+
+@pytest.fixture
+def feeds(tmp_path, monkeypatch):
+    """Directory the loader reads its CSVs from."""
+    import load_csv_to_db
+
+    directory = tmp_path / "datasets"
+    directory.mkdir()
+    monkeypatch.setattr(load_csv_to_db, "DATASET_PATH", str(directory))
+    return str(directory)
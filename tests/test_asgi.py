@@ -0,0 +1,65 @@
+import asyncio
+import json
+
+import pytest
+
+from asgi import create_asgi_app
+
+
+def request(app, method, path, body=b""):
+    """Run one HTTP request through the ASGI app; returns the messages it sent."""
+    scope = {"type": "http", "method": method, "path": path, "query_string": b"", "root_path": "",
+             "scheme": "http", "server": ("127.0.0.1", 8000), "client": ("127.0.0.1", 5555),
+             "http_version": "1.1", "headers": [(b"content-type", b"application/json")]}
+    incoming = [{"type": "http.request", "body": body, "more_body": False}]
+    sent = []
+
+    async def receive():
+        return incoming.pop(0) if incoming else {"type": "http.disconnect"}
+
+    async def send(message):
+        sent.append(message)
+
+    asyncio.run(app(scope, receive, send))
+    return sent
+
+
+@pytest.fixture(scope="module")
+def app():
+    return create_asgi_app()
+
+
+def test_batch_results_are_streamed_one_message_per_line(app):
+    builds = [{kind: 1 for kind in ("cpu", "gpu", "motherboard", "memory", "psu")}] * 3
+    body = json.dumps(builds).encode()
+
+    start, *chunks, end = request(app, "POST", "/api/check-compatibility/batch", body)
+
+    assert start["status"] == 200
+    assert len(chunks) == 3 and all(chunk["more_body"] for chunk in chunks)
+    assert end == {"type": "http.response.body", "body": b""}
+    expected = app.flask_app.test_client().post("/api/check-compatibility/batch", data=body,
+                                                content_type="application/json").get_data()
+    assert b"".join(chunk["body"] for chunk in chunks) == expected
+
+
+def test_plain_flask_responses_are_unchanged(app):
+    start, *chunks, end = request(app, "GET", "/api/cpus")
+
+    assert start["status"] == 200
+    assert json.loads(b"".join(chunk["body"] for chunk in chunks))
+    assert not end.get("more_body")
+
+
+def test_non_finite_psu_ids_become_per_index_errors(app):
+    build = {kind: 1 for kind in ("cpu", "gpu", "motherboard", "memory")}
+    psus = [1, "nan", "inf", "1e400", float("inf"), float("nan"), 10 ** 400]
+    body = json.dumps([{**build, "psu": psu} for psu in psus]).encode()
+
+    start, *chunks, end = request(app, "POST", "/api/check-compatibility/batch", body)
+
+    lines = [json.loads(line) for line in b"".join(chunk["body"] for chunk in chunks).splitlines()]
+    assert start["status"] == 200
+    assert [line["index"] for line in lines] == list(range(len(psus)))
+    assert "result" in lines[0]
+    assert all("error" in line for line in lines[1:])
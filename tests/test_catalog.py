@@ -0,0 +1,76 @@
+import os
+
+import pytest
+
+from catalog import ComponentCatalog
+from catalog_snapshot import write_snapshot
+from conftest import FEEDS, load_feeds
+from db_pool import ConnectionPool
+
+
+@pytest.fixture
+def snapshot_path(tmp_path, catalog_db, feeds):
+    """Binary snapshot of a catalog loaded from FEEDS."""
+    load_feeds(catalog_db, FEEDS, feeds)
+    snapshot = ComponentCatalog(catalog_db).load()
+    path = str(tmp_path / "catalog.snap")
+    write_snapshot(snapshot.tables, path, snapshot.revision)
+    return path
+
+
+def test_snapshot_stays_fresh_when_readers_touch_the_wal(catalog_db, snapshot_path):
+    catalog = ComponentCatalog(catalog_db, check_interval=0, snapshot_path=snapshot_path)
+    first = catalog.load()
+    assert catalog.source == "snapshot"
+
+    pool = ConnectionPool(catalog_db, size=1)
+    with pool.connection() as conn:
+        conn.execute("SELECT COUNT(*) FROM cpu").fetchone()
+        wal = catalog_db + "-wal"
+        if os.path.exists(wal):
+            os.utime(wal, ns=(first.mtime[0] + 10**9, first.mtime[0] + 10**9))
+        os.utime(catalog_db, ns=(first.mtime[0] + 10**9, first.mtime[0] + 10**9))
+
+        assert catalog.snapshot() is first
+        assert catalog.source == "snapshot"
+    pool.close()
+
+
+def test_snapshot_is_dropped_once_the_loader_changes_the_db(catalog_db, snapshot_path, feeds):
+    catalog = ComponentCatalog(catalog_db, check_interval=0, snapshot_path=snapshot_path)
+    first = catalog.load()
+
+    psu = {**FEEDS["power_supply"][0], "wattage": "650"}
+    load_feeds(catalog_db, {**FEEDS, "power_supply": [psu]}, feeds)
+
+    reloaded = catalog.snapshot()
+    assert reloaded.revision > first.revision
+    assert catalog.source == "sqlite"
+    assert reloaded["power_supply"].get(1).wattage == 650
+
+
+def test_positions_follow_rows_deleted_by_the_loader(catalog_db, feeds):
+    psus = [{**FEEDS["power_supply"][0], "name": f"PSU {n}", "wattage": str(watts)}
+            for n, watts in enumerate((550, 650, 750))]
+    load_feeds(catalog_db, {**FEEDS, "power_supply": psus}, feeds)
+    catalog = ComponentCatalog(catalog_db, check_interval=0)
+    before = catalog.load()["power_supply"]
+    ids = list(before.column("id"))
+    assert [before.position(row_id) for row_id in ids] == [0, 1, 2]
+
+    load_feeds(catalog_db, {**FEEDS, "power_supply": [psus[0], psus[2]]}, feeds)
+    after = catalog.snapshot()["power_supply"]
+
+    assert after is not before
+    assert [after.position(row_id) for row_id in ids] == [0, None, 1]
+    assert after.get(ids[2]).wattage == 750
+
+
+def test_pool_opens_paths_with_uri_characters(tmp_path, catalog_db):
+    path = tmp_path / "odd?name#50%.db"
+    os.replace(catalog_db, path)
+
+    pool = ConnectionPool(str(path), size=1)
+    with pool.connection() as conn:
+        assert conn.execute("SELECT COUNT(*) FROM cpu").fetchone() == (0,)
+    pool.close()
@@ -0,0 +1,81 @@
+import pytest
+
+from app import create_app
+from catalog_export import decode_catalog
+from conftest import FEEDS, load_feeds
+
+GPUS = [FEEDS["video_card"][0], {**FEEDS["video_card"][0], "name": "Asus Dual", "chipset": "GeForce RTX 4060"}]
+
+
+@pytest.fixture
+def client(tmp_path, catalog_db, feeds):
+    load_feeds(catalog_db, {**FEEDS, "video_card": GPUS}, feeds)
+    app = create_app({"DB_PATH": catalog_db, "SNAPSHOT_PATH": str(tmp_path / "missing.snap"),
+                      "BUILDS_DB_PATH": str(tmp_path / "builds.db"), "CATALOG_CHECK_INTERVAL": 0,
+                      "CATALOG_DELTA_CACHE_REVISIONS": 2})
+    yield app.test_client()
+    app.extensions["buildsensei"].builds.close()
+
+
+def export(client, since=None):
+    response = client.get("/api/catalog" if since is None else f"/api/catalog?since={since}",
+                          headers={"Accept-Encoding": "identity"})
+    assert response.status_code == 200
+    return decode_catalog(response.get_data())
+
+
+def cached_deltas(client):
+    return sorted(name for name in client.application.extensions["buildsensei"].payload_cache._payloads
+                  if name.startswith("catalog-since-"))
+
+
+def test_full_export_round_trips(client):
+    header, tables = export(client)
+
+    assert header["since"] is None and "removed" not in header
+    assert tables["video_card"]["name"] == ["MSI Ventus 2X", "Asus Dual"]
+    assert tables["power_supply"]["wattage"] == [750]
+    assert tables["cpu"]["boost_clock"] == [5.1]
+    assert tables["memory"]["price"] == [99]
+
+
+def test_delta_has_changed_rows_and_removed_ids(client, catalog_db, feeds):
+    header, _ = export(client)
+    psu = {**FEEDS["power_supply"][0], "wattage": "650"}
+    load_feeds(catalog_db, {**FEEDS, "video_card": GPUS[1:], "power_supply": [psu]}, feeds)
+
+    delta, tables = export(client, header["revision"])
+
+    assert delta["since"] == header["revision"] and delta["revision"] > header["revision"]
+    assert {name: info["rows"] for name, info in delta["tables"].items()} == {
+        "cpu": 0, "motherboard": 0, "memory": 0, "video_card": 0, "power_supply": 1}
+    assert tables["power_supply"]["wattage"] == [650]
+    assert delta["removed"] == {"video_card": [1]}
+
+
+def test_delta_from_the_latest_revision_is_empty(client):
+    header, _ = export(client)
+    delta, _ = export(client, header["revision"])
+
+    assert all(info["rows"] == 0 for info in delta["tables"].values())
+    assert delta["removed"] == {}
+
+
+def test_unknown_revision_gets_the_full_catalog(client):
+    header, tables = export(client, 2**62)
+
+    assert header["since"] is None
+    assert len(tables["video_card"]["id"]) == 2
+
+
+def test_only_deltas_from_recent_revisions_are_cached(client, catalog_db, feeds):
+    revisions = [export(client)[0]["revision"]]
+    for wattage in ("650", "550", "450"):
+        psu = {**FEEDS["power_supply"][0], "wattage": wattage}
+        load_feeds(catalog_db, {**FEEDS, "video_card": GPUS, "power_supply": [psu]}, feeds)
+        revisions.append(export(client)[0]["revision"])
+
+    for since in revisions:
+        export(client, since)
+
+    assert cached_deltas(client) == [f"catalog-since-{since}" for since in revisions[-2:]]
@@ -0,0 +1,106 @@
+import sqlite3
+
+import load_csv_to_db as loader
+from conftest import write_feed
+
+PSUS = [
+    {"name": "Corsair RM750", "price": "99.9", "efficiency": "gold", "wattage": "750", "modular": "Full"},
+    {"name": "Corsair RM750", "price": "89.9", "efficiency": "gold", "wattage": "850", "modular": "Full"},
+    {"name": "EVGA 500 W1", "price": "39.9", "efficiency": "", "wattage": "500", "modular": "false"},
+]
+
+
+def load(db_path, table, rows, feeds):
+    """Write the feed and run the loader on it; returns the table's writer."""
+    write_feed(feeds, table, rows)
+    conn = loader.connect(db_path)
+    try:
+        return loader.load_table(conn, table, loader.TABLE_SPECS[table])
+    finally:
+        conn.close()
+
+
+def stored(db_path, query):
+    conn = sqlite3.connect(db_path)
+    try:
+        return conn.execute(query).fetchall()
+    finally:
+        conn.close()
+
+
+def test_reload_without_changes_writes_nothing(catalog_db, feeds):
+    first = load(catalog_db, "power_supply", PSUS, feeds)
+    second = load(catalog_db, "power_supply", PSUS, feeds)
+
+    assert (first.inserted, first.updated) == (3, 0)
+    assert (second.inserted, second.updated, second.unchanged) == (0, 0, 3)
+    assert second.changed_ids == second.removed_ids == []
+
+
+def test_spec_change_updates_the_row_in_place(catalog_db, feeds):
+    load(catalog_db, "power_supply", PSUS, feeds)
+    (psu_id,) = stored(catalog_db, "SELECT id FROM power_supply WHERE name = 'EVGA 500 W1'")[0]
+
+    changed = [*PSUS[:2], {**PSUS[2], "wattage": "250"}]
+    writer = load(catalog_db, "power_supply", changed, feeds)
+
+    assert (writer.inserted, writer.updated, writer.unchanged) == (0, 1, 2)
+    assert writer.changed_ids == [psu_id]
+    assert stored(catalog_db, "SELECT id, wattage FROM power_supply WHERE name = 'EVGA 500 W1'") == [(psu_id, 250)]
+    assert stored(catalog_db, "SELECT COUNT(*) FROM power_supply") == [(3,)]
+
+
+def test_products_sharing_a_name_are_matched_in_feed_order(catalog_db, feeds):
+    load(catalog_db, "power_supply", PSUS, feeds)
+    before = stored(catalog_db, "SELECT id, wattage FROM power_supply WHERE name = 'Corsair RM750' ORDER BY id")
+
+    changed = [PSUS[0], {**PSUS[1], "wattage": "1000"}, PSUS[2]]
+    writer = load(catalog_db, "power_supply", changed, feeds)
+
+    assert writer.changed_ids == [before[1][0]]
+    assert stored(catalog_db, "SELECT id, wattage FROM power_supply WHERE name = 'Corsair RM750' ORDER BY id") == [
+        before[0], (before[1][0], 1000)]
+
+
+def test_price_only_changes_need_no_revalidation(catalog_db, feeds):
+    load(catalog_db, "power_supply", PSUS, feeds)
+    writer = load(catalog_db, "power_supply", [{**row, "price": "9.9"} for row in PSUS], feeds)
+
+    assert (writer.updated, writer.changed_ids) == (3, [])
+
+
+def test_rows_dropped_from_the_feed_are_deleted_and_logged(catalog_db, feeds):
+    load(catalog_db, "power_supply", PSUS, feeds)
+    (psu_id,) = stored(catalog_db, "SELECT id FROM power_supply WHERE name = 'EVGA 500 W1'")[0]
+
+    writer = load(catalog_db, "power_supply", PSUS[:2], feeds)
+
+    assert writer.removed_ids == [psu_id]
+    assert stored(catalog_db, f"SELECT COUNT(*) FROM power_supply WHERE id = {psu_id}") == [(0,)]
+    last = stored(catalog_db, "SELECT table_name, row_id FROM catalog_changes "
+                              "WHERE revision = (SELECT MAX(revision) FROM catalog_changes)")
+    assert last == [("power_supply", psu_id)]
+
+
+def test_empty_feed_deletes_nothing(catalog_db, feeds):
+    load(catalog_db, "power_supply", PSUS, feeds)
+    writer = load(catalog_db, "power_supply", [], feeds)
+
+    assert writer.removed_ids == []
+    assert stored(catalog_db, "SELECT COUNT(*) FROM power_supply") == [(3,)]
+
+
+def test_parallel_load_keys_rows_like_a_sequential_load(catalog_db, feeds):
+    for table in loader.TABLE_SPECS:
+        write_feed(feeds, table, PSUS if table == "power_supply" else [])
+    conn = loader.connect(catalog_db)
+    try:
+        writers = loader.load_parallel(conn, workers=2, chunk_size=2)
+    finally:
+        conn.close()
+
+    changed = [PSUS[0], {**PSUS[1], "wattage": "1000"}]
+    writer = load(catalog_db, "power_supply", changed, feeds)
+
+    assert writers["power_supply"].inserted == 3
+    assert (writer.updated, len(writer.removed_ids)) == (1, 1)
@@ -0,0 +1,42 @@
+import pytest
+
+from app import create_app
+from conftest import FEEDS, load_feeds
+
+
+@pytest.fixture
+def client(tmp_path, catalog_db, feeds):
+    load_feeds(catalog_db, FEEDS, feeds)
+    app = create_app({"DB_PATH": catalog_db, "SNAPSHOT_PATH": str(tmp_path / "missing.snap"),
+                      "BUILDS_DB_PATH": str(tmp_path / "builds.db"), "CATALOG_CHECK_INTERVAL": 0})
+    yield app.test_client()
+    app.extensions["buildsensei"].builds.close()
+
+
+def test_recommends_within_budget(client):
+    response = client.get("/api/recommend?budget=5000")
+
+    assert response.status_code == 200
+    assert response.get_json()["use"] == "gaming"
+
+
+@pytest.mark.parametrize("budget", ["nan", "inf", "-inf", "1e400"])
+def test_non_finite_budget_is_rejected(client, budget):
+    response = client.get(f"/api/recommend?budget={budget}")
+
+    assert response.status_code == 400
+    assert "error" in response.get_json()
+
+
+@pytest.mark.parametrize("params", [
+    {"budget": 1500, "use": ["gaming"]},
+    {"budget": 1500, "use": {"gaming": 1}},
+    {"budget": 1500, "use": "office"},
+    {"budget": 1500, "limit": 1e400},
+    {"budget": 1500, "cpu": 1e400},
+])
+def test_malformed_json_params_are_rejected(client, params):
+    response = client.post("/api/recommend", json=params)
+
+    assert response.status_code == 400
+    assert "error" in response.get_json()
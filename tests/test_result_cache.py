@@ -0,0 +1,21 @@
+from result_cache import ResultCache
+
+
+def test_newer_version_clears_the_cache():
+    cache = ResultCache()
+    cache.put(1, ("a",), 200, b"v1")
+
+    assert cache.get(2, ("a",)) is None
+    assert (cache.version, cache.invalidations) == (2, 1)
+
+
+def test_older_version_neither_reads_nor_writes():
+    cache = ResultCache()
+    cache.put(2, ("a",), 200, b"v2")
+
+    # A request still holding the previous snapshot
+    assert cache.get(1, ("a",)) is None
+    cache.put(1, ("a",), 200, b"v1")
+
+    assert cache.version == 2
+    assert cache.get(2, ("a",)) == (200, b"v2")
@@ -0,0 +1,184 @@
+import json
+import time
+
+import pytest
+
+import load_csv_to_db as loader
+import saved_builds
+from catalog import ComponentCatalog
+from conftest import FEEDS, load_feeds
+
+
+def changed_rows(writers):
+    """{table: ids} as main() hands it to revalidate_builds."""
+    return {table: writer.changed_ids + writer.removed_ids
+            for table, writer in writers.items() if writer.changed_ids or writer.removed_ids}
+
+
+@pytest.fixture
+def builds_db(tmp_path, catalog_db, feeds):
+    """Path of a builds database holding one build over FEEDS, evaluated as compatible."""
+    load_feeds(catalog_db, FEEDS, feeds)
+    snapshot = ComponentCatalog(catalog_db).load()
+    ids = {kind: 1 for kind in saved_builds.BUILD_COLUMNS}
+    path = str(tmp_path / "builds.db")
+    conn = saved_builds.connect(path)
+    with conn:
+        saved_builds._insert_build(conn, ids, *saved_builds.evaluate_saved(snapshot, ids), time.time())
+    conn.close()
+    return path
+
+
+def saved_result(builds_db):
+    conn = saved_builds.connect(builds_db)
+    try:
+        compatible, result = conn.execute("SELECT compatible, result FROM builds").fetchone()
+    finally:
+        conn.close()
+    return compatible, json.loads(result)
+
+
+def test_saved_build_starts_compatible(builds_db):
+    assert saved_result(builds_db)[0] == 1
+
+
+def test_spec_change_revalidates_the_builds_using_the_row(builds_db, catalog_db, feeds):
+    psu = {**FEEDS["power_supply"][0], "wattage": "250"}
+    changed = changed_rows(load_feeds(catalog_db, {**FEEDS, "power_supply": [psu]}, feeds))
+
+    assert changed == {"power_supply": [1]}
+    assert loader.revalidate_builds(changed, catalog_db, builds_db) == 1
+    compatible, result = saved_result(builds_db)
+    assert compatible == 0
+    assert result["power_analysis"]["psu_available"] == 250
+
+
+def test_price_change_leaves_saved_builds_alone(builds_db, catalog_db, feeds):
+    psu = {**FEEDS["power_supply"][0], "price": "79"}
+    writers = load_feeds(catalog_db, {**FEEDS, "power_supply": [psu]}, feeds)
+
+    assert writers["power_supply"].updated == 1
+    assert changed_rows(writers) == {}
+
+
+def test_removed_component_marks_the_build_as_unresolvable(builds_db, catalog_db, feeds):
+    other = {**FEEDS["power_supply"][0], "name": "Seasonic Focus GX-850", "wattage": "850"}
+    changed = changed_rows(load_feeds(catalog_db, {**FEEDS, "power_supply": [other]}, feeds))
+
+    assert changed == {"power_supply": [1]}
+    assert loader.revalidate_builds(changed, catalog_db, builds_db) == 1
+    compatible, result = saved_result(builds_db)
+    assert compatible is None
+    assert "error" in result
+
+
+def test_revalidate_all_rewrites_every_build(builds_db, catalog_db):
+    snapshot = ComponentCatalog(catalog_db).load()
+    conn = saved_builds.connect(builds_db)
+    try:
+        assert saved_builds.revalidate(conn, snapshot) == 1
+    finally:
+        conn.close()
+
+
+def test_build_edited_during_revalidation_keeps_its_new_result(builds_db, catalog_db, monkeypatch):
+    snapshot = ComponentCatalog(catalog_db).load()
+    evaluate = saved_builds.evaluate_saved
+
+    def evaluate_during_put(*args):
+        # A PUT that edits the build after it was read and before it is written
+        other = saved_builds.connect(builds_db)
+        with other:
+            other.execute("UPDATE builds SET psu_id = 2, result = '{}'")
+        other.close()
+        return evaluate(*args)
+
+    monkeypatch.setattr(saved_builds, "evaluate_saved", evaluate_during_put)
+    conn = saved_builds.connect(builds_db)
+    try:
+        assert saved_builds.revalidate(conn, snapshot) == 0
+    finally:
+        conn.close()
+    assert saved_result(builds_db)[1] == {}
+
+
+# ------------------------------------------------
+# BuildStore / BuildWriter
+# ------------------------------------------------
+IDS = {kind: 1 for kind in saved_builds.BUILD_COLUMNS}
+
+
+@pytest.fixture
+def store(tmp_path):
+    store = saved_builds.BuildStore(str(tmp_path / "builds.db"), timeout=5.0)
+    yield store
+    store.close()
+
+
+def test_store_create_get_update_delete(store):
+    created = store.create(IDS, 1, '{"compatible":true}')
+
+    fetched = store.get(created.share_id)
+    assert fetched.ids == IDS
+    assert (fetched.compatible, fetched.result) == (1, '{"compatible":true}')
+
+    assert store.update(created.share_id, {**IDS, "psu": 2}, 0, '{"compatible":false}')
+    assert store.get(created.share_id).ids["psu"] == 2
+    assert not store.update("missing", IDS, 0, "{}")
+
+    assert store.delete(created.share_id)
+    assert store.get(created.share_id) is None
+    assert not store.delete(created.share_id)
+
+
+def test_saved_build_json_embeds_the_stored_result(store):
+    build = store.create(IDS, 1, '{"compatible":true}')
+    body = json.loads(saved_builds.saved_build_json(build, url="/api/builds/x"))
+
+    assert body["id"] == build.share_id
+    assert body["result"] == {"compatible": True}
+    assert (body["compatible"], body["url"]) == (True, "/api/builds/x")
+
+
+def test_failing_operation_does_not_affect_its_batch(store):
+    def explode(conn):
+        conn.execute("DELETE FROM builds")
+        raise ValueError("boom")
+
+    # Linger long enough for the three operations to share one transaction
+    store.writer.linger = 0.2
+    first = store.writer.submit(saved_builds._insert_build, IDS, 1, "{}", time.time())
+    failing = store.writer.submit(explode)
+    second = store.writer.submit(saved_builds._insert_build, IDS, 1, "{}", time.time())
+
+    with pytest.raises(ValueError):
+        failing.result(5)
+    assert store.get(first.result(5)) is not None
+    assert store.get(second.result(5)) is not None
+    assert store.stats()["failed"] == 1
+
+
+def test_writer_survives_a_batch_that_cannot_commit(store):
+    def unrecoverable(conn):
+        conn.execute("RELEASE operation")  # leaves no savepoint to roll back to
+        raise ValueError("boom")
+
+    store.writer.linger = 0.2
+    inserted = store.writer.submit(saved_builds._insert_build, IDS, 1, "{}", time.time())
+    failing = store.writer.submit(unrecoverable)
+
+    with pytest.raises(Exception):
+        failing.result(5)
+    with pytest.raises(Exception):
+        inserted.result(5)  # the whole batch was rolled back
+    assert store.get(store.create(IDS, 1, "{}").share_id) is not None
+
+
+def test_full_queue_rejects_writes(tmp_path):
+    writer = saved_builds.BuildWriter(str(tmp_path / "builds.db"), queue_size=1)
+    writer._thread = object()  # no consumer: the queue never drains
+    writer.submit(saved_builds._delete_build, "x")
+
+    with pytest.raises(saved_builds.WriterBusy):
+        writer.submit(saved_builds._delete_build, "y")
+    assert writer.stats()["rejected"] == 1